@@ -73,6 +73,9 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
+    "PAGE_SIZE": int(os.environ.get("API_PAGE_SIZE", "50")),
+    "MAX_PAGE_SIZE": int(os.environ.get("API_MAX_PAGE_SIZE", "500")),
 }
 
 SIMPLE_JWT = {
@@ -84,6 +87,21 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 CELERY_BROKER_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = CELERY_BROKER_URL
+CELERY_BEAT_SCHEDULE = {
+    "abort-stale-uploads": {"task": "core.tasks.abort_stale_uploads", "schedule": timedelta(hours=1)},
+    "purge-exports": {"task": "core.tasks.purge_exports", "schedule": timedelta(hours=1)},
+    "send-queued-mail": {"task": "core.tasks.send_queued_mail", "schedule": timedelta(minutes=10)},
+    # core.receipts.FLUSH_INTERVAL ile aynı aralık.
+    "flush-read-receipts": {"task": "core.tasks.flush_read_receipts", "schedule": timedelta(seconds=30)},
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("CACHE_URL", os.environ.get("REDIS_URL", "redis://localhost:6379/0")),
+        "KEY_PREFIX": "ymm",
+    }
+}
 
 EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
 EMAIL_HOST = os.environ.get("EMAIL_HOST", "")
@@ -1,7 +1,11 @@
 ﻿from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path, include
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("core.urls")),
 ]
+
+# ASGI sunucusu (uvicorn) statik dosya sunmaz; DEBUG modunda admin varlıkları buradan gelir.
+urlpatterns += staticfiles_urlpatterns()
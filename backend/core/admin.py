@@ -6,6 +6,9 @@ from .models import (
     File,
     AuditLog,
     ContractJob,
+    ImportJob,
+    ExportJob,
+    MailOutbox,
     DocumentCounter,
     ReportCounterYearAll,
     ReportCounterTypeCum,
@@ -70,6 +73,22 @@ class ContractJobAdmin(AuditAdmin):
     list_display = ("id", "status", "created_at")
 
 
+@admin.register(ImportJob)
+class ImportJobAdmin(AuditAdmin):
+    list_display = ("id", "kind", "status", "created_at")
+
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(AuditAdmin):
+    list_display = ("id", "kind", "status", "created_at")
+
+@admin.register(MailOutbox)
+class MailOutboxAdmin(AuditAdmin):
+    list_display = ("id", "status", "subject", "attempts", "sent_at", "created_at")
+    list_filter = ("status",)
+
+
 admin.site.register(DocumentCounter)
 admin.site.register(ReportCounterYearAll)
 admin.site.register(ReportCounterTypeCum)
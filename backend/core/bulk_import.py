@@ -0,0 +1,330 @@
+import csv
+import io
+import json
+import os
+from collections import Counter, defaultdict
+from datetime import datetime
+from itertools import count
+from typing import Iterator
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.exceptions import ValidationError
+
+from . import numbering
+from .dashboard import invalidate_dashboard
+from .models import (
+    AppSetting,
+    AuditLog,
+    Contract,
+    Customer,
+    Document,
+    Report,
+    YearLock,
+    document_number,
+    report_number,
+)
+from .serializers import DocumentImportSerializer, ReportImportSerializer
+
+MAX_ROWS = int(os.environ.get("BULK_IMPORT_MAX_ROWS", "20000"))
+# Yanıtta en fazla bu kadar hatalı satır listelenir.
+MAX_REPORTED_ERRORS = 200
+BATCH_SIZE = 1000
+
+
+class BulkImportError(Exception):
+    def __init__(self, message: str, rows=None):
+        super().__init__(message)
+        self.rows = rows or []
+
+
+def _cell(value):
+    # Excel sayıları float, tarihleri datetime döner; serializer'ın beklediği biçime çevrilir.
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime):
+        return value.date() if value.time() == datetime.min.time() else value
+    if value is None:
+        return ""
+    return value.strip() if isinstance(value, str) else value
+
+
+def _xlsx_rows(source) -> Iterator[dict]:
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(key).strip() if key is not None else "" for key in next(rows, ())]
+        for values in rows:
+            yield {key: _cell(value) for key, value in zip(header, values) if key}
+    finally:
+        workbook.close()
+
+
+def _csv_rows(handle) -> Iterator[dict]:
+    sample = handle.read(4096)
+    handle.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    for row in csv.DictReader(handle, dialect=dialect):
+        yield {key.strip(): (value or "").strip() for key, value in row.items() if key and isinstance(value, (str, type(None)))}
+
+
+def _is_xlsx(filename: str, head: bytes) -> bool:
+    return filename.lower().endswith(".xlsx") or head.startswith(b"PK\x03\x04")
+
+
+def filled(row: dict) -> dict:
+    """Boş hücreleri atar; eksik alanlar serializer varsayılanına düşer."""
+
+    return {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def iter_rows(path: str, filename: str = "") -> Iterator[dict]:
+    """CSV ya da XLSX dosyasını satır satır okur; bellek kullanımı dosya boyutundan bağımsızdır.
+
+    Her satır başlıktaki tüm sütunları içerir (boş hücre ``""``).
+    """
+
+    with open(path, "rb") as handle:
+        head = handle.read(4)
+    if _is_xlsx(filename, head):
+        yield from _xlsx_rows(path)
+        return
+    with open(path, encoding="utf-8-sig", newline="") as handle:
+        yield from _csv_rows(handle)
+
+
+def read_rows(raw: bytes, filename: str = "") -> list[dict]:
+    """CSV (virgül, noktalı virgül veya sekme ayraçlı), XLSX ya da JSON listesi okur; boş hücreler atlanır."""
+
+    if _is_xlsx(filename, raw[:4]):
+        return [row for row in map(filled, _xlsx_rows(io.BytesIO(raw))) if row]
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = raw.decode("cp1254")
+    if filename.lower().endswith(".json") or text.lstrip()[:1] in ("[", "{"):
+        try:
+            data = json.loads(text)
+        except ValueError as exc:
+            raise BulkImportError(f"JSON okunamadı: {exc}")
+        if isinstance(data, dict):
+            data = data.get("rows")
+        if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            raise BulkImportError("JSON bir satır listesi olmalıdır.")
+        return data
+    return [row for row in map(filled, _csv_rows(io.StringIO(text, newline=""))) if row]
+
+
+def _validate_rows(rows, serializer_class) -> tuple[list[tuple[int, dict]], dict]:
+    if not rows:
+        raise BulkImportError("İçe aktarılacak satır yok.")
+    if len(rows) > MAX_ROWS:
+        raise BulkImportError(f"En fazla {MAX_ROWS} satır içe aktarılabilir.")
+    # Alanlar tek bir serializer örneğinde bir kez kurulur; satır başına sorgu yapılmaz.
+    child = serializer_class()
+    items = []
+    errors = {}
+    for index, row in enumerate(rows):
+        try:
+            items.append((index, child.run_validation(row)))
+        except ValidationError as exc:
+            errors[index] = exc.detail
+    return items, errors
+
+
+def _resolve_relations(items, errors, *, label: str):
+    """Müşteri ve sözleşmeleri toplu çeker; satırlara ``customer_id``/``contract_id`` yazar."""
+
+    ids = {attrs["customer"] for _, attrs in items if attrs.get("customer")}
+    tax_nos = {attrs["customer_tax_no"] for _, attrs in items if attrs.get("customer_tax_no")}
+    known_ids = set(Customer.objects.filter(id__in=ids).values_list("id", flat=True))
+    by_tax_no = dict(Customer.objects.filter(tax_no__in=tax_nos).values_list("tax_no", "id"))
+    contract_ids = {attrs["contract"] for _, attrs in items if attrs.get("contract")}
+    contracts = {row["id"]: row for row in Contract.objects.filter(id__in=contract_ids).values("id", "customer_id", "status")}
+
+    valid = []
+    for index, attrs in items:
+        customer_id = attrs.pop("customer", None)
+        tax_no = attrs.pop("customer_tax_no", None)
+        if customer_id and customer_id not in known_ids:
+            errors[index] = {"customer": [f"Müşteri bulunamadı: {customer_id}"]}
+            continue
+        if not customer_id:
+            customer_id = by_tax_no.get(tax_no)
+            if not customer_id:
+                errors[index] = {"customer_tax_no": [f"Bu vergi numarasıyla müşteri yok: {tax_no}"]}
+                continue
+        contract_id = attrs.pop("contract", None)
+        if contract_id:
+            contract = contracts.get(contract_id)
+            if not contract:
+                errors[index] = {"contract": [f"Sözleşme bulunamadı: {contract_id}"]}
+                continue
+            if contract["customer_id"] != customer_id:
+                errors[index] = {"non_field_errors": ["Seçilen sözleşme müşteriyle uyumlu değil."]}
+                continue
+            if contract["status"] == "DONE":
+                errors[index] = {"non_field_errors": [f"Tamamlanmış sözleşmeye yeni {label} bağlanamaz."]}
+                continue
+        attrs["customer_id"] = customer_id
+        attrs["contract_id"] = contract_id
+        valid.append((index, attrs))
+    return valid
+
+
+def _check_dates(items, errors, *, key, latest: dict, label: str, staff: bool):
+    """``DocumentSerializer``/``ReportSerializer`` tarih kuralları; satırlar numara sırasıyla yazılır."""
+
+    setting = AppSetting.objects.first() or AppSetting.objects.create()
+    years = {attrs["year"] for _, attrs in items} | {attrs["received_date"].year for _, attrs in items}
+    locked = set(YearLock.objects.filter(year__in=years, is_locked=True).values_list("year", flat=True))
+    today = timezone.localdate()
+    valid = []
+    for index, attrs in items:
+        received = attrs["received_date"]
+        if received.year != setting.working_year:
+            message = f"Sadece çalışma yılı ({setting.working_year}) için tarih girebilirsiniz."
+        elif attrs["year"] in locked or received.year in locked:
+            message = f"{attrs['year']} yılı kilitli olduğu için {label} eklenemez."
+        elif not staff and received < today:
+            message = f"Geçmiş tarihli {label} girilemez."
+        elif latest.get(key(attrs)) and received < latest[key(attrs)]:
+            message = f"Daha eski tarihli {label} girişi numara sırasını bozar. Önceki tarihe yeni numara verilemez."
+        else:
+            latest[key(attrs)] = received
+            valid.append((index, attrs))
+            continue
+        errors[index] = {"received_date": [message]}
+    return valid
+
+
+def _raise_errors(errors: dict, total: int):
+    if not errors:
+        return
+    rows = [{"row": index + 1, "errors": errors[index]} for index in sorted(errors)[:MAX_REPORTED_ERRORS]]
+    raise BulkImportError(f"{len(errors)} / {total} satır hatalı; hiçbir kayıt eklenmedi.", rows)
+
+
+def _audit(objs, model: str, actor):
+    AuditLog.objects.bulk_create(
+        [AuditLog(model=model, object_id=str(obj.pk), action="create", actor=actor) for obj in objs],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def import_documents(rows: list[dict], *, actor=None, staff: bool = True, dry_run: bool = False) -> dict:
+    """Evrakları tek transaction'da ekler; her ``(doc_type, year)`` için ardışık seri bloğu ayrılır.
+
+    Önce bütün satırlar doğrulanır; tek bir hata bile varsa hiçbir kayıt eklenmez.
+    """
+
+    items, errors = _validate_rows(rows, DocumentImportSerializer)
+    items = _resolve_relations(items, errors, label="evrak")
+    keys = {(attrs["doc_type"], attrs["year"]) for _, attrs in items}
+    latest = {}
+    if keys:
+        for row in (
+            Document.objects.filter(is_archived=False, year__in={year for _, year in keys})
+            .exclude(received_date__isnull=True)
+            .values("doc_type", "year")
+            .annotate(last=Max("received_date"))
+            .order_by()
+        ):
+            latest[(row["doc_type"], row["year"])] = row["last"]
+    items = _check_dates(
+        items, errors, key=lambda attrs: (attrs["doc_type"], attrs["year"]), latest=latest, label="evrak", staff=staff
+    )
+    _raise_errors(errors, len(rows))
+
+    counts = Counter((attrs["doc_type"], attrs["year"]) for _, attrs in items)
+    if dry_run:
+        return {"created": 0, "valid": len(items), "ranges": {}}
+    with transaction.atomic():
+        # Kilit sırası sabit: aynı anda çalışan iki içe aktarma birbirini kilitlemez.
+        serials = {}
+        for key in sorted(counts):
+            serials[key] = count(numbering.reserve_document_block(key[0], key[1], counts[key]))
+        objs = []
+        for _, attrs in items:
+            serial = next(serials[(attrs["doc_type"], attrs["year"])])
+            objs.append(
+                Document(
+                    **attrs,
+                    serial=serial,
+                    doc_no=document_number(attrs["doc_type"], attrs["year"], serial),
+                    created_by=actor,
+                    updated_by=actor,
+                )
+            )
+        created = Document.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+        _audit(created, "Document", actor)
+        transaction.on_commit(invalidate_dashboard)
+
+    ranges = defaultdict(list)
+    for obj in created:
+        ranges[f"{obj.doc_type}/{obj.year}"].append(obj.doc_no)
+    return {"created": len(created), "valid": len(items), "ranges": {k: [v[0], v[-1]] for k, v in ranges.items()}}
+
+
+def import_reports(rows: list[dict], *, actor=None, staff: bool = True, dry_run: bool = False) -> dict:
+    """Raporları tek transaction'da ekler; kümülatif ve yıl içi numaralar blok halinde ayrılır."""
+
+    items, errors = _validate_rows(rows, ReportImportSerializer)
+    items = _resolve_relations(items, errors, label="rapor")
+    # Sözleşmeye ilk rapor bağlanınca sözleşme tamamlanır; aynı dosyada ikinci rapor bağlanamaz.
+    seen_contracts = set()
+    for index, attrs in list(items):
+        contract_id = attrs["contract_id"]
+        if contract_id and contract_id in seen_contracts:
+            errors[index] = {"non_field_errors": ["Tamamlanmış sözleşmeye yeni rapor bağlanamaz."]}
+        elif contract_id:
+            seen_contracts.add(contract_id)
+    items = [(index, attrs) for index, attrs in items if index not in errors]
+    years = {attrs["year"] for _, attrs in items}
+    latest = dict(
+        Report.objects.filter(is_archived=False, year__in=years)
+        .exclude(received_date__isnull=True)
+        .values("year")
+        .annotate(last=Max("received_date"))
+        .order_by()
+        .values_list("year", "last")
+    )
+    items = _check_dates(items, errors, key=lambda attrs: attrs["year"], latest=latest, label="rapor", staff=staff)
+    _raise_errors(errors, len(rows))
+
+    if dry_run:
+        return {"created": 0, "valid": len(items), "ranges": {}}
+    with transaction.atomic():
+        first_cum, firsts = numbering.reserve_report_block(Counter(attrs["year"] for _, attrs in items))
+        year_serials = {year: count(first) for year, first in firsts.items()}
+        objs = []
+        for offset, (_, attrs) in enumerate(items):
+            type_cum = first_cum + offset
+            year_serial = next(year_serials[attrs["year"]])
+            objs.append(
+                Report(
+                    **attrs,
+                    type_cumulative=type_cum,
+                    year_serial_all=year_serial,
+                    report_no=report_number(type_cum, attrs["year"], year_serial),
+                    created_by=actor,
+                    updated_by=actor,
+                )
+            )
+        created = Report.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+        _audit(created, "Report", actor)
+        if seen_contracts:
+            Contract.objects.filter(id__in=seen_contracts).exclude(status="DONE").update(
+                status="DONE", updated_at=timezone.now()
+            )
+        transaction.on_commit(invalidate_dashboard)
+
+    ranges = defaultdict(list)
+    for obj in created:
+        ranges[str(obj.year)].append(obj.report_no)
+    return {"created": len(created), "valid": len(items), "ranges": {k: [v[0], v[-1]] for k, v in ranges.items()}}
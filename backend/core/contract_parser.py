@@ -1,94 +1,217 @@
 import re
 from datetime import datetime
 
+# str.translate sözlük tablosuyla karakter karakter çalışır; replace zinciri çok daha hızlıdır.
+_TR_PAIRS = (
+    ("ç", "c"),
+    ("Ç", "C"),
+    ("ğ", "g"),
+    ("Ğ", "G"),
+    ("ı", "i"),
+    ("İ", "I"),
+    ("ö", "o"),
+    ("Ö", "O"),
+    ("ş", "s"),
+    ("Ş", "S"),
+    ("ü", "u"),
+    ("Ü", "U"),
+)
+# Etiket ile değer arasındaki ayraç; ``\s`` satır sonunu da kapsadığından etiket, ayraç ve
+# değer ayrı satırlara bölünmüş olsa da eşleşir.
+_SEP = r"\s*[:\-]?\s*"
+_LINE_VALUE = r".+"
+
 
 def _normalize(text: str) -> str:
-    table = str.maketrans(
-        {
-            "ç": "c",
-            "Ç": "C",
-            "ğ": "g",
-            "Ğ": "G",
-            "ı": "i",
-            "İ": "I",
-            "ö": "o",
-            "Ö": "O",
-            "ş": "s",
-            "Ş": "S",
-            "ü": "u",
-            "Ü": "U",
-        }
-    )
-    return text.translate(table)
-
-
-def _find_date(text: str):
-    m = re.search(r"(\d{2}[./-]\d{2}[./-]\d{4})", text)
-    if not m:
-        return None
+    for source, target in _TR_PAIRS:
+        text = text.replace(source, target)
+    return text
+
+
+def _strip(value: str):
+    # PDF metnindeki sayfa/dikey ayraçlar da satır sonu sayılır.
+    lines = value.splitlines()
+    return lines[0].strip() if lines else ""
+
+
+def _period(match):
+    return {
+        "period_start_month": int(match.group(1)),
+        "period_start_year": int(match.group(2)),
+        "period_end_month": int(match.group(3)),
+        "period_end_year": int(match.group(4)),
+    }
+
+
+def _date(value: str):
     for fmt in ("%d.%m.%Y", "%d/%m/%Y", "%d-%m-%Y"):
         try:
-            return datetime.strptime(m.group(1), fmt).date()
+            return datetime.strptime(value, fmt).date()
         except Exception:
             continue
     return None
 
 
+def _labelled(label: str, value: str, source: str, confidence: float):
+    """``etiket: değer`` kalıbı; tüm metin üzerinde aranır."""
+
+    return {
+        "kind": "labelled",
+        "source": source,
+        "confidence": confidence,
+        "regex": re.compile(rf"(?i){label}{_SEP}(?P<value>{value})"),
+    }
+
+
+def _plain(pattern: str, source: str, confidence: float, context=()):
+    """Etiketsiz kalıp; eşleşmenin satırında ``context`` kelimelerinden biri varsa güven yüksek sayılır."""
+
+    return {
+        "kind": "plain",
+        "source": source,
+        "confidence": confidence,
+        "regex": re.compile(pattern),
+        "context": context,
+    }
+
+
+# Alan -> öncelik sırasıyla kalıplar -> son işlem. Her kalıp için metindeki ilk eşleşme alınır;
+# son işlemden boş değer çıkarsa sıradaki kalıba bakılır. İçe aktarımda bir kez derlenir.
+RULES = [
+    {
+        "field": "tax_no",
+        "patterns": [_plain(r"\b(\d{10,11})\b", "raw", 0.5, context=("vergi", "vkn", "tckn", "kimlik"))],
+        "post": _strip,
+    },
+    {
+        "field": "tax_office",
+        "patterns": [_labelled(r"vergi\s*dairesi", _LINE_VALUE, "raw", 0.9)],
+        "post": _strip,
+    },
+    {
+        "field": "customer_name",
+        "patterns": [
+            _labelled(r"(?:m[üu]şteri|unvan|m[üu]kellef)", _LINE_VALUE, "raw", 0.9),
+            _labelled(r"(?:musteri|unvan|mukellef)", _LINE_VALUE, "norm", 0.7),
+        ],
+        "post": _strip,
+    },
+    {
+        "field": "phone",
+        "patterns": [_labelled(r"(?:telefon|tel)", _LINE_VALUE, "raw", 0.8)],
+        "post": _strip,
+    },
+    {
+        "field": "email",
+        "patterns": [_labelled(r"(?:e-?posta|email)", r"[\w\.-]+@[\w\.-]+", "raw", 0.95)],
+        "post": _strip,
+    },
+    {
+        "field": "contact_person",
+        "patterns": [_labelled(r"(?:yetkili|ilgili)", _LINE_VALUE, "raw", 0.7)],
+        "post": _strip,
+    },
+    {
+        "field": "contract_no",
+        "patterns": [
+            _labelled(r"s[öo]zleşme\s*no", r"[\w/-]+", "raw", 0.95),
+            _labelled(r"sozlesme\s*no", r"[\w/-]+", "norm", 0.8),
+        ],
+        "post": _strip,
+    },
+    {
+        "field": "contract_type",
+        "patterns": [
+            _labelled(r"s[öo]zleşme\s*t[üu]r[üu]", _LINE_VALUE, "raw", 0.9),
+            _labelled(r"sozlesme\s*turu", _LINE_VALUE, "norm", 0.75),
+        ],
+        "post": _strip,
+    },
+    {
+        "field": "period",
+        "patterns": [_plain(r"(\d{2})[./](\d{4})\s*-\s*(\d{2})[./](\d{4})", "norm", 0.7, context=("donem",))],
+        "post": _period,
+        "match": True,
+    },
+    {
+        "field": "contract_date",
+        "patterns": [_plain(r"(\d{2}[./-]\d{2}[./-]\d{4})", "raw", 0.6, context=("tarih",))],
+        "post": _date,
+        "default": None,
+    },
+]
+
+
+# Son işlemi birden çok alan üreten kurallar için güven hangi alanlara yazılır.
+_SPREAD = {
+    "period": ("period_start_month", "period_start_year", "period_end_month", "period_end_year"),
+}
+
+
+def _line(text: str, pos: int) -> str:
+    end = text.find("\n", pos)
+    return text[text.rfind("\n", 0, pos) + 1 : len(text) if end < 0 else end]
+
+
+def _match(rule, pattern, texts):
+    source = texts[0] if pattern["source"] == "raw" else texts[1]
+    found = pattern["regex"].search(source)
+    if not found:
+        return None
+    confidence = pattern["confidence"]
+    if pattern["kind"] == "labelled":
+        value = found.group("value")
+        if "\n" in source[found.start() : found.start("value")]:
+            # Eşleşme birden çok satıra yayılıyor (bölünmüş etiket ya da sonraki satırdaki değer).
+            confidence *= 0.8
+        return value, confidence
+    if pattern["context"]:
+        line = _line(texts[1], found.start()).lower()
+        if any(word in line for word in pattern["context"]):
+            confidence = 0.9
+    return (found if rule.get("match") else found.group(1)), confidence
+
+
+def parse_contract(text: str) -> dict:
+    """Kural tablosunu ham ve normalleştirilmiş metne uygular.
+
+    Dönüş: ``{"fields": {...}, "confidence": {alan: 0..1}}``. Aynı satırdaki etiket
+    tam güven alır; normalleştirilmiş metinden, sonraki satırdan veya etiketsiz
+    bulunan değerlerin güveni daha düşüktür.
+    """
+
+    text = text or ""
+    texts = (text, _normalize(text))
+
+    fields = {}
+    confidence = {}
+    for rule in RULES:
+        name = rule["field"]
+        found = None
+        for pattern in rule["patterns"]:
+            hit = _match(rule, pattern, texts)
+            if hit is None:
+                continue
+            value = rule["post"](hit[0])
+            if found is None or value:
+                found = (value, hit[1])
+            if value:
+                break
+        if found is None:
+            if "default" in rule:
+                fields[name] = rule["default"]
+                confidence[name] = 0.0
+            continue
+        value, score = found
+        if isinstance(value, dict):
+            fields.update(value)
+            for key in _SPREAD.get(name, ()):
+                confidence[key] = round(score, 2)
+        else:
+            fields[name] = value
+            confidence[name] = round(score, 2) if value is not None else 0.0
+    return {"fields": fields, "confidence": confidence}
+
+
 def parse_contract_text(text: str) -> dict:
-    data = {}
-    norm = _normalize(text)
-
-    tax_no = re.search(r"\b(\d{10,11})\b", text)
-    if tax_no:
-        data["tax_no"] = tax_no.group(1)
-
-    office = re.search(r"(?i)vergi\s*dairesi\s*[:\-]?\s*(.+)", text)
-    if office:
-        data["tax_office"] = office.group(1).splitlines()[0].strip()
-
-    name = re.search(r"(?i)(m[üu]şteri|unvan|m[üu]kellef)\s*[:\-]?\s*(.+)", text)
-    if name:
-        data["customer_name"] = name.group(2).splitlines()[0].strip()
-    if not data.get("customer_name"):
-        name2 = re.search(r"(?i)(musteri|unvan|mukellef)\s*[:\-]?\s*(.+)", norm)
-        if name2:
-            data["customer_name"] = name2.group(2).splitlines()[0].strip()
-
-    phone = re.search(r"(?i)(telefon|tel)\s*[:\-]?\s*(.+)", text)
-    if phone:
-        data["phone"] = phone.group(2).splitlines()[0].strip()
-
-    email = re.search(r"(?i)(e-?posta|email)\s*[:\-]?\s*([\w\.-]+@[\w\.-]+)", text)
-    if email:
-        data["email"] = email.group(2).strip()
-
-    contact = re.search(r"(?i)(yetkili|ilgili)\s*[:\-]?\s*(.+)", text)
-    if contact:
-        data["contact_person"] = contact.group(2).splitlines()[0].strip()
-
-    contract_no = re.search(r"(?i)(s[öo]zleşme\s*no)\s*[:\-]?\s*([\w/-]+)", text)
-    if contract_no:
-        data["contract_no"] = contract_no.group(2).strip()
-    if not data.get("contract_no"):
-        contract_no2 = re.search(r"(?i)(sozlesme\s*no)\s*[:\-]?\s*([\w/-]+)", norm)
-        if contract_no2:
-            data["contract_no"] = contract_no2.group(2).strip()
-
-    contract_type = re.search(r"(?i)(s[öo]zleşme\s*t[üu]r[üu])\s*[:\-]?\s*(.+)", text)
-    if contract_type:
-        data["contract_type"] = contract_type.group(2).splitlines()[0].strip()
-    if not data.get("contract_type"):
-        contract_type2 = re.search(r"(?i)(sozlesme\s*turu)\s*[:\-]?\s*(.+)", norm)
-        if contract_type2:
-            data["contract_type"] = contract_type2.group(2).splitlines()[0].strip()
-
-    period = re.search(r"(\d{2})[./](\d{4})\s*-\s*(\d{2})[./](\d{4})", norm)
-    if period:
-        data["period_start_month"] = int(period.group(1))
-        data["period_start_year"] = int(period.group(2))
-        data["period_end_month"] = int(period.group(3))
-        data["period_end_year"] = int(period.group(4))
-
-    data["contract_date"] = _find_date(text)
-
-    return data
\ No newline at end of file
+    return parse_contract(text)["fields"]
@@ -0,0 +1,169 @@
+import logging
+import os
+import tempfile
+from itertools import islice
+from pathlib import Path
+
+from django.db import DatabaseError, transaction
+from rest_framework.exceptions import ValidationError
+
+from . import realtime
+from .bulk_import import filled, iter_rows
+from .dashboard import invalidate_dashboard
+from .models import AuditLog, Customer, ImportJob
+from .serializers import CustomerImportSerializer
+from .storage import bucket_name, s3_client
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+BATCH_SIZE = int(os.environ.get("CUSTOMER_IMPORT_BATCH_SIZE", "500"))
+# İş kaydında saklanan en fazla hatalı satır; sayaç yine tüm hataları sayar.
+MAX_STORED_ERRORS = 500
+# Kayıt bu alanlardan biriyle eşleşirse güncellenir, yoksa eklenir.
+KEYS = ("tax_no", "tckn")
+
+
+def _set_status(job: ImportJob, status: str, **payload):
+    job.status = status
+    job.payload = {**job.payload, **payload}
+    job.save(update_fields=["status", "payload", "updated_at"])
+    if job.created_by_id:
+        realtime.publish([job.created_by_id], "import_job", {"id": job.id, "status": status})
+
+
+def _update_fields(header) -> list[str]:
+    # Dosyada sütunu olan alanlar güncellenir (boş hücre alanı temizler); olmayanlara dokunulmaz.
+    writable = {name for name, field in CustomerImportSerializer().fields.items() if not field.read_only}
+    return [name for name in header if name in writable and name not in KEYS] + ["updated_by", "updated_at"]
+
+
+def _write(rows, key: str, update_fields, actor) -> dict:
+    """Aynı anahtarlı satırları tek ``INSERT ... ON CONFLICT DO UPDATE`` ile yazar."""
+
+    values = [attrs[key] for _, attrs in rows]
+    existing = set(Customer.objects.filter(**{f"{key}__in": values}).values_list(key, flat=True))
+    Customer.objects.bulk_create(
+        [Customer(**attrs, created_by=actor, updated_by=actor) for _, attrs in rows],
+        update_conflicts=True,
+        unique_fields=[key],
+        update_fields=update_fields,
+    )
+    ids = dict(Customer.objects.filter(**{f"{key}__in": values}).values_list(key, "id"))
+    AuditLog.objects.bulk_create(
+        [
+            AuditLog(
+                model="Customer",
+                object_id=str(ids[value]),
+                action="update" if value in existing else "create",
+                actor=actor,
+            )
+            for value in values
+        ]
+    )
+    return {"created": len(set(values) - existing), "updated": len(existing)}
+
+
+def _write_batch(batch, update_fields, actor, stats: dict, errors: list):
+    groups = {key: {} for key in KEYS}
+    for number, attrs in batch:
+        key = "tax_no" if attrs.get("tax_no") else "tckn"
+        # Aynı numara partide tekrar ederse son satır geçerlidir (ON CONFLICT bir satırı iki kez güncelleyemez).
+        groups[key][attrs[key]] = (number, attrs)
+    for key, rows in groups.items():
+        rows = list(rows.values())
+        if not rows:
+            continue
+        try:
+            with transaction.atomic():
+                result = _write(rows, key, update_fields, actor)
+        except DatabaseError:
+            # Parti yazılamazsa satırlar tek tek denenir; yalnızca hatalı satır düşer.
+            result = {"created": 0, "updated": 0}
+            for row in rows:
+                try:
+                    with transaction.atomic():
+                        single = _write([row], key, update_fields, actor)
+                except DatabaseError as exc:
+                    stats["failed"] += 1
+                    _add_error(errors, row[0], {"non_field_errors": [str(exc)]})
+                    continue
+                result = {name: result[name] + single[name] for name in result}
+        stats["created"] += result["created"]
+        stats["updated"] += result["updated"]
+        if result["created"] or result["updated"]:
+            # Panodaki müşteri sayısı parti yazıldıktan sonra yeniden hesaplanır.
+            transaction.on_commit(invalidate_dashboard)
+
+
+def _add_error(errors: list, number: int, detail):
+    if len(errors) < MAX_STORED_ERRORS:
+        errors.append({"row": number, "errors": detail})
+
+
+def import_customers(path: str, filename: str = "", *, actor=None, on_progress=None) -> dict:
+    """Müşteri dosyasını (CSV/XLSX) ``BATCH_SIZE`` satırlık partilerle okuyup vergi no/TCKN ile upsert eder.
+
+    Hatalı satırlar atlanıp ``errors`` içinde raporlanır; partinin geri kalanı yazılır.
+    Dönüş: ``{"processed", "created", "updated", "failed", "errors"}``.
+    """
+
+    rows = iter_rows(path, filename)
+    child = CustomerImportSerializer()
+    stats = {"processed": 0, "created": 0, "updated": 0, "failed": 0}
+    errors = []
+    update_fields = None
+    number = 0
+    while True:
+        chunk = list(islice(rows, BATCH_SIZE))
+        if not chunk:
+            break
+        if update_fields is None:
+            update_fields = _update_fields(chunk[0].keys())
+        batch = []
+        for row in chunk:
+            number += 1
+            row = filled(row)
+            if not row:
+                continue
+            stats["processed"] += 1
+            try:
+                batch.append((number, child.run_validation(row)))
+            except ValidationError as exc:
+                stats["failed"] += 1
+                _add_error(errors, number, exc.detail)
+        _write_batch(batch, update_fields, actor, stats, errors)
+        if on_progress:
+            on_progress(dict(stats))
+    return {**stats, "errors": errors}
+
+
+def run_import_job(job_id: int) -> str:
+    """Depodaki müşteri dosyasını geçici dosyaya indirip içe aktarır; ilerleme ``payload["progress"]``."""
+
+    job = ImportJob.objects.select_related("created_by").get(id=job_id)
+    if job.status not in (PENDING, RUNNING):
+        return job.status
+    info = job.payload["file"]
+    try:
+        _set_status(job, RUNNING)
+        with tempfile.NamedTemporaryFile(suffix=Path(info["filename"]).suffix) as tmp:
+            s3_client().download_fileobj(bucket_name(), info["key"], tmp)
+            tmp.flush()
+            result = import_customers(
+                tmp.name,
+                info["filename"],
+                actor=job.created_by,
+                on_progress=lambda stats: _set_status(job, RUNNING, progress=stats),
+            )
+    except Exception as exc:
+        logger.warning("İçe aktarma işi %s başarısız: %s", job_id, exc)
+        _set_status(job, FAILED, error=str(exc))
+        return FAILED
+    errors = result.pop("errors")
+    _set_status(job, DONE, progress=result, errors=errors)
+    return DONE
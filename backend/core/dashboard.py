@@ -0,0 +1,88 @@
+import time
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import AppSetting, Customer, Document, Report
+
+CACHE_TIMEOUT = 300
+VERSION_KEY = "dashboard:version"
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(VERSION_KEY, version, None)
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidate_dashboard():
+    # Sürüm değişince eski anahtarlar okunmaz, TTL ile kendiliğinden silinir.
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def _grouped(model, type_field):
+    rows = (
+        model.objects.filter(is_archived=False)
+        .values("year", type_field, "status", "delivery_method")
+        .annotate(count=Count("id"))
+        .order_by("year", type_field, "status", "delivery_method")
+    )
+    return [
+        {
+            "year": row["year"],
+            "type": row[type_field],
+            "status": row["status"],
+            "delivery_method": row["delivery_method"],
+            "count": row["count"],
+        }
+        for row in rows
+    ]
+
+
+def _build_counts():
+    setting = AppSetting.objects.first() or AppSetting.objects.create()
+    documents = _grouped(Document, "doc_type")
+    reports = _grouped(Report, "report_type")
+    years = {row["year"] for row in documents} | {row["year"] for row in reports}
+    years.add(setting.working_year)
+    return {
+        "working_year": setting.working_year,
+        "reference_year": setting.reference_year,
+        "years": sorted(years, reverse=True),
+        "customers": {"total": Customer.objects.filter(is_archived=False).count()},
+        "documents": documents,
+        "reports": reports,
+    }
+
+
+def _build_recent(year: int, limit: int = 5):
+    docs = (
+        Document.objects.filter(year=year, is_archived=False)
+        .order_by("-created_at")
+        .values("id", "doc_no", "subject", "created_at")[:limit]
+    )
+    reps = (
+        Report.objects.filter(year=year, is_archived=False)
+        .order_by("-created_at")
+        .values("id", "report_no", "subject", "created_at")[:limit]
+    )
+    rows = [
+        {"id": f"doc-{d['id']}", "title": d["doc_no"], "subtitle": d["subject"] or "Evrak", "date": d["created_at"]}
+        for d in docs
+    ] + [
+        {"id": f"rep-{r['id']}", "title": r["report_no"], "subtitle": r["subject"] or "Rapor", "date": r["created_at"]}
+        for r in reps
+    ]
+    rows.sort(key=lambda r: r["date"], reverse=True)
+    return rows[:limit]
+
+
+def get_dashboard(year: int | None = None) -> dict:
+    version = _version()
+    data = cache.get_or_set(f"dashboard:{version}:counts", _build_counts, CACHE_TIMEOUT)
+    year = year or data["working_year"]
+    recent = cache.get_or_set(f"dashboard:{version}:recent:{year}", lambda: _build_recent(year), CACHE_TIMEOUT)
+    return {**data, "year": year, "recent": recent}
@@ -0,0 +1,347 @@
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from openpyxl.utils import get_column_letter
+from rest_framework.exceptions import ValidationError
+
+from .models import Contract, Customer, Document, Report
+from .streaming import streaming_response
+
+CHUNK_SIZE = 2000
+FILTER_PARAMS = ("q", "customer", "status", "type", "date_from", "date_to")
+
+
+def _text(value) -> str:
+    return str(value) if value not in (None, "") else "-"
+
+
+def _status(value) -> str:
+    return "Tamamlandi" if value == "DONE" else "Acik"
+
+
+def _date(value) -> str:
+    return value.isoformat() if value else "-"
+
+
+def _contract(contract_id, contract_no) -> str:
+    if not contract_id:
+        return "-"
+    return contract_no or f"Sozlesme #{contract_id}"
+
+
+# Tür -> model, liste sırası (viewset'in keyset_ordering'i), liste sayfasındaki kolonlar,
+# okunacak alanlar (values_list) ve satır biçimi.
+# Filtreler: ``search`` alanlarında ?q=, ``type_field`` için ?type=, ``date_field`` için
+# ?date_from=/?date_to= (tarihi boş kayıtlar listede kalır), ilişkili türlerde ?status=.
+# ?customer= viewset'lerin get_queryset'inde uygulanır.
+EXPORTS = {
+    "customers": {
+        "model": Customer,
+        "ordering": ("-created_at", "-id"),
+        "title": "Mukellef Liste Raporu",
+        "columns": ["Mukellef", "Kimlik", "Telefon", "E-posta", "Yetkili", "Yetkili E-posta"],
+        "fields": ("name", "identity_type", "tckn", "tax_no", "phone", "email", "contact_person", "contact_email"),
+        "row": lambda name, identity, tckn, tax_no, phone, email, person, contact_email: [
+            _text(name),
+            _text(tckn if identity == "TCKN" else tax_no),
+            _text(phone),
+            _text(email),
+            _text(person),
+            _text(contact_email),
+        ],
+        "search": ("name", "tax_no", "tckn", "email"),
+    },
+    "documents": {
+        "model": Document,
+        "ordering": ("-year", "-serial", "-id"),
+        "title": "Evrak Liste Raporu",
+        "columns": ["No", "Mukellef", "Sozlesme", "Evrak Turu", "Durum", "Tarih", "Konu"],
+        "fields": (
+            "doc_no",
+            "customer__name",
+            "contract_id",
+            "contract__contract_no",
+            "doc_type",
+            "status",
+            "received_date",
+            "subject",
+        ),
+        "row": lambda no, customer, contract_id, contract_no, doc_type, status, date, subject: [
+            no,
+            _text(customer),
+            _contract(contract_id, contract_no),
+            doc_type,
+            _status(status),
+            _date(date),
+            _text(subject),
+        ],
+        "search": ("doc_no", "subject"),
+        "type_field": "doc_type",
+        "date_field": "received_date",
+        "related": True,
+    },
+    "reports": {
+        "model": Report,
+        "ordering": ("-year", "-year_serial_all", "-id"),
+        "title": "Rapor Liste Raporu",
+        "columns": ["No", "Mukellef", "Sozlesme", "Rapor Turu", "Durum", "Tarih", "Konu"],
+        "fields": (
+            "report_no",
+            "customer__name",
+            "contract_id",
+            "contract__contract_no",
+            "report_type",
+            "status",
+            "received_date",
+            "subject",
+        ),
+        "row": lambda no, customer, contract_id, contract_no, report_type, status, date, subject: [
+            no,
+            _text(customer),
+            _contract(contract_id, contract_no),
+            report_type,
+            _status(status),
+            _date(date),
+            _text(subject),
+        ],
+        "search": ("report_no", "subject"),
+        "type_field": "report_type",
+        "date_field": "received_date",
+        "related": True,
+    },
+    "contracts": {
+        "model": Contract,
+        "ordering": ("-created_at", "-id"),
+        "title": "Sozlesme Liste Raporu",
+        "columns": ["Sozlesme No", "Mukellef", "Sozlesme Turu", "Durum", "Tarih"],
+        "fields": ("contract_no", "customer__name", "contract_type", "status", "contract_date"),
+        "row": lambda no, customer, contract_type, status, date: [
+            _text(no),
+            _text(customer),
+            _text(contract_type),
+            _status(status),
+            _date(date),
+        ],
+        "search": ("contract_no",),
+        "type_field": "contract_type",
+        "date_field": "contract_date",
+        "related": True,
+    },
+}
+
+
+def _param_date(params, name: str):
+    raw = params.get(name)
+    if not raw:
+        return None
+    value = parse_date(raw)
+    if value is None:
+        raise ValidationError({name: "Geçersiz tarih (YYYY-AA-GG)."})
+    return value
+
+
+def filter_queryset(kind: str, qs, params):
+    """Liste sayfasının filtrelerini sorguya uygular; liste ve dışa aktarım aynı sonucu verir."""
+
+    spec = EXPORTS[kind]
+    if spec.get("related") and params.get("status"):
+        qs = qs.filter(status=params["status"])
+    if spec.get("type_field") and params.get("type"):
+        qs = qs.filter(**{spec["type_field"]: params["type"]})
+    date_field = spec.get("date_field")
+    if date_field:
+        date_from = _param_date(params, "date_from")
+        date_to = _param_date(params, "date_to")
+        if date_from or date_to:
+            window = Q()
+            if date_from:
+                window &= Q(**{f"{date_field}__gte": date_from})
+            if date_to:
+                window &= Q(**{f"{date_field}__lte": date_to})
+            qs = qs.filter(window | Q(**{f"{date_field}__isnull": True}))
+    q = (params.get("q") or "").strip()
+    if q:
+        match = Q()
+        for name in spec["search"]:
+            match |= Q(**{f"{name}__icontains": q})
+        qs = qs.filter(match)
+    return qs
+
+
+def export_filters(params) -> dict:
+    """İstekteki dolu liste filtreleri; iş kaydında saklanır ve tekrar eden dışa aktarımı ayırt eder."""
+
+    return {name: str(params[name]).strip() for name in FILTER_PARAMS if str(params.get(name) or "").strip()}
+
+
+def build_queryset(kind: str, filters: dict):
+    """Viewset dışında (worker) liste sorgusu: arşivlenmemiş kayıtlar, liste filtreleri ve liste sırası."""
+
+    spec = EXPORTS[kind]
+    qs = spec["model"].objects.filter(is_archived=False)
+    customer = filters.get("customer")
+    if spec.get("related") and customer:
+        if not customer.isdigit():
+            raise ValidationError({"customer": "Geçersiz müşteri."})
+        qs = qs.filter(customer_id=customer)
+    return filter_queryset(kind, qs, filters).order_by(*spec["ordering"])
+
+
+def iter_table(kind: str, qs):
+    """Satırları sunucu tarafı imleçle ``CHUNK_SIZE``'lık parçalar halinde okur."""
+
+    spec = EXPORTS[kind]
+    build = spec["row"]
+    for values in qs.values_list(*spec["fields"]).iterator(chunk_size=CHUNK_SIZE):
+        yield build(*values)
+
+
+class _Echo:
+    """csv.writer'ın yazdığı satırı tamponlamadan geri verir."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_stream(columns, rows):
+    writer = csv.writer(_Echo())
+    # Excel Türkçe karakterleri doğru açsın diye BOM ile başlar (mail ekindeki CSV ile aynı).
+    yield "\ufeff" + writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class _Pipe:
+    """ZipFile'ın yazdığı baytları toplar; akış her parçadan sonra boşaltır (seek desteklemez)."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '<Relationship Id="rId2" Target="styles.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"/>'
+        "</Relationships>"
+    ),
+    "xl/styles.xml": (
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        "</styleSheet>"
+    ),
+}
+# XML 1.0'da yazılamayan kontrol karakterleri hücreden atılır.
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _sheet_row(number: int, values, letters, style: str = "") -> str:
+    cells = "".join(
+        f'<c r="{letter}{number}" t="inlineStr"{style}><is><t xml:space="preserve">'
+        f"{escape(_ILLEGAL_XML.sub('', str(value)))}</t></is></c>"
+        for letter, value in zip(letters, values)
+    )
+    return f'<row r="{number}">{cells}</row>'
+
+
+def _xlsx_stream(title: str, columns, rows):
+    """Tek sayfalık XLSX'i zip olarak parça parça üretir; çalışma kitabı bellekte tutulmaz."""
+
+    pipe = _Pipe()
+    letters = [get_column_letter(idx) for idx in range(1, len(columns) + 1)]
+    sheet_name = escape(_ILLEGAL_XML.sub("", title))[:31] or "Liste"
+    with zipfile.ZipFile(pipe, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, body in _XLSX_PARTS.items():
+            archive.writestr(name, _XML + body)
+        archive.writestr(
+            "xl/workbook.xml",
+            _XML
+            + '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets></workbook>',
+        )
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                (
+                    _XML + '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                    + _sheet_row(1, columns, letters, ' s="1"')
+                ).encode("utf-8")
+            )
+            buffer = []
+            for number, row in enumerate(rows, start=2):
+                buffer.append(_sheet_row(number, row, letters))
+                if len(buffer) >= 500:
+                    sheet.write("".join(buffer).encode("utf-8"))
+                    buffer = []
+                    yield pipe.drain()
+            sheet.write(("".join(buffer) + "</sheetData></worksheet>").encode("utf-8"))
+    yield pipe.drain()
+
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+
+def stream_export(kind: str, qs, file_format: str, filename: str) -> StreamingHttpResponse:
+    """Filtrelenmiş sorguyu CSV ya da XLSX olarak akıtır; bellek kullanımı kayıt sayısından bağımsızdır."""
+
+    spec = EXPORTS[kind]
+    rows = iter_table(kind, qs)
+    if file_format == "xlsx":
+        content = _xlsx_stream(spec["title"], spec["columns"], rows)
+    else:
+        content = _csv_stream(spec["columns"], rows)
+    content_type, extension = FORMATS[file_format]
+    response = streaming_response(content, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{extension}"'
+    response["Cache-Control"] = "no-store"
+    response["X-Accel-Buffering"] = "no"
+    return response
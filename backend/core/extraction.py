@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from io import BytesIO
+
+import billiard
+from PyPDF2 import PdfReader
+
+from .contract_parser import parse_contract
+
+# Sözleşme alanları neredeyse her zaman ilk sayfalardadır; PDF pencere pencere okunur.
+PAGE_WINDOW = int(os.environ.get("CONTRACT_PAGE_WINDOW", "3"))
+MAX_PAGES = int(os.environ.get("CONTRACT_MAX_PAGES", "20"))
+TIMEOUT = float(os.environ.get("CONTRACT_EXTRACT_TIMEOUT", "30"))
+WORKERS = int(os.environ.get("CONTRACT_EXTRACT_WORKERS", "2"))
+
+# Bu alanların hepsi bulununca kalan sayfalar okunmaz.
+REQUIRED_FIELDS = ("contract_no", "contract_type", "tax_no", "contract_date")
+
+
+class ExtractionError(Exception):
+    pass
+
+
+class ExtractionTimeout(ExtractionError):
+    pass
+
+
+def _complete(parsed: dict) -> bool:
+    return all(parsed.get(field) for field in REQUIRED_FIELDS)
+
+
+def extract(raw: bytes, *, window: int | None = None, max_pages: int | None = None, on_progress=None) -> dict:
+    """PDF metnini ilk ``max_pages`` sayfadan pencereler halinde çıkarıp ayrıştırır.
+
+    Her pencereden sonra metin ayrıştırılır; zorunlu alanlar bulunduysa okuma biter.
+    ``re.search`` ilk eşleşmeyi aldığı için erken çıkış, bulunan alanları değiştirmez.
+    Dönüş: ``{"text", "parsed", "confidence", "pages", "total"}``.
+    """
+
+    window = max(1, window or PAGE_WINDOW)
+    max_pages = max(1, max_pages or MAX_PAGES)
+    try:
+        reader = PdfReader(BytesIO(raw))
+        total = len(reader.pages)
+    except Exception:
+        empty = parse_contract("")
+        return {"text": "", "parsed": empty["fields"], "confidence": empty["confidence"], "pages": 0, "total": 0}
+
+    limit = min(total, max_pages)
+    chunks = []
+    result = parse_contract("")
+    for start in range(0, limit, window):
+        for index in range(start, min(start + window, limit)):
+            try:
+                chunks.append(reader.pages[index].extract_text() or "")
+            except Exception:
+                chunks.append("")
+        result = parse_contract("\n".join(chunks))
+        if on_progress:
+            on_progress(len(chunks), total)
+        if _complete(result["fields"]):
+            break
+    return {
+        "text": "\n".join(chunks),
+        "parsed": result["fields"],
+        "confidence": result["confidence"],
+        "pages": len(chunks),
+        "total": total,
+    }
+
+
+def _child(conn, raw, window, max_pages):
+    try:
+        result = extract(
+            raw,
+            window=window,
+            max_pages=max_pages,
+            on_progress=lambda done, total: conn.send(("progress", done, total)),
+        )
+        conn.send(("ok", result))
+    except Exception as exc:
+        conn.send(("error", str(exc)))
+    finally:
+        conn.close()
+
+
+class ExtractionPool:
+    """Her belgeyi ayrı bir süreçte, süre sınırıyla işler; aynı anda en fazla ``workers`` süreç.
+
+    Süresi dolan belgenin süreci öldürülür, böylece takılan bir PDF worker'ı kilitlemez.
+    Celery worker süreçleri daemon olduğundan standart ``multiprocessing`` alt süreç
+    açamaz; Celery'nin kullandığı ``billiard`` ile forkserver üzerinden çalışılır.
+    """
+
+    def __init__(self, workers: int | None = None, timeout: float | None = None):
+        self.workers = workers or WORKERS
+        self.timeout = timeout or TIMEOUT
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._ctx = billiard.get_context("forkserver")
+        self._ctx.set_forkserver_preload([__name__])
+
+    def extract(self, raw: bytes, *, window=None, max_pages=None, timeout=None, on_progress=None) -> dict:
+        timeout = timeout or self.timeout
+        with self._slots:
+            recv, send = self._ctx.Pipe(duplex=False)
+            proc = self._ctx.Process(target=_child, args=(send, raw, window, max_pages), daemon=True)
+            proc.start()
+            send.close()
+            deadline = time.monotonic() + timeout
+            try:
+                while True:
+                    if not recv.poll(max(deadline - time.monotonic(), 0)):
+                        raise ExtractionTimeout(f"PDF {timeout:g} sn içinde okunamadı.")
+                    message = recv.recv()
+                    if message[0] == "progress":
+                        if on_progress:
+                            on_progress(message[1], message[2])
+                        continue
+                    break
+            except EOFError:
+                raise ExtractionError("PDF okuma süreci beklenmedik şekilde sonlandı.")
+            finally:
+                if proc.is_alive():
+                    proc.terminate()
+                proc.join()
+                recv.close()
+        if message[0] == "error":
+            raise ExtractionError(message[1])
+        return message[1]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool() -> ExtractionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool()
+    return _pool
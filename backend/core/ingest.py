@@ -0,0 +1,51 @@
+import logging
+from datetime import date
+
+from . import extraction, realtime
+from .models import ContractJob
+from .storage import bucket_name, s3_client
+
+logger = logging.getLogger(__name__)
+
+# İş durumları: yüklendi -> metin çıkarılıyor -> ayrıştırılıyor -> onay bekliyor -> sözleşme oluşturuldu.
+PENDING = "pending"
+EXTRACTING = "extracting"
+PARSING = "parsing"
+READY = "ready"
+DONE = "done"
+FAILED = "failed"
+
+
+def _set_status(job: ContractJob, status: str, **payload):
+    job.status = status
+    job.payload = {**job.payload, **payload}
+    job.save(update_fields=["status", "payload", "updated_at"])
+    if job.created_by_id:
+        realtime.publish([job.created_by_id], "contract_job", {"id": job.id, "status": status})
+
+
+def _jsonable(parsed: dict) -> dict:
+    return {key: value.isoformat() if isinstance(value, date) else value for key, value in parsed.items()}
+
+
+def run_contract_job(job_id: int) -> str:
+    """Yüklenen sözleşme PDF'inden alanları çıkarır ve ``payload["parsed"]`` içine yazar."""
+
+    job = ContractJob.objects.get(id=job_id)
+    if job.status not in (PENDING, EXTRACTING, PARSING):
+        # Kuyruktan ikinci kez gelen iş tamamlanmış sonucu bozmaz.
+        return job.status
+    try:
+        _set_status(job, EXTRACTING)
+        key = job.payload["file"]["key"]
+        raw = s3_client().get_object(Bucket=bucket_name(), Key=key)["Body"].read()
+        result = extraction.pool().extract(
+            raw, on_progress=lambda done, total: _set_status(job, EXTRACTING, progress={"pages": done, "total": total})
+        )
+        _set_status(job, PARSING)
+    except Exception as exc:
+        logger.warning("Sözleşme işi %s başarısız: %s", job_id, exc)
+        _set_status(job, FAILED, error=str(exc))
+        return FAILED
+    _set_status(job, READY, parsed=_jsonable(result["parsed"]), confidence=result["confidence"])
+    return READY
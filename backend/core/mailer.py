@@ -0,0 +1,527 @@
+import csv
+import os
+import smtplib
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import PageBreak, SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+from .models import AppSetting, MailOutbox, Note
+from .storage import bucket_name, extract_key, s3_client
+
+
+# SENDING durumunda bu süreden uzun kalan kayıt, çökmüş bir işçiden kalmış sayılır.
+STALE_SENDING = timedelta(minutes=10)
+# Bu kadar boşta kalan SMTP oturumu gönderimden önce NOOP ile yoklanır.
+PROBE_AFTER_SECONDS = 5
+SMTP_VERSION_KEY = "smtp:version"
+ATTACH_WORKERS = int(os.environ.get("MAIL_ATTACH_WORKERS", "8"))
+ATTACH_MAX_BYTES = int(os.environ.get("MAIL_ATTACH_MAX_BYTES", str(20 * 1024 * 1024)))
+ATTACH_SPOOL_BYTES = int(os.environ.get("MAIL_ATTACH_SPOOL_BYTES", str(2 * 1024 * 1024)))
+# Maildeki indirme bağlantıları S3 imzasının izin verdiği en uzun süre (7 gün) geçerlidir.
+ATTACH_LINK_EXPIRES = 7 * 24 * 3600
+_settings_cache = {}
+
+
+def invalidate_smtp():
+    # Ayar değişince tüm süreçlerdeki havuzlar bir sonraki gönderimde yeniden kurulur.
+    try:
+        cache.set(SMTP_VERSION_KEY, time.time_ns(), None)
+    except Exception:
+        pass
+
+
+def _smtp_version():
+    try:
+        version = cache.get(SMTP_VERSION_KEY)
+        if version is None:
+            cache.add(SMTP_VERSION_KEY, time.time_ns(), None)
+            version = cache.get(SMTP_VERSION_KEY)
+        return version
+    except Exception:
+        return None
+
+
+def smtp_settings() -> dict:
+    """Geçerli SMTP ayarları; AppSetting yalnızca sürüm değişince yeniden okunur."""
+
+    version = _smtp_version()
+    if version is not None and _settings_cache.get("version") == version:
+        return _settings_cache["value"]
+    cfg = AppSetting.objects.first() or AppSetting.objects.create()
+    if cfg.smtp_host and cfg.smtp_user and cfg.smtp_from_email:
+        value = {
+            "backend": {
+                "backend": "django.core.mail.backends.smtp.EmailBackend",
+                "host": cfg.smtp_host,
+                "port": cfg.smtp_port or 587,
+                "username": cfg.smtp_user,
+                "password": cfg.smtp_password or "",
+                "use_tls": bool(cfg.smtp_use_tls),
+                "use_ssl": bool(cfg.smtp_use_ssl),
+            },
+            "from_email": cfg.smtp_from_email,
+        }
+    else:
+        value = {
+            "backend": {},
+            "from_email": os.environ.get("DEFAULT_FROM_EMAIL", "ymm-otomasyon@localhost"),
+        }
+    _settings_cache.update(version=version, value=value)
+    return value
+
+
+def from_email() -> str:
+    return smtp_settings()["from_email"]
+
+
+class SMTPPool:
+    """Süreç başına, ayar imzasıyla anahtarlanmış tek bir açık SMTP oturumu.
+
+    Her gönderimde TCP+TLS+AUTH tekrarlanmaz; ayarlar değişince ya da oturum
+    ``idle_seconds`` boyunca kullanılmazsa bağlantı kapatılıp yeniden açılır.
+    """
+
+    def __init__(self, idle_seconds: int = 60):
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._key = None
+        self._connection = None
+        self._last_used = 0.0
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+        self._connection = None
+
+    def _acquire(self, options: dict):
+        key = tuple(sorted(options.items()))
+        idle = time.monotonic() - self._last_used > self.idle_seconds
+        if self._connection is None or key != self._key or idle:
+            self._close()
+            self._connection = get_connection(fail_silently=False, **options)
+            self._connection.open()
+            self._key = key
+        return self._connection
+
+    def _alive(self, connection) -> bool:
+        smtp = getattr(connection, "connection", None)
+        if smtp is None:
+            return True
+        try:
+            return smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def send(self, messages, options: dict | None = None) -> list:
+        """Mesajları tek oturumda sırayla gönderir; her mesaj için hata ya da ``None`` döner.
+
+        Bir süre kullanılmamış oturum önce ``NOOP`` ile yoklanır ve kopmuşsa mesaj DATA'dan
+        önce yeni bağlantıyla gönderilir. Gönderim sırasında kopan bağlantıda sunucu mesajı
+        almış olabileceğinden yeniden denenmez; hata döner ve kayıt kuyruğa geri konur.
+        """
+
+        options = smtp_settings()["backend"] if options is None else options
+        results = []
+        with self._lock:
+            for message in messages:
+                try:
+                    probe = time.monotonic() - self._last_used > PROBE_AFTER_SECONDS
+                    connection = self._acquire(options)
+                    if probe and not self._alive(connection):
+                        self._close()
+                        connection = self._acquire(options)
+                    message.connection = connection
+                    connection.send_messages([message])
+                    results.append(None)
+                except (smtplib.SMTPServerDisconnected, ConnectionError) as exc:
+                    self._close()
+                    results.append(exc)
+                except Exception as exc:
+                    results.append(exc)
+                finally:
+                    self._last_used = time.monotonic()
+        return results
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+pool = SMTPPool()
+
+
+def send_messages(messages) -> list:
+    return pool.send(messages)
+
+
+_TABLE_FONT = "Helvetica"
+_TABLE_HEADER_FONT = "Helvetica-Bold"
+_TABLE_FONT_SIZE = 9
+_TABLE_PADDING = 4
+_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#ece4d9")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+        ("GRID", (0, 0), (-1, -1), 0.6, colors.HexColor("#bdbdbd")),
+        ("FONTNAME", (0, 0), (-1, 0), _TABLE_HEADER_FONT),
+        ("FONTNAME", (0, 1), (-1, -1), _TABLE_FONT),
+        ("FONTSIZE", (0, 0), (-1, -1), _TABLE_FONT_SIZE),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("LEFTPADDING", (0, 0), (-1, -1), _TABLE_PADDING),
+        ("RIGHTPADDING", (0, 0), (-1, -1), _TABLE_PADDING),
+        ("TOPPADDING", (0, 0), (-1, -1), _TABLE_PADDING),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), _TABLE_PADDING),
+    ]
+)
+
+
+def _column_widths(columns, rows) -> list[float]:
+    # Tablo parçalara bölündüğünde kolonlar hizalı kalsın diye genişlikler tüm satırlardan bir kez hesaplanır
+    # (reportlab'in kendi hesabıyla aynı: en geniş hücre + iç boşluk).
+    widths = [stringWidth(column, _TABLE_HEADER_FONT, _TABLE_FONT_SIZE) for column in columns]
+    for row in rows:
+        for idx, value in enumerate(row[: len(widths)]):
+            width = stringWidth(value, _TABLE_FONT, _TABLE_FONT_SIZE)
+            if width > widths[idx]:
+                widths[idx] = width
+    return [width + 2 * _TABLE_PADDING for width in widths]
+
+
+def _table_height(rows, widths) -> float:
+    return Table(rows, colWidths=widths, style=_TABLE_STYLE).wrap(0, 0)[1]
+
+
+def write_table_pdf(target, title: str, columns, rows, note_text: str | None = None):
+    """Tablo PDF'ini ``target``'a (dosya yolu ya da dosya nesnesi) yazar.
+
+    Tek bir ``Table`` her sayfa bölünmesinde kalan tüm satırları yeniden ölçtüğünden binlerce
+    satırda süre karesel artar. Satırlar tek satırlık hücrelere indirgenip sayfa boyu
+    tablolara ayrılır; görünüm aynıdır (her sayfada başlık satırı), süre satır sayısıyla doğrusal.
+    """
+
+    columns = [str(column) for column in columns]
+    rows = [[" ".join(str(value).splitlines()) for value in row] for row in rows]
+    pagesize = landscape(A4) if len(columns) > 6 else A4
+    doc = SimpleDocTemplate(
+        target,
+        pagesize=pagesize,
+        leftMargin=24,
+        rightMargin=24,
+        topMargin=24,
+        bottomMargin=24,
+    )
+    styles = getSampleStyleSheet()
+    story = [
+        Paragraph(title, styles["Title"]),
+        Paragraph(f"Tarih: {timezone.localtime().strftime('%d.%m.%Y %H:%M')}", styles["Normal"]),
+    ]
+    if note_text and note_text.strip():
+        story.append(Spacer(1, 8))
+        story.append(Paragraph(f"Aciklama: {note_text.strip()}", styles["Normal"]))
+    story.append(Spacer(1, 12))
+
+    widths = _column_widths(columns, rows)
+    # SimpleDocTemplate çerçevesinin iç boşluğu her kenarda 6 pt'dir.
+    frame_width = doc.width - 12
+    frame_height = doc.height - 12
+    used = 0.0
+    for flowable in story:
+        used += flowable.wrap(frame_width, frame_height)[1] + flowable.getSpaceBefore() + flowable.getSpaceAfter()
+    header_height = _table_height([columns], widths)
+    row_height = _table_height([columns, rows[0]], widths) - header_height if rows else header_height
+    per_page = max(int((frame_height - header_height) // row_height), 1)
+    # İlk sayfada başlık bloğu yer kaplar. Hesap tutmazsa reportlab tabloyu yine böler, satır kaybolmaz.
+    first = max(int((frame_height - used - header_height) // row_height), 1)
+
+    start = 0
+    size = first
+    while True:
+        story.append(Table([columns] + rows[start : start + size], colWidths=widths, repeatRows=1, style=_TABLE_STYLE))
+        start += size
+        size = per_page
+        if start >= len(rows):
+            break
+        story.append(PageBreak())
+    doc.build(story)
+
+
+def build_table_pdf(title: str, columns, rows, note_text: str | None = None) -> bytes:
+    buffer = BytesIO()
+    write_table_pdf(buffer, title, columns, rows, note_text)
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
+
+
+def file_attachments(files_qs) -> list:
+    """Dosya kayıtlarını kuyrukta saklanacak ek tanımlarına çevirir; indirme işçide yapılır."""
+
+    return [
+        {
+            "filename": f.filename,
+            "content_type": f.content_type or "application/octet-stream",
+            "url": f.url,
+            "size": f.size,
+        }
+        for f in files_qs
+        if f.url
+    ]
+
+
+def table_attachment(title: str, columns, rows, note_text: str, attachment_format: str) -> dict:
+    return {
+        "table": {
+            "title": title,
+            "columns": [str(c) for c in columns],
+            "rows": rows,
+            "note": note_text,
+            "format": attachment_format,
+        }
+    }
+
+
+def _render_table(spec: dict):
+    title = spec["title"]
+    columns = spec["columns"]
+    rows = spec["rows"]
+    safe_name = title.replace(" ", "_")
+    if spec.get("format") == "csv":
+        sio = StringIO()
+        writer = csv.writer(sio)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+        return f"{safe_name}.csv", sio.getvalue().encode("utf-8-sig"), "text/csv"
+    return f"{safe_name}.pdf", build_table_pdf(title, columns, rows, spec.get("note")), "application/pdf"
+
+
+class _TooLarge(Exception):
+    pass
+
+
+def _download(s3, bucket: str, key: str, limit: int):
+    """Nesneyi parça parça okur; eşik üstü içerik bellekte değil diskte tutulur."""
+
+    obj = s3.get_object(Bucket=bucket, Key=key)
+    body = obj["Body"]
+    if (obj.get("ContentLength") or 0) > limit:
+        body.close()
+        raise _TooLarge(key)
+    spool = tempfile.SpooledTemporaryFile(max_size=ATTACH_SPOOL_BYTES)
+    try:
+        for chunk in body.iter_chunks(1024 * 1024):
+            spool.write(chunk)
+            if spool.tell() > limit:
+                raise _TooLarge(key)
+    except BaseException:
+        spool.close()
+        raise
+    finally:
+        body.close()
+    spool.seek(0)
+    return spool
+
+
+def _download_link(key: str) -> str:
+    client = s3_client(endpoint_override=os.environ.get("MINIO_PUBLIC_ENDPOINT"))
+    return client.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": bucket_name(), "Key": key},
+        ExpiresIn=ATTACH_LINK_EXPIRES,
+    )
+
+
+def fetch_attachments(items) -> tuple[list, list]:
+    """Dosya eklerini paralel indirir; ``([(item, spool)], [(item, link)])`` döner.
+
+    Toplam boyut ``ATTACH_MAX_BYTES`` ile sınırlıdır. Sığmayan ya da
+    indirilemeyen dosyalar sessizce atlanmaz, imzalı indirme bağlantısına döner.
+    """
+
+    bucket = bucket_name()
+    budget = ATTACH_MAX_BYTES
+    planned = []
+    links = []
+    for item in items:
+        key = extract_key(item.get("url"), bucket)
+        if not key:
+            continue
+        size = int(item.get("size") or 0)
+        if size > budget:
+            links.append((item, key))
+            continue
+        budget -= size
+        planned.append((item, key))
+
+    fetched = []
+    if planned:
+        s3 = s3_client()
+        workers = max(1, min(ATTACH_WORKERS, len(planned)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                (item, key, executor.submit(_download, s3, bucket, key, ATTACH_MAX_BYTES)) for item, key in planned
+            ]
+            total = 0
+            for item, key, future in futures:
+                try:
+                    spool = future.result()
+                except Exception:
+                    links.append((item, key))
+                    continue
+                size = spool.seek(0, os.SEEK_END)
+                spool.seek(0)
+                # Kayıttaki boyut eksik/yanlışsa sınır gerçek boyutla yeniden uygulanır.
+                if total + size > ATTACH_MAX_BYTES:
+                    spool.close()
+                    links.append((item, key))
+                    continue
+                total += size
+                fetched.append((item, spool))
+
+    resolved = []
+    for item, key in links:
+        try:
+            resolved.append((item, _download_link(key)))
+        except Exception:
+            resolved.append((item, None))
+    return fetched, resolved
+
+
+def build_message(outbox: MailOutbox, sender: str) -> tuple[EmailMessage, int]:
+    files = [item for item in outbox.attachments if "table" not in item]
+    fetched, links = fetch_attachments(files)
+    body = outbox.body
+    if links:
+        lines = [f"- {item['filename']}: {url or '(bağlantı oluşturulamadı)'}" for item, url in links]
+        body = f"{body}\n\nEkte gönderilemeyen dosyalar (indirme bağlantısı):\n" + "\n".join(lines)
+    message = EmailMessage(
+        subject=outbox.subject,
+        body=body,
+        from_email=sender,
+        to=outbox.to,
+    )
+    attached_count = 0
+    for item in outbox.attachments:
+        if "table" in item:
+            message.attach(*_render_table(item["table"]))
+            attached_count += 1
+    for item, spool in fetched:
+        with spool:
+            message.attach(item["filename"], spool.read(), item.get("content_type") or "application/octet-stream")
+        attached_count += 1
+    return message, attached_count
+
+
+def enqueue(*, user, subject: str, body: str, to, attachments=None, note=None, idempotency_key=None) -> MailOutbox:
+    """Maili kuyruğa yazar ve işlem tamamlanınca gönderim görevini başlatır.
+
+    Aynı kullanıcıdan aynı ``idempotency_key`` ile gelen tekrar istekler mevcut kaydı döner;
+    eşzamanlı iki istekten ikincisi benzersizlik kısıtına takılır ve ilkinin kaydını alır.
+    """
+
+    from .tasks import send_outbox_mail
+
+    idempotency_key = (idempotency_key or "").strip()[:128] or None
+    if idempotency_key:
+        existing = MailOutbox.objects.filter(created_by=user, idempotency_key=idempotency_key).first()
+        if existing:
+            return existing
+    try:
+        with transaction.atomic():
+            outbox = MailOutbox.objects.create(
+                subject=subject,
+                body=body,
+                to=list(to),
+                attachments=attachments or [],
+                note=note,
+                idempotency_key=idempotency_key,
+                created_by=user,
+                updated_by=user,
+            )
+    except IntegrityError:
+        if not idempotency_key:
+            raise
+        return MailOutbox.objects.get(created_by=user, idempotency_key=idempotency_key)
+    transaction.on_commit(lambda: send_outbox_mail.delay(outbox.id))
+    return outbox
+
+
+def _claim(outbox_id: int) -> MailOutbox | None:
+    with transaction.atomic():
+        outbox = MailOutbox.objects.select_for_update().filter(id=outbox_id).first()
+        if not outbox or outbox.status in ("SENT", "FAILED"):
+            return None
+        if outbox.status == "SENDING" and outbox.updated_at > timezone.now() - STALE_SENDING:
+            return None
+        outbox.status = "SENDING"
+        outbox.attempts += 1
+        outbox.save(update_fields=["status", "attempts", "updated_at"])
+    return outbox
+
+
+def _finish(outbox: MailOutbox, error, final: bool):
+    now = timezone.now()
+    if error is not None:
+        MailOutbox.objects.filter(id=outbox.id).update(
+            status="FAILED" if final else "QUEUED",
+            last_error=str(error)[:2000],
+            updated_at=now,
+        )
+        return
+    MailOutbox.objects.filter(id=outbox.id).update(status="SENT", sent_at=now, last_error=None, updated_at=now)
+    if outbox.note_id:
+        Note.objects.filter(id=outbox.note_id).update(mail_sent_at=now, mail_sent_to=outbox.to, updated_at=now)
+
+
+def deliver_many(outbox_ids, final: bool = False, max_attempts: int | None = None) -> dict:
+    """Kuyruktaki mailleri süreç başına açık SMTP oturumunda gönderir; ``{id: hata|None}`` döner.
+
+    Mailler tek tek alınır, oluşturulur ve gönderilir; ekleri bellekte aynı anda tek
+    mail kadar yer tutar. Başka bir işçinin aldığı ya da zaten gönderilmiş kayıtlar
+    atlanır, böylece aynı mail ikinci kez gönderilmez. ``max_attempts`` denemesine
+    ulaşan kaydın hatası kalıcı sayılır.
+    """
+
+    sender = None
+    results = {}
+    for outbox_id in outbox_ids:
+        outbox = _claim(outbox_id)
+        if outbox is None:
+            continue
+        last = final or (max_attempts is not None and outbox.attempts >= max_attempts)
+        try:
+            sender = sender or from_email()
+            message = build_message(outbox, sender)[0]
+        except Exception as exc:
+            error = exc
+        else:
+            error = pool.send([message])[0]
+        results[outbox.id] = error
+        _finish(outbox, error, last)
+    return results
+
+
+def deliver(outbox_id: int, final: bool = False) -> bool:
+    """Tek kaydı gönderir; hata Celery'nin yeniden denemesi için yükseltilir."""
+
+    results = deliver_many([outbox_id], final=final)
+    error = results.get(outbox_id)
+    if error is not None:
+        raise error
+    return outbox_id in results
@@ -0,0 +1,171 @@
+import random
+import re
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.contract_parser import parse_contract, parse_contract_text
+
+NAMES = ["Örnek Tekstil A.Ş.", "Yılmaz Gıda Ltd. Şti.", "ÇAĞRI İNŞAAT A.Ş.", "Güneş Otomotiv", "Deniz Lojistik Ltd."]
+OFFICES = ["Kadıköy", "Büyük Mükellefler", "Çankaya", "Konak", "Nilüfer"]
+TYPES = ["TAM TASDİK", "KDV İadesi", "Özel Amaçlı Rapor", "Sınırlı Denetim"]
+PEOPLE = ["Ali Veli", "Ayşe Öztürk", "Mehmet Çelik", "Zeynep Şahin"]
+# Dönem aralığı PDF'ten satır sonunda bölünmüş gelebilir.
+PERIOD_SEPS = [" - ", " -\n", "\n- "]
+FILLER = [
+    "Taraflar işbu sözleşmenin eki olan belgelerde yer alan hükümleri kabul eder.",
+    "Yeminli mali müşavir, 3568 sayılı Kanun kapsamında tasdik işlemlerini yürütür.",
+    "Ücret, her dönem sonunda fatura karşılığında ödenir.",
+    "İşbu sözleşmeden doğan uyuşmazlıklarda İstanbul mahkemeleri yetkilidir.",
+]
+
+
+def make_text(rng: random.Random) -> str:
+    """Etiket yazımı, harf büyüklüğü ve satır kırılımı değişen sentetik sözleşme metni."""
+
+    def label(text):
+        if " " in text and rng.random() < 0.1:
+            # PDF metninde iki kelimelik etiketler satır sonunda bölünebilir.
+            text = text.replace(" ", "\n", 1)
+        choice = rng.random()
+        if choice < 0.2:
+            return text.upper()
+        if choice < 0.35:
+            return text.translate(str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU"))
+        return text
+
+    def field(name, value):
+        sep = rng.choice([": ", " : ", " - ", " ", ":\n", "\n: "])
+        return f"{label(name)}{sep}{value}"
+
+    start = rng.randint(2015, 2024)
+    lines = [label("YEMİNLİ MALİ MÜŞAVİRLİK SÖZLEŞMESİ")]
+    parts = [
+        field(rng.choice(["Müşteri", "Unvan", "Mükellef"]), rng.choice(NAMES)),
+        field("Vergi Dairesi", rng.choice(OFFICES)),
+        field(rng.choice(["Vergi No", "VKN", "TCKN"]), str(rng.randint(10**9, 10**11 - 1))),
+        field("Sözleşme No", f"S-{start}/{rng.randint(1, 999)}"),
+        field("Sözleşme Türü", rng.choice(TYPES)),
+        field(rng.choice(["Telefon", "Tel"]), f"0{rng.randint(200, 599)} {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}"),
+        field(rng.choice(["E-posta", "Eposta", "Email"]), f"info{rng.randint(1, 99)}@ornek.com.tr"),
+        field(rng.choice(["Yetkili", "İlgili"]), rng.choice(PEOPLE)),
+        f"{label('Dönem')}: 01.{start}{rng.choice(PERIOD_SEPS)}12.{start}",
+        f"{label('Tarih')}: {rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{start}",
+    ]
+    # Bazı alanlar eksik, sıra karışık ve araya serbest metin girmiş olabilir.
+    parts = [p for p in parts if rng.random() > 0.1]
+    rng.shuffle(parts)
+    for part in parts:
+        lines.append(part)
+        lines.extend(rng.sample(FILLER, rng.randint(0, 2)))
+    lines.extend(rng.choice(FILLER) for _ in range(rng.randint(5, 60)))
+    return "\n".join(lines)
+
+
+def _legacy_normalize(text: str) -> str:
+    table = str.maketrans(
+        {"ç": "c", "Ç": "C", "ğ": "g", "Ğ": "G", "ı": "i", "İ": "I", "ö": "o", "Ö": "O", "ş": "s", "Ş": "S", "ü": "u", "Ü": "U"}
+    )
+    return text.translate(table)
+
+
+def _legacy_date(text: str):
+    m = re.search(r"(\d{2}[./-]\d{2}[./-]\d{4})", text)
+    if not m:
+        return None
+    for fmt in ("%d.%m.%Y", "%d/%m/%Y", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(m.group(1), fmt).date()
+        except Exception:
+            continue
+    return None
+
+
+def legacy_parse(text: str) -> dict:
+    # Eski davranış: her alan için tüm metin üzerinde ayrı re.search (karşılaştırma için birebir kopya).
+    data = {}
+    norm = _legacy_normalize(text)
+    tax_no = re.search(r"\b(\d{10,11})\b", text)
+    if tax_no:
+        data["tax_no"] = tax_no.group(1)
+    office = re.search(r"(?i)vergi\s*dairesi\s*[:\-]?\s*(.+)", text)
+    if office:
+        data["tax_office"] = office.group(1).splitlines()[0].strip()
+    name = re.search(r"(?i)(m[üu]şteri|unvan|m[üu]kellef)\s*[:\-]?\s*(.+)", text)
+    if name:
+        data["customer_name"] = name.group(2).splitlines()[0].strip()
+    if not data.get("customer_name"):
+        name2 = re.search(r"(?i)(musteri|unvan|mukellef)\s*[:\-]?\s*(.+)", norm)
+        if name2:
+            data["customer_name"] = name2.group(2).splitlines()[0].strip()
+    phone = re.search(r"(?i)(telefon|tel)\s*[:\-]?\s*(.+)", text)
+    if phone:
+        data["phone"] = phone.group(2).splitlines()[0].strip()
+    email = re.search(r"(?i)(e-?posta|email)\s*[:\-]?\s*([\w\.-]+@[\w\.-]+)", text)
+    if email:
+        data["email"] = email.group(2).strip()
+    contact = re.search(r"(?i)(yetkili|ilgili)\s*[:\-]?\s*(.+)", text)
+    if contact:
+        data["contact_person"] = contact.group(2).splitlines()[0].strip()
+    contract_no = re.search(r"(?i)(s[öo]zleşme\s*no)\s*[:\-]?\s*([\w/-]+)", text)
+    if contract_no:
+        data["contract_no"] = contract_no.group(2).strip()
+    if not data.get("contract_no"):
+        contract_no2 = re.search(r"(?i)(sozlesme\s*no)\s*[:\-]?\s*([\w/-]+)", norm)
+        if contract_no2:
+            data["contract_no"] = contract_no2.group(2).strip()
+    contract_type = re.search(r"(?i)(s[öo]zleşme\s*t[üu]r[üu])\s*[:\-]?\s*(.+)", text)
+    if contract_type:
+        data["contract_type"] = contract_type.group(2).splitlines()[0].strip()
+    if not data.get("contract_type"):
+        contract_type2 = re.search(r"(?i)(sozlesme\s*turu)\s*[:\-]?\s*(.+)", norm)
+        if contract_type2:
+            data["contract_type"] = contract_type2.group(2).splitlines()[0].strip()
+    period = re.search(r"(\d{2})[./](\d{4})\s*-\s*(\d{2})[./](\d{4})", norm)
+    if period:
+        data["period_start_month"] = int(period.group(1))
+        data["period_start_year"] = int(period.group(2))
+        data["period_end_month"] = int(period.group(3))
+        data["period_end_year"] = int(period.group(4))
+    data["contract_date"] = _legacy_date(text)
+    return data
+
+
+class Command(BaseCommand):
+    help = "Sentetik Türkçe sözleşme metinlerinde eski ayrıştırıcı ile kural tablosunu karşılaştırır."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--docs", type=int, default=2000, help="Metin sayısı")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        corpus = [make_text(rng) for _ in range(options["docs"])]
+        size = sum(len(text) for text in corpus)
+
+        started = time.perf_counter()
+        old = [legacy_parse(text) for text in corpus]
+        legacy = time.perf_counter() - started
+        started = time.perf_counter()
+        new = [parse_contract_text(text) for text in corpus]
+        table = time.perf_counter() - started
+
+        mismatches = [i for i, (a, b) in enumerate(zip(old, new)) if a != b]
+        count = len(corpus)
+        self.stdout.write(f"{count} metin, {size / 1024 / 1024:.1f} MB")
+        self.stdout.write(f"eski ayrıştırıcı: {count / legacy:8.0f} metin/sn ({legacy:.2f} sn)")
+        self.stdout.write(f"kural tablosu:    {count / table:8.0f} metin/sn ({table:.2f} sn)")
+
+        scores = {}
+        for text in corpus[:200]:
+            for name, score in parse_contract(text)["confidence"].items():
+                scores.setdefault(name, []).append(score)
+        self.stdout.write("ortalama güven: " + ", ".join(f"{k}={sum(v) / len(v):.2f}" for k, v in scores.items()))
+
+        if mismatches:
+            first = mismatches[0]
+            raise CommandError(
+                f"{len(mismatches)} metinde sonuç farklı; ilk örnek #{first}:\n{old[first]}\n{new[first]}"
+            )
+        self.stdout.write(self.style.SUCCESS("Tüm metinlerde sonuçlar eski ayrıştırıcıyla aynı."))
@@ -0,0 +1,185 @@
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core import models as core_models
+from core.models import Customer, Document, DocumentCounter, Report, ReportCounterGlobal, ReportCounterYearAll
+
+DOC_TYPES = ["GLE", "GDE", "KIT", "DGR"]
+REPORT_TYPES = ["TT", "KDV", "OAR", "DGR"]
+
+
+class _Rollback(Exception):
+    pass
+
+
+def legacy_next_document_number(doc_type: str, year: int):
+    # Eski davranış: sayaç select_for_update ile kilitliyken tablo max(serial) ile taranır.
+    with transaction.atomic():
+        counter, _ = DocumentCounter.objects.select_for_update().get_or_create(doc_type=doc_type, year=year)
+        max_existing_serial = (
+            Document.objects.filter(doc_type=doc_type, year=year)
+            .order_by("-serial")
+            .values_list("serial", flat=True)
+            .first()
+            or 0
+        )
+        counter.last_serial = max(counter.last_serial, max_existing_serial) + 1
+        counter.save()
+        serial = counter.last_serial
+        return f"YMM-{core_models.YMM_LICENSE_NO}/{doc_type}/{year}-{serial:03d}", serial
+
+
+def legacy_next_report_number(report_type: str, year: int):
+    with transaction.atomic():
+        global_counter, _ = ReportCounterGlobal.objects.select_for_update().get_or_create(id=1)
+        year_counter, _ = ReportCounterYearAll.objects.select_for_update().get_or_create(year=year)
+        max_existing_global = (
+            Report.objects.order_by("-type_cumulative").values_list("type_cumulative", flat=True).first() or 0
+        )
+        max_existing_year = (
+            Report.objects.filter(year=year)
+            .order_by("-year_serial_all")
+            .values_list("year_serial_all", flat=True)
+            .first()
+            or 0
+        )
+        global_counter.last_serial = max(global_counter.last_serial, max_existing_global) + 1
+        year_counter.last_serial = max(year_counter.last_serial, max_existing_year) + 1
+        global_counter.save()
+        year_counter.save()
+        type_cum = global_counter.last_serial
+        year_serial = year_counter.last_serial
+        return f"YMM-{core_models.YMM_LICENSE_NO}-{type_cum}/{year}-{year_serial:03d}", type_cum, year_serial
+
+
+def _worker(seed: int, count: int, years, fail_every: int, customer_id: int, stats: Counter, errors: list):
+    rng = random.Random(seed)
+    local = Counter()
+    try:
+        for i in range(1, count + 1):
+            year = rng.choice(years)
+            try:
+                # Her ``fail_every``. ekleme numara alındıktan sonra geri alınır; boşluk kalmamalı.
+                with transaction.atomic():
+                    if rng.random() < 0.5:
+                        Document.objects.create(customer_id=customer_id, doc_type=rng.choice(DOC_TYPES), year=year)
+                        kind = "document"
+                    else:
+                        Report.objects.create(customer_id=customer_id, report_type=rng.choice(REPORT_TYPES), year=year)
+                        kind = "report"
+                    if fail_every and i % fail_every == 0:
+                        raise _Rollback()
+                local[kind] += 1
+            except _Rollback:
+                local["rolled_back"] += 1
+    except Exception as exc:
+        errors.append(repr(exc))
+    finally:
+        connection.close()
+        stats.update(local)
+
+
+def run(threads: int, per_thread: int, years, fail_every: int) -> tuple[float, Counter, list]:
+    for model in (Document, Report, DocumentCounter, ReportCounterGlobal, ReportCounterYearAll):
+        model.objects.all().delete()
+    customer = Customer.objects.first() or Customer.objects.create(name="Bench", tax_no="0000000001")
+    stats = Counter()
+    errors = []
+    workers = [
+        threading.Thread(target=_worker, args=(seed, per_thread, years, fail_every, customer.id, stats, errors))
+        for seed in range(threads)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started, stats, errors
+
+
+def verify() -> list[str]:
+    """Her sayaç için numaralar 1..n boşluksuz ve tekil olmalı; sayaç son numarada durmalı."""
+
+    problems = []
+    groups = defaultdict(list)
+    for doc_type, year, serial in Document.objects.values_list("doc_type", "year", "serial"):
+        groups[("document", doc_type, year)].append(serial)
+    type_cums = []
+    for year, type_cum, year_serial in Report.objects.values_list("year", "type_cumulative", "year_serial_all"):
+        groups[("report year", year)].append(year_serial)
+        type_cums.append(type_cum)
+    groups[("report global",)] = type_cums
+    for key, serials in groups.items():
+        if sorted(serials) != list(range(1, len(serials) + 1)):
+            problems.append(f"{' '.join(map(str, key))}: boşluk veya tekrar var")
+
+    counters = {("document", c.doc_type, c.year): c.last_serial for c in DocumentCounter.objects.all()}
+    counters.update({("report year", c.year): c.last_serial for c in ReportCounterYearAll.objects.all()})
+    counters.update({("report global",): c.last_serial for c in ReportCounterGlobal.objects.all()})
+    for key, serials in groups.items():
+        if serials and counters.get(key, 0) != len(serials):
+            problems.append(f"{' '.join(map(str, key))}: sayaç {counters.get(key, 0)}, kayıt {len(serials)}")
+    return problems
+
+
+class Command(BaseCommand):
+    help = "Eşzamanlı evrak/rapor eklemede numaraların boşluksuz ve tekil kaldığını doğrular, hızı ölçer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--per-thread", type=int, default=100, help="İş parçacığı başına ekleme")
+        parser.add_argument("--years", default="2025,2026")
+        parser.add_argument("--fail-every", type=int, default=7, help="Her N. eklemeyi geri al (0: hiç)")
+        parser.add_argument("--skip-legacy", action="store_true", help="Eski ayırıcı ile karşılaştırma yapma")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Eşzamanlılık ölçümü yalnızca PostgreSQL üzerinde çalışır.")
+        years = [int(x) for x in options["years"].split(",") if x.strip()]
+        modes = [("yeni", None)]
+        if not options["skip_legacy"]:
+            modes.insert(0, ("eski", (legacy_next_document_number, legacy_next_report_number)))
+
+        # Ölçüm geçici test veritabanında yapılır; gerçek veriye dokunulmaz.
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        failures = []
+        try:
+            for label, legacy in modes:
+                patches = []
+                if legacy:
+                    patches = [
+                        mock.patch.object(core_models, "next_document_number", legacy[0]),
+                        mock.patch.object(core_models, "next_report_number", legacy[1]),
+                    ]
+                for patch in patches:
+                    patch.start()
+                try:
+                    elapsed, stats, errors = run(
+                        options["threads"], options["per_thread"], years, options["fail_every"]
+                    )
+                finally:
+                    for patch in patches:
+                        patch.stop()
+                problems = verify()
+                inserted = stats["document"] + stats["report"]
+                self.stdout.write(
+                    f"{label}: {options['threads']} iş parçacığı, {inserted} kayıt "
+                    f"({stats['document']} evrak, {stats['report']} rapor, {stats['rolled_back']} geri alındı) "
+                    f"{elapsed:.2f} sn, {inserted / elapsed:.0f} kayıt/sn"
+                )
+                for line in errors + problems:
+                    self.stdout.write(self.style.ERROR(f"  {line}"))
+                if errors or problems:
+                    failures.append(label)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if failures:
+            raise CommandError(f"Numaralar tutarsız: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("Tüm numaralar boşluksuz ve tekil."))
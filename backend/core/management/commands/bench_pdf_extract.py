@@ -0,0 +1,114 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from PyPDF2 import PdfReader
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from core.contract_parser import parse_contract_text
+from core.extraction import REQUIRED_FIELDS, ExtractionPool, extract
+
+HEADER = [
+    "YMM TAM TASDIK SOZLESMESI",
+    "Sozlesme No: S-2024/117",
+    "Sozlesme Turu: TAM TASDIK",
+    "Musteri: Ornek Tekstil A.S.",
+    "Vergi Dairesi: Kadikoy",
+    "Vergi No: 1234567890",
+    "Donem: 01.2024 - 12.2024",
+    "Tarih: 15.01.2024",
+]
+FILLER = "Taraflar isbu sozlesmenin eki olan belgelerde yer alan hukumleri kabul eder. " * 2
+
+
+def make_pdf(pages: int, fields_on_page: int | None = 1) -> bytes:
+    """``pages`` sayfalık sentetik sözleşme; alanlar ``fields_on_page`` sayfasında (None: hiç yok)."""
+
+    buf = BytesIO()
+    pdf = canvas.Canvas(buf, pagesize=A4)
+    for number in range(1, pages + 1):
+        y = 800
+        lines = HEADER if number == fields_on_page else []
+        for line in lines + [FILLER[i : i + 90] for i in range(0, len(FILLER), 90)] * 12:
+            pdf.drawString(40, y, line)
+            y -= 14
+        pdf.showPage()
+    pdf.save()
+    return buf.getvalue()
+
+
+def legacy_extract(raw: bytes) -> dict:
+    # Eski davranış: tüm sayfalar, tekrar tekrar büyüyen string ile birleştirilir.
+    text = ""
+    for page in PdfReader(BytesIO(raw)).pages:
+        text += (page.extract_text() or "") + "\n"
+    return parse_contract_text(text)
+
+
+def _timed(func, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = "Sentetik PDF'lerle eski tam okuma ile pencereli/süreçli metin çıkarmayı karşılaştırır."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", default="1,10,50,200", help="Virgülle ayrılmış sayfa sayıları")
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--workers", type=int, default=4, help="Paralel ölçümde süreç sayısı")
+        parser.add_argument("--docs", type=int, default=8, help="Paralel ölçümdeki belge sayısı")
+
+    def handle(self, *args, **options):
+        sizes = [int(x) for x in options["pages"].split(",") if x.strip()]
+        repeat = options["repeat"]
+        pool = ExtractionPool(workers=options["workers"], timeout=120)
+
+        self.stdout.write(f"{'belge':<24}{'eski':>10}{'pencereli':>12}{'süreçte':>10}{'okunan':>9}")
+        mismatches = []
+        for pages in sizes:
+            for label, fields_on in (("alanlar 1. sayfada", 1), ("alan yok", None)):
+                raw = make_pdf(pages, fields_on)
+                old_time, old = _timed(lambda: legacy_extract(raw), repeat)
+                new_time, new = _timed(lambda: extract(raw), repeat)
+                pool_time, _ = _timed(lambda: pool.extract(raw), repeat)
+                if fields_on and any(old.get(f) != new["parsed"].get(f) for f in REQUIRED_FIELDS):
+                    mismatches.append(f"{pages} sayfa")
+                self.stdout.write(
+                    f"{f'{pages} sf, {label}':<24}{old_time * 1000:>8.0f}ms{new_time * 1000:>10.0f}ms"
+                    f"{pool_time * 1000:>8.0f}ms{new['pages']:>5}/{new['total']}"
+                )
+
+        raw = make_pdf(max(sizes), 1)
+        docs = [raw] * options["docs"]
+        started = time.perf_counter()
+        for doc in docs:
+            legacy_extract(doc)
+        serial = time.perf_counter() - started
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            list(executor.map(pool.extract, docs))
+        parallel = time.perf_counter() - started
+        self.stdout.write(
+            f"{options['docs']} x {max(sizes)} sayfa: eski sıralı {serial:.2f} sn, "
+            f"{options['workers']} süreçle {parallel:.2f} sn"
+        )
+
+        started = time.perf_counter()
+        try:
+            ExtractionPool(workers=1, timeout=0.05).extract(make_pdf(max(sizes), None), max_pages=max(sizes))
+            self.stdout.write(self.style.WARNING("zaman aşımı tetiklenmedi"))
+        except Exception as exc:
+            self.stdout.write(f"zaman aşımı: {type(exc).__name__} {time.perf_counter() - started:.2f} sn içinde")
+
+        if mismatches:
+            raise CommandError(f"Alan sonuçları farklı: {', '.join(mismatches)}")
+        self.stdout.write(self.style.SUCCESS("Zorunlu alanlar eski yöntemle aynı."))
@@ -0,0 +1,72 @@
+import time
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+
+from core.mailer import SMTPPool
+
+
+class _Sink:
+    def __init__(self):
+        self.count = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.count += 1
+        return "250 OK"
+
+
+def _messages(n: int, size: int):
+    body = "x" * size
+    return [
+        EmailMessage(subject=f"Bench {i}", body=body, from_email="bench@localhost", to=["sink@localhost"])
+        for i in range(n)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Yerel bir SMTP alıcısına (aiosmtpd) mesaj başına bağlantı ile havuzlu oturumu karşılaştırır."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=200, help="Gönderilecek mesaj sayısı")
+        parser.add_argument("--size", type=int, default=2048, help="Mesaj gövdesi (bayt)")
+        parser.add_argument("--port", type=int, default=8025)
+
+    def handle(self, *args, **options):
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            raise CommandError("Bu ölçüm için aiosmtpd gerekli: pip install aiosmtpd")
+
+        count = options["count"]
+        sink = _Sink()
+        controller = Controller(sink, hostname="127.0.0.1", port=options["port"])
+        controller.start()
+        smtp = {
+            "backend": "django.core.mail.backends.smtp.EmailBackend",
+            "host": "127.0.0.1",
+            "port": options["port"],
+            "use_tls": False,
+            "use_ssl": False,
+        }
+        try:
+            started = time.perf_counter()
+            for message in _messages(count, options["size"]):
+                # Eski davranış: her mesaj kendi bağlantısını açıp kapatır.
+                message.connection = get_connection(fail_silently=False, **smtp)
+                message.send()
+            single = time.perf_counter() - started
+
+            pool = SMTPPool()
+            started = time.perf_counter()
+            errors = pool.send(_messages(count, options["size"]), options=smtp)
+            pooled = time.perf_counter() - started
+            pool.close()
+        finally:
+            controller.stop()
+
+        failed = sum(1 for error in errors if error is not None)
+        if failed or sink.count != count * 2:
+            raise CommandError(f"Alıcıya ulaşan: {sink.count}/{count * 2}, başarısız: {failed}")
+        self.stdout.write(f"mesaj başına bağlantı: {count / single:8.1f} mesaj/sn ({single:.2f} sn)")
+        self.stdout.write(f"havuzlu oturum:        {count / pooled:8.1f} mesaj/sn ({pooled:.2f} sn)")
+        self.stdout.write(self.style.SUCCESS(f"hızlanma: {single / pooled:.1f}x"))
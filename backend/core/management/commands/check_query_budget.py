@@ -0,0 +1,146 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Contract, Customer, Document, File, Note, Report
+
+User = get_user_model()
+
+# {id} alanları tohum verideki ilk kayıtla doldurulur.
+ENDPOINTS = [
+    "/api/customers/",
+    "/api/customers/{customer}/",
+    "/api/documents/",
+    "/api/documents/?expand=files",
+    "/api/documents/{document}/",
+    "/api/reports/",
+    "/api/reports/?expand=files",
+    "/api/reports/{report}/",
+    "/api/contracts/",
+    "/api/files/",
+    "/api/notes/",
+    "/api/notes/?customer={customer}",
+    "/api/contract-jobs/",
+]
+
+
+def seed(n: int):
+    """Her modelden ``n`` kayıt ve bağlı not/dosya üretir; sayaçları kullanmadan toplu ekler."""
+
+    customers = Customer.objects.bulk_create(
+        [Customer(name=f"Mükellef {i}", tax_no=f"{i:010d}") for i in range(1, n + 1)]
+    )
+    contracts = Contract.objects.bulk_create(
+        [Contract(customer=c, contract_no=f"S-{i}", contract_type="TAM") for i, c in enumerate(customers, 1)]
+    )
+    year = date.today().year
+    documents = Document.objects.bulk_create(
+        [
+            Document(
+                customer=c,
+                contract=contracts[i - 1],
+                doc_type="GLE",
+                year=year,
+                serial=i,
+                doc_no=f"BUDGET/GLE/{year}-{i:05d}",
+                received_date=date.today(),
+            )
+            for i, c in enumerate(customers, 1)
+        ]
+    )
+    reports = Report.objects.bulk_create(
+        [
+            Report(
+                customer=c,
+                report_type="KDV",
+                year=year,
+                type_cumulative=i,
+                year_serial_all=i,
+                report_no=f"BUDGET-{i}/{year}",
+                received_date=date.today(),
+            )
+            for i, c in enumerate(customers, 1)
+        ]
+    )
+    files = []
+    notes = []
+    for c, d, r in zip(customers, documents, reports):
+        for target in ({"document": d}, {"report": r}):
+            files.append(
+                File(
+                    filename="ek.pdf",
+                    content_type="application/pdf",
+                    size=1,
+                    url="http://localhost:9000/ymm-files/ek.pdf",
+                    customer=c,
+                    **target,
+                )
+            )
+            notes.append(Note(text="not", **target))
+        notes.append(Note(text="not", customer=c))
+    File.objects.bulk_create(files)
+    Note.objects.bulk_create(notes)
+    return {"customer": customers[0].id, "document": documents[0].id, "report": reports[0].id}
+
+
+def measure(client, path: str) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(path)
+    if response.status_code != 200:
+        raise CommandError(f"{path} -> HTTP {response.status_code}")
+    if getattr(response, "streaming", False):
+        b"".join(response.streaming_content)
+    return len(ctx.captured_queries)
+
+
+def run_budget(sizes, endpoints=ENDPOINTS):
+    """Her boyut için boş bir veritabanına tohum atıp uç nokta başına sorgu sayısını döner."""
+
+    results = {}
+    for n in sizes:
+        User.objects.all().delete()
+        for model in (Note, File, Document, Report, Contract, Customer):
+            model.objects.all().delete()
+        ids = seed(n)
+        user = User.objects.create_user(username="budget", password="budget", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(user)
+        for template in endpoints:
+            path = template.format(**ids)
+            sep = "&" if "?" in path else "?"
+            results.setdefault(template, {})[n] = measure(client, f"{path}{sep}page_size={n}")
+    return results
+
+
+class Command(BaseCommand):
+    help = "Uç noktaların sorgu sayısını farklı kayıt sayılarında ölçer; sayı N ile artarsa hata verir."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10,1000", help="Virgülle ayrılmış kayıt sayıları")
+
+    def handle(self, *args, **options):
+        sizes = sorted({int(x) for x in options["sizes"].split(",") if x.strip()})
+        if len(sizes) < 2:
+            raise CommandError("En az iki farklı boyut gerekli.")
+        # Ölçüm geçici test veritabanında yapılır; gerçek veriye dokunulmaz.
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = run_budget(sizes)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        failures = []
+        for path, counts in results.items():
+            values = [counts[n] for n in sizes]
+            line = "  ".join(f"N={n}:{counts[n]:>3}" for n in sizes)
+            if values[-1] > values[0]:
+                failures.append(path)
+                self.stdout.write(self.style.ERROR(f"GROWS  {line}  {path}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"OK     {line}  {path}"))
+        if failures:
+            raise CommandError(f"{len(failures)} uç noktada sorgu sayısı kayıt sayısıyla artıyor.")
@@ -0,0 +1,105 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.models import AuditLog, ChatMessage, Customer, Document, File, Note, Report
+
+
+def _hot_queries(year: int):
+    # Her kayıt: (ad, sorgu, seq scan yapılmaması gereken tablo)
+    return [
+        (
+            "reconcile_counters max serial",
+            Document.objects.filter(doc_type="GLE", year=year).order_by("-serial").values("serial")[:1],
+            Document._meta.db_table,
+        ),
+        (
+            "DocumentSerializer.validate latest date",
+            Document.objects.filter(doc_type="GLE", year=year, is_archived=False)
+            .exclude(received_date__isnull=True)
+            .order_by("-received_date", "-serial")[:1],
+            Document._meta.db_table,
+        ),
+        (
+            "DocumentViewSet list page",
+            Document.objects.filter(is_archived=False).order_by("-year", "-serial", "-id")[:50],
+            Document._meta.db_table,
+        ),
+        (
+            "reconcile_counters max type_cumulative",
+            Report.objects.order_by("-type_cumulative").values("type_cumulative")[:1],
+            Report._meta.db_table,
+        ),
+        (
+            "reconcile_counters max year serial",
+            Report.objects.filter(year=year).order_by("-year_serial_all").values("year_serial_all")[:1],
+            Report._meta.db_table,
+        ),
+        (
+            "ReportSerializer.validate latest date",
+            Report.objects.filter(year=year, is_archived=False)
+            .exclude(received_date__isnull=True)
+            .order_by("-received_date", "-year_serial_all")[:1],
+            Report._meta.db_table,
+        ),
+        (
+            "ReportViewSet list page",
+            Report.objects.filter(is_archived=False).order_by("-year", "-year_serial_all", "-id")[:50],
+            Report._meta.db_table,
+        ),
+        (
+            "CustomerViewSet list page",
+            Customer.objects.filter(is_archived=False).order_by("-created_at", "-id")[:50],
+            Customer._meta.db_table,
+        ),
+        (
+            "latest document note",
+            Note.objects.filter(document_id=1, is_archived=False).order_by("-created_at").values("text")[:1],
+            Note._meta.db_table,
+        ),
+        (
+            "chat thread history page",
+            ChatMessage.objects.filter(thread_id=1, is_deleted=False, id__lt=1000).order_by("-id")[:51],
+            ChatMessage._meta.db_table,
+        ),
+        (
+            "customer note files",
+            File.objects.filter(customer_id=1, note_scope=True),
+            File._meta.db_table,
+        ),
+        (
+            "delta tombstones",
+            AuditLog.objects.filter(model="Document", action="archive", timestamp__gt="2000-01-01T00:00:00Z"),
+            AuditLog._meta.db_table,
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Sık kullanılan sorguların planlarını EXPLAIN ile kontrol eder; indeks yerine seq scan varsa hata verir."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, default=2026)
+        parser.add_argument("--verbose-plans", action="store_true")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Sorgu planı kontrolü yalnızca PostgreSQL üzerinde çalışır.")
+        failures = []
+        with connection.cursor() as cursor:
+            # Küçük tablolarda planlayıcı seq scan seçebilir; kapatıldığında hâlâ seq scan
+            # görülüyorsa sorguya uygun bir indeks yok demektir.
+            cursor.execute("SET enable_seqscan = off")
+            try:
+                for name, qs, table in _hot_queries(options["year"]):
+                    plan = qs.explain()
+                    if options["verbose_plans"]:
+                        self.stdout.write(f"-- {name}\n{plan}\n")
+                    if f"Seq Scan on {table}" in plan:
+                        failures.append(name)
+                        self.stdout.write(self.style.ERROR(f"SEQ SCAN  {name}"))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f"OK        {name}"))
+            finally:
+                cursor.execute("RESET enable_seqscan")
+        if failures:
+            raise CommandError(f"{len(failures)} sorgu indeks kullanmıyor: {', '.join(failures)}")
@@ -0,0 +1,39 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.customer_import import import_customers
+
+
+class Command(BaseCommand):
+    help = "CSV/XLSX müşteri listesini vergi no/TCKN ile partiler halinde upsert eder."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--user", help="Kayıtlarda oluşturan olarak görünecek kullanıcı adı")
+
+    def handle(self, *args, **options):
+        actor = None
+        if options["user"]:
+            actor = get_user_model().objects.filter(username=options["user"]).first()
+            if not actor:
+                raise CommandError(f"Kullanıcı bulunamadı: {options['user']}")
+        started = time.perf_counter()
+        result = import_customers(
+            options["path"],
+            options["path"],
+            actor=actor,
+            on_progress=lambda stats: self.stdout.write(f"{stats['processed']} satır işlendi", ending="\r"),
+        )
+        self.stdout.write("")
+        for error in result["errors"]:
+            detail = json.dumps(error["errors"], ensure_ascii=False)
+            self.stdout.write(self.style.ERROR(f"satır {error['row']}: {detail}"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result['created']} eklendi, {result['updated']} güncellendi, {result['failed']} hatalı "
+                f"({time.perf_counter() - started:.2f} sn)."
+            )
+        )
@@ -0,0 +1,43 @@
+import json
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bulk_import import BulkImportError, import_documents, import_reports, read_rows
+
+IMPORTERS = {"documents": import_documents, "reports": import_reports}
+
+
+class Command(BaseCommand):
+    help = "CSV/JSON dosyasındaki evrak veya raporları tek transaction'da toplu içe aktarır."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument("--user", help="Kayıtlarda oluşturan olarak görünecek kullanıcı adı")
+        parser.add_argument("--dry-run", action="store_true", help="Yalnızca doğrula, kayıt ekleme")
+
+    def handle(self, *args, **options):
+        actor = None
+        if options["user"]:
+            actor = get_user_model().objects.filter(username=options["user"]).first()
+            if not actor:
+                raise CommandError(f"Kullanıcı bulunamadı: {options['user']}")
+        started = time.perf_counter()
+        try:
+            rows = read_rows(Path(options["path"]).read_bytes(), options["path"])
+            result = IMPORTERS[options["kind"]](rows, actor=actor, dry_run=options["dry_run"])
+        except BulkImportError as exc:
+            for row in exc.rows:
+                detail = json.dumps(row["errors"], ensure_ascii=False)
+                self.stdout.write(self.style.ERROR(f"satır {row['row']}: {detail}"))
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+        for key, (first, last) in result["ranges"].items():
+            self.stdout.write(f"{key}: {first} .. {last}")
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"{result['valid']} satır geçerli ({elapsed:.2f} sn)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{result['created']} kayıt eklendi ({elapsed:.2f} sn)."))
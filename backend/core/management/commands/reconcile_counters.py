@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.numbering import reconcile
+
+
+class Command(BaseCommand):
+    help = "Evrak/rapor sayaçlarını mevcut kayıtların en büyük numarasına yükseltir."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Değiştirmeden yalnızca geride kalan sayaçları listeler")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            changes = reconcile(apply=not options["check"])
+        for name, old, new in changes:
+            self.stdout.write(f"{name}: {old} -> {new}")
+        if not changes:
+            self.stdout.write(self.style.SUCCESS("Tüm sayaçlar güncel."))
+        elif options["check"]:
+            raise CommandError(f"{len(changes)} sayaç mevcut kayıtların gerisinde.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(changes)} sayaç güncellendi."))
@@ -0,0 +1,83 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0022_chat_global_thread"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["model", "action", "timestamp"], name="auditlog_model_action_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(fields=["thread", "created_at"], name="chatmessage_thread_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contract",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["created_at", "id"], name="contract_list_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contractjob",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["created_at", "id"], name="contractjob_list_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["created_at", "id"], name="customer_list_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="document",
+            index=models.Index(fields=["doc_type", "year", "serial"], name="document_type_year_serial_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="document",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["doc_type", "year", "received_date", "serial"], name="document_type_year_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="document",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["year", "serial", "id"], name="document_list_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="file",
+            index=models.Index(fields=["customer", "note_scope"], name="file_customer_scope_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="file",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["created_at", "id"], name="file_list_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["document", "created_at"], name="note_document_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["report", "created_at"], name="note_report_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["contract", "created_at"], name="note_contract_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["customer", "created_at"], name="note_customer_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["created_at", "id"], name="note_list_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="report",
+            index=models.Index(fields=["year", "year_serial_all", "id"], name="report_year_serial_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="report",
+            index=models.Index(fields=["type_cumulative"], name="report_type_cumulative_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="report",
+            index=models.Index(condition=models.Q(is_archived=False), fields=["year", "received_date", "year_serial_all"], name="report_year_date_idx"),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0023_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(fields=["thread", "id"], name="chatmessage_thread_id_idx"),
+        ),
+    ]
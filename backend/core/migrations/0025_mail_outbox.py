@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0024_chatmessage_thread_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MailOutbox",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma zamanı")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Güncellenme zamanı")),
+                ("is_archived", models.BooleanField(default=False, verbose_name="Arşivlendi mi")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("QUEUED", "Kuyrukta"),
+                            ("SENDING", "Gönderiliyor"),
+                            ("SENT", "Gönderildi"),
+                            ("FAILED", "Başarısız"),
+                        ],
+                        default="QUEUED",
+                        max_length=16,
+                        verbose_name="Durum",
+                    ),
+                ),
+                (
+                    "idempotency_key",
+                    models.CharField(blank=True, max_length=128, null=True, unique=True, verbose_name="Tekrar anahtarı"),
+                ),
+                ("subject", models.CharField(max_length=512, verbose_name="Konu")),
+                ("body", models.TextField(verbose_name="İçerik")),
+                ("to", models.JSONField(default=list, verbose_name="Alıcılar")),
+                ("attachments", models.JSONField(blank=True, default=list, verbose_name="Ekler")),
+                ("attempts", models.IntegerField(default=0, verbose_name="Deneme sayısı")),
+                ("last_error", models.TextField(blank=True, null=True, verbose_name="Son hata")),
+                ("sent_at", models.DateTimeField(blank=True, null=True, verbose_name="Gönderim zamanı")),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Oluşturan kullanıcı",
+                    ),
+                ),
+                (
+                    "note",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="mails",
+                        to="core.note",
+                        verbose_name="Not",
+                    ),
+                ),
+                (
+                    "updated_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Güncelleyen kullanıcı",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Giden Mail",
+                "verbose_name_plural": "Giden Mailler",
+                "indexes": [models.Index(fields=["status", "created_at"], name="mailoutbox_status_idx")],
+            },
+        ),
+    ]
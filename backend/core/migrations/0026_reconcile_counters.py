@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def reconcile_counters(apps, schema_editor):
+    # Numara verirken artık tablo taranmıyor; sayaçlar bir kez mevcut kayıtlara yükseltilir.
+    from core.numbering import reconcile
+
+    reconcile(registry=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0025_mail_outbox"),
+    ]
+
+    operations = [
+        migrations.RunPython(reconcile_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0027_importjob"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportJob",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma zamanı")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Güncellenme zamanı")),
+                ("is_archived", models.BooleanField(default=False, verbose_name="Arşivlendi mi")),
+                ("kind", models.CharField(max_length=32, verbose_name="Tür")),
+                ("status", models.CharField(default="pending", max_length=32, verbose_name="Durum")),
+                ("digest", models.CharField(max_length=64, verbose_name="Özet")),
+                ("payload", models.JSONField(default=dict, verbose_name="İçerik")),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Oluşturan kullanıcı",
+                    ),
+                ),
+                (
+                    "updated_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Güncelleyen kullanıcı",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Dışa Aktarma İşi",
+                "verbose_name_plural": "Dışa Aktarma İşleri",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("is_archived", False)),
+                        fields=["created_at", "id"],
+                        name="exportjob_list_idx",
+                    ),
+                    models.Index(fields=["digest", "created_at"], name="exportjob_digest_idx"),
+                ],
+            },
+        ),
+    ]
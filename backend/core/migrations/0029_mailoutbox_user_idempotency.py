@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0028_exportjob"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="mailoutbox",
+            name="idempotency_key",
+            field=models.CharField(blank=True, max_length=128, null=True, verbose_name="Tekrar anahtarı"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="mailoutbox",
+            unique_together={("created_by", "idempotency_key")},
+        ),
+    ]
@@ -1,4 +1,5 @@
 ﻿from django.db import models, transaction
+from django.db.models import Q
 import os
 from datetime import date
 from django.contrib.auth import get_user_model
@@ -38,6 +39,10 @@ STATUS_CHOICES = [
 def default_year():
     return date.today().year
 
+
+# Liste ve sayaç sorgularında arşivlenmemiş kayıtlar için kısmi indeks koşulu.
+NOT_ARCHIVED = Q(is_archived=False)
+
 class AuditBase(models.Model):
     created_by = models.ForeignKey(
         User,
@@ -105,6 +110,9 @@ class Customer(AuditBase):
     class Meta:
         verbose_name = "Müşteri"
         verbose_name_plural = "Müşteriler"
+        indexes = [
+            models.Index(fields=["created_at", "id"], condition=NOT_ARCHIVED, name="customer_list_idx"),
+        ]
 
 class DocumentCounter(models.Model):
     doc_type = models.CharField(max_length=3, choices=DOCUMENT_TYPES, verbose_name="Evrak türü")
@@ -243,12 +251,23 @@ class Document(AuditBase):
     class Meta:
         verbose_name = "Evrak"
         verbose_name_plural = "Evraklar"
+        indexes = [
+            models.Index(fields=["doc_type", "year", "serial"], name="document_type_year_serial_idx"),
+            models.Index(
+                fields=["doc_type", "year", "received_date", "serial"],
+                condition=NOT_ARCHIVED,
+                name="document_type_year_date_idx",
+            ),
+            models.Index(fields=["year", "serial", "id"], condition=NOT_ARCHIVED, name="document_list_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if (not self.doc_no or not self.serial) and self.doc_type and self.year:
-            doc_no, serial = next_document_number(self.doc_type, self.year)
-            self.doc_no = doc_no
-            self.serial = serial
+            # Numara ve kayıt aynı transaction'da: ekleme geri alınırsa sayaç da geri alınır.
+            with transaction.atomic():
+                self.doc_no, self.serial = next_document_number(self.doc_type, self.year)
+                super().save(*args, **kwargs)
+            return
         super().save(*args, **kwargs)
 
 class Report(AuditBase):
@@ -318,6 +337,15 @@ class Report(AuditBase):
     class Meta:
         verbose_name = "Rapor"
         verbose_name_plural = "Raporlar"
+        indexes = [
+            models.Index(fields=["year", "year_serial_all", "id"], name="report_year_serial_idx"),
+            models.Index(fields=["type_cumulative"], name="report_type_cumulative_idx"),
+            models.Index(
+                fields=["year", "received_date", "year_serial_all"],
+                condition=NOT_ARCHIVED,
+                name="report_year_date_idx",
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if (
@@ -325,10 +353,12 @@ class Report(AuditBase):
             and self.report_type
             and self.year
         ):
-            report_no, type_cum, year_serial = next_report_number(self.report_type, self.year)
-            self.report_no = report_no
-            self.type_cumulative = type_cum
-            self.year_serial_all = year_serial
+            with transaction.atomic():
+                self.report_no, self.type_cumulative, self.year_serial_all = next_report_number(
+                    self.report_type, self.year
+                )
+                super().save(*args, **kwargs)
+            return
         super().save(*args, **kwargs)
 
 class File(AuditBase):
@@ -381,6 +411,10 @@ class File(AuditBase):
     class Meta:
         verbose_name = "Dosya"
         verbose_name_plural = "Dosyalar"
+        indexes = [
+            models.Index(fields=["customer", "note_scope"], name="file_customer_scope_idx"),
+            models.Index(fields=["created_at", "id"], condition=NOT_ARCHIVED, name="file_list_idx"),
+        ]
 
 
 class Note(AuditBase):
@@ -425,6 +459,13 @@ class Note(AuditBase):
         verbose_name = "Not"
         verbose_name_plural = "Notlar"
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["document", "created_at"], condition=NOT_ARCHIVED, name="note_document_idx"),
+            models.Index(fields=["report", "created_at"], condition=NOT_ARCHIVED, name="note_report_idx"),
+            models.Index(fields=["contract", "created_at"], condition=NOT_ARCHIVED, name="note_contract_idx"),
+            models.Index(fields=["customer", "created_at"], condition=NOT_ARCHIVED, name="note_customer_idx"),
+            models.Index(fields=["created_at", "id"], condition=NOT_ARCHIVED, name="note_list_idx"),
+        ]
 
 class AuditLog(models.Model):
     model = models.CharField(max_length=128, verbose_name="Model")
@@ -442,6 +483,9 @@ class AuditLog(models.Model):
     class Meta:
         verbose_name = "Denetim Kaydı"
         verbose_name_plural = "Denetim Kayıtları"
+        indexes = [
+            models.Index(fields=["model", "action", "timestamp"], name="auditlog_model_action_idx"),
+        ]
 
 class ContractJob(AuditBase):
     status = models.CharField(max_length=32, default="pending", verbose_name="Durum")
@@ -450,6 +494,75 @@ class ContractJob(AuditBase):
     class Meta:
         verbose_name = "Sözleşme İşi"
         verbose_name_plural = "Sözleşme İşleri"
+        indexes = [
+            models.Index(fields=["created_at", "id"], condition=NOT_ARCHIVED, name="contractjob_list_idx"),
+        ]
+
+
+class ImportJob(AuditBase):
+    kind = models.CharField(max_length=32, verbose_name="Tür")
+    status = models.CharField(max_length=32, default="pending", verbose_name="Durum")
+    payload = models.JSONField(default=dict, verbose_name="İçerik")
+
+    class Meta:
+        verbose_name = "İçe Aktarma İşi"
+        verbose_name_plural = "İçe Aktarma İşleri"
+        indexes = [
+            models.Index(fields=["created_at", "id"], condition=NOT_ARCHIVED, name="importjob_list_idx"),
+        ]
+
+
+
+class ExportJob(AuditBase):
+    kind = models.CharField(max_length=32, verbose_name="Tür")
+    status = models.CharField(max_length=32, default="pending", verbose_name="Durum")
+    # Başlık, kolonlar, filtreler ve veri sürümünden hesaplanır; aynı dışa aktarım yeniden üretilmez.
+    digest = models.CharField(max_length=64, verbose_name="Özet")
+    payload = models.JSONField(default=dict, verbose_name="İçerik")
+
+    class Meta:
+        verbose_name = "Dışa Aktarma İşi"
+        verbose_name_plural = "Dışa Aktarma İşleri"
+        indexes = [
+            models.Index(fields=["created_at", "id"], condition=NOT_ARCHIVED, name="exportjob_list_idx"),
+            models.Index(fields=["digest", "created_at"], name="exportjob_digest_idx"),
+        ]
+
+MAIL_STATUS_CHOICES = [
+    ("QUEUED", "Kuyrukta"),
+    ("SENDING", "Gönderiliyor"),
+    ("SENT", "Gönderildi"),
+    ("FAILED", "Başarısız"),
+]
+
+
+class MailOutbox(AuditBase):
+    status = models.CharField(max_length=16, choices=MAIL_STATUS_CHOICES, default="QUEUED", verbose_name="Durum")
+    idempotency_key = models.CharField(max_length=128, null=True, blank=True, verbose_name="Tekrar anahtarı")
+    subject = models.CharField(max_length=512, verbose_name="Konu")
+    body = models.TextField(verbose_name="İçerik")
+    to = models.JSONField(default=list, verbose_name="Alıcılar")
+    attachments = models.JSONField(default=list, blank=True, verbose_name="Ekler")
+    note = models.ForeignKey(
+        "Note",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="mails",
+        verbose_name="Not",
+    )
+    attempts = models.IntegerField(default=0, verbose_name="Deneme sayısı")
+    last_error = models.TextField(null=True, blank=True, verbose_name="Son hata")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Gönderim zamanı")
+
+    class Meta:
+        # Tekrar anahtarı kullanıcı başınadır; başka kullanıcının kaydı hiçbir zaman dönmez.
+        unique_together = (("created_by", "idempotency_key"),)
+        verbose_name = "Giden Mail"
+        verbose_name_plural = "Giden Mailler"
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="mailoutbox_status_idx"),
+        ]
 
 
 class Contract(AuditBase):
@@ -478,6 +591,9 @@ class Contract(AuditBase):
     class Meta:
         verbose_name = "Sözleşme"
         verbose_name_plural = "Sözleşmeler"
+        indexes = [
+            models.Index(fields=["created_at", "id"], condition=NOT_ARCHIVED, name="contract_list_idx"),
+        ]
 
 
 class ChatThread(models.Model):
@@ -544,6 +660,10 @@ class ChatMessage(models.Model):
         verbose_name = "Sohbet Mesajı"
         verbose_name_plural = "Sohbet Mesajları"
         ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["thread", "created_at"], name="chatmessage_thread_idx"),
+            models.Index(fields=["thread", "id"], name="chatmessage_thread_id_idx"),
+        ]
 
 
 class ChatMessageFile(models.Model):
@@ -569,51 +689,25 @@ def year_is_locked(year: int) -> bool:
     return bool(lock and lock.is_locked)
 
 
+def document_number(doc_type: str, year: int, serial: int) -> str:
+    return f"YMM-{YMM_LICENSE_NO}/{doc_type}/{year}-{serial:03d}"
+
+
+def report_number(type_cum: int, year: int, year_serial: int) -> str:
+    return f"YMM-{YMM_LICENSE_NO}-{type_cum}/{year}-{year_serial:03d}"
+
+
 def next_document_number(doc_type: str, year: int) -> tuple[str, int]:
-    with transaction.atomic():
-        counter, _ = DocumentCounter.objects.select_for_update().get_or_create(
-            doc_type=doc_type, year=year
-        )
-        max_existing_serial = (
-            Document.objects.filter(doc_type=doc_type, year=year)
-            .order_by("-serial")
-            .values_list("serial", flat=True)
-            .first()
-            or 0
-        )
-        counter.last_serial = max(counter.last_serial, max_existing_serial) + 1
-        counter.save()
-        serial = counter.last_serial
-        return f"YMM-{YMM_LICENSE_NO}/{doc_type}/{year}-{serial:03d}", serial
+    from .numbering import next_document_serial
+
+    serial = next_document_serial(doc_type, year)
+    return document_number(doc_type, year, serial), serial
 
 
 def next_report_number(report_type: str, year: int) -> tuple[str, int, int]:
-    with transaction.atomic():
-        global_counter, _ = ReportCounterGlobal.objects.select_for_update().get_or_create(id=1)
-        year_counter, _ = ReportCounterYearAll.objects.select_for_update().get_or_create(
-            year=year
-        )
-        max_existing_global = (
-            Report.objects.order_by("-type_cumulative")
-            .values_list("type_cumulative", flat=True)
-            .first()
-            or 0
-        )
-        max_existing_year = (
-            Report.objects.filter(year=year)
-            .order_by("-year_serial_all")
-            .values_list("year_serial_all", flat=True)
-            .first()
-            or 0
-        )
-        global_counter.last_serial = max(global_counter.last_serial, max_existing_global) + 1
-        year_counter.last_serial = max(year_counter.last_serial, max_existing_year) + 1
-        global_counter.save()
-        year_counter.save()
-
-        type_cum = global_counter.last_serial
-        year_serial = year_counter.last_serial
-        report_no = f"YMM-{YMM_LICENSE_NO}-{type_cum}/{year}-{year_serial:03d}"
-        return report_no, type_cum, year_serial
+    from .numbering import next_report_serials
+
+    type_cum, year_serial = next_report_serials(year)
+    return report_number(type_cum, year, year_serial), type_cum, year_serial
 
 
@@ -0,0 +1,140 @@
+from django.apps import apps as django_apps
+from django.db import connection
+from django.db.models import F, Max, Value
+from django.db.models.functions import Greatest
+
+from .models import DocumentCounter, ReportCounterGlobal, ReportCounterYearAll
+
+# Numara verme kuralları:
+# - Sayaç satırı tek ``UPDATE ... RETURNING`` ile artırılır; satır kilidi çağıranın transaction'ı
+#   bitene kadar tutulur. Numara ile kayıt aynı transaction'da yazıldığından ekleme geri alınırsa
+#   sayaç da geri alınır, boşluk oluşmaz.
+# - Sayaç mevcut kayıtların gerisinde kalmaz: manuel numaralar ``raise_*`` ile sayaca işlenir,
+#   silmede yalnızca son numara geri sarılır, kurulumda ``reconcile`` bir kez çalıştırılır.
+#   Böylece her eklemede tabloda ``max(serial)`` taraması gerekmez.
+# - Rapor eklerken kilit sırası her zaman genel sayaç -> yıl sayacıdır (kilitlenme olmaz).
+
+
+def _increment(model, step: int = 1, **lookup) -> int:
+    qn = connection.ops.quote_name
+    where = " AND ".join(f"{qn(model._meta.get_field(name).column)} = %s" for name in lookup)
+    sql = (
+        f"UPDATE {qn(model._meta.db_table)} SET {qn('last_serial')} = {qn('last_serial')} + %s "
+        f"WHERE {where} RETURNING {qn('last_serial')}"
+    )
+    for _ in range(2):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [step, *lookup.values()])
+            row = cursor.fetchone()
+        if row is not None:
+            return row[0]
+        # Yılın/türün ilk kaydı: satır eşzamanlı oluşturmaya dayanıklı şekilde açılır.
+        model.objects.bulk_create([model(**lookup)], ignore_conflicts=True)
+    raise RuntimeError(f"{model.__name__} sayacı oluşturulamadı: {lookup}")
+
+
+def _lock(model, **lookup):
+    model.objects.bulk_create([model(**lookup)], ignore_conflicts=True)
+    return model.objects.select_for_update().get(**lookup)
+
+
+def _raise(model, value: int, **lookup):
+    model.objects.bulk_create([model(**lookup)], ignore_conflicts=True)
+    model.objects.filter(**lookup).update(last_serial=Greatest(F("last_serial"), Value(value)))
+
+
+def next_document_serial(doc_type: str, year: int) -> int:
+    """Evrak türü ve yıl için sıradaki seri; çağıran transaction içinde olmalıdır."""
+
+    return _increment(DocumentCounter, doc_type=doc_type, year=year)
+
+
+def next_report_serials(year: int) -> tuple[int, int]:
+    """Sıradaki ``(type_cumulative, year_serial_all)``; çağıran transaction içinde olmalıdır."""
+
+    type_cum = _increment(ReportCounterGlobal, id=1)
+    year_serial = _increment(ReportCounterYearAll, year=year)
+    return type_cum, year_serial
+
+
+def reserve_document_block(doc_type: str, year: int, count: int) -> int:
+    """``count`` ardışık seri ayırır ve ilkini döner; toplu içe aktarma için tek kilitli adım."""
+
+    return _increment(DocumentCounter, step=count, doc_type=doc_type, year=year) - count + 1
+
+
+def reserve_report_block(year_counts: dict[int, int]) -> tuple[int, dict[int, int]]:
+    """Toplam kadar kümülatif numara ve yıl başına ardışık seri ayırır; ilk numaraları döner."""
+
+    total = sum(year_counts.values())
+    first_cum = _increment(ReportCounterGlobal, step=total, id=1) - total + 1
+    firsts = {}
+    for year in sorted(year_counts):
+        count = year_counts[year]
+        firsts[year] = _increment(ReportCounterYearAll, step=count, year=year) - count + 1
+    return first_cum, firsts
+
+
+def raise_document_counter(doc_type: str, year: int, serial: int):
+    _raise(DocumentCounter, serial, doc_type=doc_type, year=year)
+
+
+def raise_report_counters(year: int | None, type_cumulative: int | None = None, year_serial: int | None = None):
+    if type_cumulative:
+        _raise(ReportCounterGlobal, type_cumulative, id=1)
+    if year and year_serial:
+        _raise(ReportCounterYearAll, year_serial, year=year)
+
+
+def lock_document_counter(doc_type: str, year: int):
+    """Silme boyunca yeni numara verilmesini bekletir; son numara kontrolü bu kilit altında yapılır."""
+
+    return _lock(DocumentCounter, doc_type=doc_type, year=year)
+
+
+def lock_report_counters(year: int):
+    return _lock(ReportCounterGlobal, id=1), _lock(ReportCounterYearAll, year=year)
+
+
+def rewind_counter(counter, deleted: int, previous: int):
+    """Silinen numara sayaçtaki son numaraysa sayacı kalan en büyük numaraya geri alır."""
+
+    if counter.last_serial >= deleted:
+        counter.last_serial = previous
+        counter.save(update_fields=["last_serial"])
+
+
+def reconcile(*, apply: bool = True, registry=None) -> list[tuple[str, int, int]]:
+    """Sayaçları mevcut kayıtların (arşivliler dahil) en büyük numarasına yükseltir.
+
+    Sayaçlar hiçbir zaman geri alınmaz. Dönüş: ``[(sayaç, eski, yeni), ...]``.
+    ``registry`` migration içinden çağrılırken geçmiş model durumunu verir.
+    """
+
+    get_model = (registry or django_apps).get_model
+    Document = get_model("core", "Document")
+    Report = get_model("core", "Report")
+    targets = []
+    for row in Document.objects.values("doc_type", "year").annotate(top=Max("serial")).order_by():
+        targets.append(
+            (get_model("core", "DocumentCounter"), {"doc_type": row["doc_type"], "year": row["year"]}, row["top"])
+        )
+    for row in Report.objects.values("year").annotate(top=Max("year_serial_all")).order_by():
+        targets.append((get_model("core", "ReportCounterYearAll"), {"year": row["year"]}, row["top"]))
+    top = Report.objects.aggregate(top=Max("type_cumulative"))["top"]
+    if top:
+        targets.append((get_model("core", "ReportCounterGlobal"), {"id": 1}, top))
+
+    changes = []
+    for model, lookup, top in targets:
+        if not top:
+            continue
+        current = model.objects.filter(**lookup).values_list("last_serial", flat=True).first() or 0
+        if current >= top:
+            continue
+        label = "/".join(str(value) for value in lookup.values())
+        changes.append((f"{model.__name__} {label}", current, top))
+        if apply:
+            model.objects.bulk_create([model(**lookup)], ignore_conflicts=True)
+            model.objects.filter(**lookup, last_serial__lt=top).update(last_serial=top)
+    return changes
@@ -0,0 +1,183 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .streaming import streaming_response
+
+DEFAULT_ORDERING = ("-created_at", "-id")
+
+
+def _encode_cursor(values, direction: str) -> str:
+    raw = json.dumps({"v": values, "d": direction}, cls=JSONEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(token: str):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        values = data["v"]
+        direction = data["d"]
+    except Exception:
+        raise NotFound("Geçersiz sayfa imleci.")
+    if direction not in ("n", "p") or not isinstance(values, list):
+        raise NotFound("Geçersiz sayfa imleci.")
+    return values, direction
+
+
+def _keyset_filter(ordering, values, forward: bool) -> Q:
+    # (a, b, c) > (x, y, z) ifadesini alan bazında açar; her alanın yönü ayrı olabilir.
+    condition = Q()
+    for idx, field in enumerate(ordering):
+        name = field.lstrip("-")
+        descending = field.startswith("-")
+        if not forward:
+            descending = not descending
+        lookup = "lt" if descending else "gt"
+        step = Q(**{f"{name}__{lookup}": values[idx]})
+        for prev_field, prev_value in zip(ordering[:idx], values[:idx]):
+            step &= Q(**{prev_field.lstrip("-"): prev_value})
+        condition |= step
+    # İlk alan için aralık koşulu indeksin range scan ile kullanılmasını sağlar.
+    first = ordering[0]
+    first_desc = first.startswith("-") != (not forward)
+    bound = Q(**{f"{first.lstrip('-')}__{'lte' if first_desc else 'gte'}": values[0]})
+    return bound & condition
+
+
+def _reverse_ordering(ordering):
+    return tuple(f[1:] if f.startswith("-") else f"-{f}" for f in ordering)
+
+
+class KeysetPagination(BasePagination):
+    """Sabit sıralı anahtar (keyset) sayfalama.
+
+    Sıralama view üzerindeki ``keyset_ordering`` ile belirlenir; son alan benzersiz
+    olmalıdır (genelde ``id``). İmleç, sayfanın kenarındaki satırın anahtar
+    değerlerini taşır, bu yüzden sorgu maliyeti tablo büyüdükçe artmaz.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE") or 50
+        self.max_page_size = settings.REST_FRAMEWORK.get("MAX_PAGE_SIZE") or 500
+
+    def get_ordering(self, view):
+        return tuple(getattr(view, "keyset_ordering", None) or DEFAULT_ORDERING)
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                value = int(raw)
+            except (TypeError, ValueError):
+                value = 0
+            if value > 0:
+                return min(value, self.max_page_size)
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(view)
+        self.fields = tuple(f.lstrip("-") for f in self.ordering)
+        size = self.get_page_size(request)
+
+        token = request.query_params.get(self.cursor_query_param)
+        values, direction = (None, "n")
+        if token:
+            values, direction = _decode_cursor(token)
+            if len(values) != len(self.ordering):
+                raise NotFound("Geçersiz sayfa imleci.")
+
+        forward = direction == "n"
+        qs = queryset.order_by(*(self.ordering if forward else _reverse_ordering(self.ordering)))
+        if values is not None:
+            qs = qs.filter(_keyset_filter(self.ordering, values, forward))
+
+        rows = list(qs[: size + 1])
+        has_more = len(rows) > size
+        rows = rows[:size]
+        if not forward:
+            rows.reverse()
+
+        self.rows = rows
+        if forward:
+            self.has_next = has_more
+            self.has_previous = values is not None
+        else:
+            self.has_next = True
+            self.has_previous = has_more
+        return rows
+
+    def _row_key(self, row):
+        return [getattr(row, name) for name in self.fields]
+
+    def _link(self, row, direction):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, _encode_cursor(self._row_key(row), direction))
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        return self._link(self.rows[-1], "n")
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.rows:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self._link(self.rows[0], "p")
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+def stream_json_list(queryset, serializer_factory, chunk_size: int = 500):
+    """Sorgu sonucunu tamamını belleğe almadan JSON dizi olarak akıtır."""
+
+    encoder = JSONEncoder(ensure_ascii=False)
+
+    def generate():
+        yield "["
+        first = True
+        chunk = []
+        for row in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                for item in serializer_factory(chunk).data:
+                    yield ("" if first else ",") + encoder.encode(item)
+                    first = False
+                chunk = []
+        if chunk:
+            for item in serializer_factory(chunk).data:
+                yield ("" if first else ",") + encoder.encode(item)
+                first = False
+        yield "]"
+
+    return streaming_response(generate(), content_type="application/json")
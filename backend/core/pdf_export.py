@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import unicodedata
+from datetime import timedelta
+
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from . import exports, realtime
+from .mailer import write_table_pdf
+from .models import Contract, Customer, ExportJob
+from .storage import bucket_name, s3_client
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Aynı özetli iş bu süre içinde yeniden kullanılır; indirme bağlantısı da bu kadar geçerlidir.
+EXPORT_TTL = timedelta(hours=int(os.environ.get("PDF_EXPORT_TTL_HOURS", "24")))
+ROWS_KIND = "rows"
+
+
+def _set_status(job: ExportJob, status: str, **payload):
+    job.status = status
+    job.payload = {**job.payload, **payload}
+    job.save(update_fields=["status", "payload", "updated_at"])
+    if job.created_by_id:
+        realtime.publish([job.created_by_id], "export_job", {"id": job.id, "status": status})
+
+
+def data_version(kind: str, qs) -> str:
+    """Listedeki verinin sürümü: son güncelleme ve kayıt sayısı (ilişkili adlar dahil)."""
+
+    version = qs.order_by().aggregate(last=Max("updated_at"), total=Count("id"))
+    parts = [version["last"], version["total"]]
+    if exports.EXPORTS[kind].get("related"):
+        # Satırlarda müşteri adı ve sözleşme no da yazdığından onların değişikliği de sürümü değiştirir.
+        parts += [model.objects.aggregate(last=Max("updated_at"))["last"] for model in (Customer, Contract)]
+    return "|".join(str(part) for part in parts)
+
+
+def export_digest(title: str, columns, filters, version: str, note: str) -> str:
+    raw = json.dumps(
+        {"title": title, "columns": columns, "filters": filters, "version": version, "note": note},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _filename(title: str) -> str:
+    # İndirme başlığında ASCII ad kullanılır: Türkçe harfler sadeleştirilir, kalanlar "_" olur.
+    ascii_title = unicodedata.normalize("NFKD", title.replace("ı", "i").replace("İ", "I"))
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", ascii_title.encode("ascii", "ignore").decode()).strip("_")
+    return f"{name or 'Liste_Raporu'}.pdf"
+
+
+def prepare(*, title: str, note: str = "", kind: str = ROWS_KIND, filters=None, columns=None, rows=None) -> dict:
+    """Yeni iş için ``{"kind", "digest", "payload"}`` hazırlar.
+
+    ``kind`` bir liste türüyse satırlar worker'da ``filters`` ile sorgulanır ve özet verinin
+    o anki sürümünü içerir; ``rows`` türünde istemcinin gönderdiği ``columns``/``rows`` kullanılır.
+    """
+
+    if kind == ROWS_KIND:
+        filters = {}
+        version = hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()
+        payload = {"title": title, "note": note, "columns": columns, "rows": rows}
+    else:
+        filters = filters or {}
+        columns = exports.EXPORTS[kind]["columns"]
+        version = data_version(kind, exports.build_queryset(kind, filters))
+        payload = {"title": title, "note": note, "filters": filters}
+    return {"kind": kind, "digest": export_digest(title, columns, filters, version, note), "payload": payload}
+
+
+def reusable(digest: str) -> ExportJob | None:
+    """Aynı özetli, başarısız olmamış ve süresi dolmamış son iş."""
+
+    return (
+        ExportJob.objects.filter(digest=digest, is_archived=False, created_at__gte=timezone.now() - EXPORT_TTL)
+        .exclude(status=FAILED)
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def run_export_job(job_id: int) -> str:
+    """PDF'i worker'da geçici dosyaya üretip depoya yükler; sonuç ``payload["file"]``."""
+
+    job = ExportJob.objects.get(id=job_id)
+    if job.status not in (PENDING, RUNNING):
+        return job.status
+    title = job.payload["title"]
+    try:
+        _set_status(job, RUNNING)
+        if job.kind == ROWS_KIND:
+            columns = job.payload["columns"]
+            rows = job.payload["rows"]
+        else:
+            columns = exports.EXPORTS[job.kind]["columns"]
+            rows = list(exports.iter_table(job.kind, exports.build_queryset(job.kind, job.payload["filters"])))
+        key = f"exports/{job.digest}.pdf"
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+            write_table_pdf(tmp, title, columns, rows, job.payload.get("note"))
+            tmp.flush()
+            size = tmp.tell()
+            tmp.seek(0)
+            s3_client().upload_fileobj(tmp, bucket_name(), key, ExtraArgs={"ContentType": "application/pdf"})
+    except Exception as exc:
+        logger.warning("Dışa aktarma işi %s başarısız: %s", job_id, exc)
+        _set_status(job, FAILED, error=str(exc))
+        return FAILED
+    # İstemci satırları PDF üretildikten sonra saklanmaz; tekrar için özet yeterlidir.
+    job.payload.pop("rows", None)
+    _set_status(
+        job,
+        DONE,
+        file={"key": key, "filename": _filename(title), "size": size},
+        rows_count=len(rows),
+    )
+    return DONE
+
+
+def purge_expired(now=None) -> int:
+    """Süresi dolan işleri arşivler ve PDF'lerini depodan siler; aynı özetle yeniden üretilmiş dosyaya dokunmaz."""
+
+    cutoff = (now or timezone.now()) - EXPORT_TTL
+    expired = ExportJob.objects.filter(is_archived=False, created_at__lt=cutoff)
+    fresh = set(ExportJob.objects.filter(created_at__gte=cutoff).values_list("digest", flat=True))
+    client = s3_client()
+    purged = 0
+    for job in expired.iterator():
+        key = (job.payload.get("file") or {}).get("key")
+        if key and job.digest not in fresh:
+            try:
+                client.delete_object(Bucket=bucket_name(), Key=key)
+            except Exception as exc:
+                logger.warning("Dışa aktarma dosyası silinemedi %s: %s", key, exc)
+                continue
+        job.is_archived = True
+        job.payload.pop("rows", None)
+        job.save(update_fields=["is_archived", "payload", "updated_at"])
+        purged += 1
+    return purged
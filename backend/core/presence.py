@@ -0,0 +1,70 @@
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import redis
+
+from .realtime import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Son sinyalden bu kadar saniye sonra kullanıcı çevrimdışı sayılır.
+ONLINE_TTL = 60
+ONLINE_PREFIX = "ymm:presence:online:"
+LAST_SEEN_KEY = "ymm:presence:last_seen"
+
+
+def _online_key(user_id: int) -> str:
+    return f"{ONLINE_PREFIX}{user_id}"
+
+
+def _queue(pipe, user_id: int):
+    now = time.time()
+    pipe.set(_online_key(user_id), now, ex=ONLINE_TTL)
+    pipe.hset(LAST_SEEN_KEY, user_id, now)
+
+
+def heartbeat(user_id: int):
+    try:
+        pipe = redis_client().pipeline(transaction=False)
+        _queue(pipe, user_id)
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Çevrimiçi durumu yazılamadı: %s", exc)
+
+
+async def aheartbeat(client, user_id: int):
+    """SSE akışı açık kaldıkça kullanıcıyı çevrimiçi tutar."""
+
+    pipe = client.pipeline(transaction=False)
+    _queue(pipe, user_id)
+    await pipe.execute()
+
+
+def _to_datetime(raw):
+    if raw is None:
+        return None
+    return datetime.fromtimestamp(float(raw), tz=dt_timezone.utc)
+
+
+def get_presence(user_ids) -> dict | None:
+    """Kullanıcıların ``(is_online, last_seen_at)`` bilgisini tek turda okur.
+
+    Redis erişilemezse ``None`` döner; çağıran taraf veritabanına düşebilir.
+    """
+
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    try:
+        pipe = redis_client().pipeline(transaction=False)
+        pipe.mget([_online_key(uid) for uid in user_ids])
+        pipe.hmget(LAST_SEEN_KEY, user_ids)
+        online, last_seen = pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Çevrimiçi durumu okunamadı: %s", exc)
+        return None
+    return {
+        uid: (flag is not None, _to_datetime(seen or flag))
+        for uid, flag, seen in zip(user_ids, online, last_seen)
+    }
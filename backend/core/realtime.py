@@ -0,0 +1,79 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+import redis
+import redis.asyncio as aioredis
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15
+_sync_client = None
+
+
+def _redis_url() -> str:
+    return os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+
+def user_channel(user_id: int) -> str:
+    return f"ymm:chat:user:{user_id}"
+
+
+def redis_client():
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(_redis_url(), socket_connect_timeout=1, socket_timeout=1)
+    return _sync_client
+
+
+def publish(user_ids, event: str, payload: dict):
+    """Olayı kullanıcı kanallarına yayınlar; Redis erişilemezse istek akışını bozmaz."""
+
+    data = json.dumps({"event": event, "data": payload}, cls=JSONEncoder)
+    try:
+        pipe = redis_client().pipeline(transaction=False)
+        for user_id in set(user_ids):
+            pipe.publish(user_channel(user_id), data)
+        pipe.execute()
+    except redis.RedisError:
+        logger.warning("Sohbet olayı yayınlanamadı: %s", event, exc_info=True)
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def event_stream(user_id: int, heartbeat=None):
+    """Kullanıcının kanalını dinleyip Server-Sent Events biçiminde akıtır.
+
+    ``heartbeat(client, user_id)`` verilirse bağlantı açık kaldıkça periyodik çağrılır.
+    """
+
+    client = aioredis.Redis.from_url(_redis_url())
+    pubsub = client.pubsub()
+    await pubsub.subscribe(user_channel(user_id))
+    last_beat = 0.0
+    try:
+        yield _sse("ready", json.dumps({"user": user_id}))
+        while True:
+            now = time.monotonic()
+            if heartbeat and now - last_beat >= HEARTBEAT_SECONDS:
+                await heartbeat(client, user_id)
+                last_beat = now
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=HEARTBEAT_SECONDS)
+            if message is None:
+                # Proxy'lerin boştaki bağlantıyı kapatmaması için yorum satırı gönderilir.
+                yield ": ping\n\n"
+                continue
+            raw = message["data"]
+            body = json.loads(raw)
+            yield _sse(body["event"], json.dumps(body["data"], ensure_ascii=False))
+    except asyncio.CancelledError:
+        raise
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
+        await client.aclose()
@@ -0,0 +1,154 @@
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+import redis
+from django.db import transaction
+from django.db.models import Case, DateTimeField, F, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import ChatParticipant
+from .realtime import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Okundu bilgileri Redis'te biriktirilir ve ``flush_read_receipts`` beat görevi tarafından bu
+# aralıkla toplu yazılır. Sessiz bir aralıktan sonraki ilk okundu bilgisi (kilidi alan
+# ``mark_read``) tamponu hemen yazar; aralığın geri kalanındakiler beat görevini bekler.
+FLUSH_INTERVAL = 30
+PENDING_PREFIX = "ymm:chat:read:"
+DIRTY_KEY = "ymm:chat:read:dirty"
+FLUSH_LOCK_KEY = "ymm:chat:read:flush"
+
+# Alan yalnızca daha yeni bir zaman geldiğinde güncellenir (monoton max).
+_MARK_SCRIPT = """
+local cur = redis.call('HGET', KEYS[1], ARGV[1])
+if (not cur) or tonumber(cur) < tonumber(ARGV[2]) then
+  redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+end
+redis.call('SADD', KEYS[2], ARGV[3])
+return redis.call('SET', KEYS[3], '1', 'NX', 'EX', ARGV[4])
+"""
+
+
+def _pending_key(user_id: int) -> str:
+    return f"{PENDING_PREFIX}{user_id}"
+
+
+def _to_datetime(raw) -> datetime:
+    return datetime.fromtimestamp(float(raw), tz=dt_timezone.utc)
+
+
+def _write(entries):
+    """``(thread_id, user_id, zaman)`` kayıtlarını tek UPDATE ile yazar; geri gitmez."""
+
+    latest = {}
+    for thread_id, user_id, ts in entries:
+        key = (int(thread_id), int(user_id))
+        if key not in latest or latest[key] < ts:
+            latest[key] = ts
+    if not latest:
+        return 0
+    pairs = Q()
+    for thread_id, user_id in latest:
+        pairs |= Q(thread_id=thread_id, user_id=user_id)
+    rows = list(ChatParticipant.objects.filter(pairs).values_list("id", "thread_id", "user_id"))
+    if not rows:
+        return 0
+    target = Case(
+        *[When(id=pk, then=Value(latest[(thread_id, user_id)])) for pk, thread_id, user_id in rows],
+        output_field=DateTimeField(),
+    )
+    return ChatParticipant.objects.filter(id__in=[row[0] for row in rows]).update(
+        last_read_at=Greatest(Coalesce(F("last_read_at"), target), target)
+    )
+
+
+def _buffer(thread_id: int, user_id: int, when: datetime):
+    return redis_client().eval(
+        _MARK_SCRIPT,
+        3,
+        _pending_key(user_id),
+        DIRTY_KEY,
+        FLUSH_LOCK_KEY,
+        int(thread_id),
+        when.timestamp(),
+        int(user_id),
+        FLUSH_INTERVAL,
+    )
+
+
+def mark_read(thread_id: int, user_id: int, when: datetime):
+    """Okundu zamanını tamponlar; Redis yoksa doğrudan veritabanına yazar."""
+
+    try:
+        acquired = _buffer(thread_id, user_id, when)
+    except redis.RedisError as exc:
+        logger.warning("Okundu bilgisi tamponlanamadı: %s", exc)
+        _write([(thread_id, user_id, when)])
+        return
+    if acquired:
+        transaction.on_commit(flush)
+
+
+def pending(user_id: int) -> dict:
+    """Henüz yazılmamış okundu zamanları: ``{thread_id: datetime}``."""
+
+    return pending_many([user_id]).get(int(user_id), {})
+
+
+def pending_many(user_ids) -> dict:
+    """Birden çok kullanıcının tampondaki okundu zamanları tek pipeline ile: ``{user_id: {thread_id: datetime}}``."""
+
+    user_ids = [int(user_id) for user_id in user_ids]
+    if not user_ids:
+        return {}
+    try:
+        pipe = redis_client().pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.hgetall(_pending_key(user_id))
+        results = pipe.execute()
+    except redis.RedisError:
+        return {}
+    return {
+        user_id: {int(thread_id): _to_datetime(ts) for thread_id, ts in raw.items()}
+        for user_id, raw in zip(user_ids, results)
+        if raw
+    }
+
+
+def flush(user_ids=None) -> int:
+    """Tampondaki okundu bilgilerini toplu yazar; ``user_ids`` verilmezse tümünü."""
+
+    try:
+        client = redis_client()
+        if user_ids is None:
+            user_ids = [int(v) for v in client.spop(DIRTY_KEY, client.scard(DIRTY_KEY) or 1) or []]
+        else:
+            user_ids = [int(v) for v in user_ids]
+            if user_ids:
+                client.srem(DIRTY_KEY, *user_ids)
+        if not user_ids:
+            return 0
+        pipe = client.pipeline(transaction=True)
+        for user_id in user_ids:
+            pipe.hgetall(_pending_key(user_id))
+            pipe.delete(_pending_key(user_id))
+        results = pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Okundu tamponu okunamadı: %s", exc)
+        return 0
+
+    entries = []
+    for user_id, raw in zip(user_ids, results[::2]):
+        for thread_id, ts in raw.items():
+            entries.append((int(thread_id), user_id, _to_datetime(ts)))
+    try:
+        return _write(entries)
+    except Exception:
+        # Yazılamayan kayıtlar kaybolmasın; tampona geri konur.
+        for thread_id, user_id, ts in entries:
+            try:
+                _buffer(thread_id, user_id, ts)
+            except redis.RedisError:
+                break
+        raise
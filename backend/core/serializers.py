@@ -1,9 +1,6 @@
-﻿import os
-from urllib.parse import urlparse
-
-import boto3
-from botocore.client import Config
-from rest_framework import serializers
+﻿from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError as DjangoValidationError
@@ -15,91 +12,87 @@ from .models import (
     File,
     Note,
     ContractJob,
+    ImportJob,
+    ExportJob,
     Contract,
     AppSetting,
-    DocumentCounter,
-    ReportCounterGlobal,
-    ReportCounterYearAll,
     YearLock,
     ChatThread,
     ChatParticipant,
     ChatMessage,
     ChatMessageFile,
+    MailOutbox,
     year_is_locked,
 )
+from . import numbering
+from .storage import presigner
 
 User = get_user_model()
 
 
+class PresignedListSerializer(serializers.ListSerializer):
+    """Sayfadaki tüm dosya URL'lerini tek seferde imzalayıp önbelleği ısıtır."""
 
-def _s3_client(endpoint_override: str | None = None):
-    endpoint = endpoint_override or os.environ.get("MINIO_ENDPOINT", "localhost:9000")
-    access_key = os.environ.get("MINIO_ACCESS_KEY", "minio")
-    secret_key = os.environ.get("MINIO_SECRET_KEY", "minio123")
-    secure = os.environ.get("MINIO_SECURE", "false").lower() == "true"
-    scheme = "https" if secure else "http"
-    return boto3.client(
-        "s3",
-        endpoint_url=f"{scheme}://{endpoint}",
-        aws_access_key_id=access_key,
-        aws_secret_access_key=secret_key,
-        config=Config(signature_version="s3v4"),
-        region_name="us-east-1",
-    )
+    def to_representation(self, data):
+        rows = list(data.all() if hasattr(data, "all") else data)
+        url_field = getattr(self.child, "presign_url_field", "url")
+        presigner.presign_many([getattr(row, url_field, None) for row in rows])
+        return super().to_representation(rows)
 
 
-def _extract_key(url: str, bucket: str) -> str | None:
-    if not url:
-        return None
-    try:
-        path = urlparse(url).path.lstrip("/")
-    except Exception:
-        return None
-    prefix = f"{bucket}/"
-    if path.startswith(prefix):
-        return path[len(prefix) :]
-    return None
-
-
-def _presign(url: str) -> str | None:
-    bucket = os.environ.get("MINIO_BUCKET", "ymm-files")
-    key = _extract_key(url, bucket)
-    if not key:
-        return None
-    expires = int(os.environ.get("MINIO_PRESIGN_EXPIRES", "3600"))
-    public_endpoint = os.environ.get("MINIO_PUBLIC_ENDPOINT")
-    client = _s3_client(endpoint_override=public_endpoint)
-    return client.generate_presigned_url(
-        "get_object",
-        Params={"Bucket": bucket, "Key": key},
-        ExpiresIn=expires,
-    )
+class SparseFieldsMixin:
+    """``fields`` ve ``expand`` argümanlarıyla çıktı alanlarını daraltır.
+
+    ``Meta.expandable_fields`` içindeki ilişkiler yalnızca ``expand`` ile
+    istendiğinde serileştirilir. İki argüman da verilmezse serializer tüm
+    alanlarıyla çalışır (yazma işlemleri bu şekilde kullanır).
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        expandable = set(getattr(self.Meta, "expandable_fields", ()))
+        if expand is not None:
+            for name in expandable - set(expand):
+                self.fields.pop(name, None)
+        if fields:
+            allowed = set(fields) | (expandable & set(expand or ()))
+            for name in list(self.fields):
+                if name not in allowed:
+                    self.fields.pop(name)
+
+
+def normalize_identity(identity_type, tax_no, tckn):
+    """Kimlik türüne göre ``(tax_no, tckn)`` döner; kullanılmayan numara boşaltılır."""
+
+    tax_no = (tax_no or "").strip() or None
+    tckn = (tckn or "").strip() or None
+
+    if tax_no and (not tax_no.isdigit() or len(tax_no) != 10):
+        raise serializers.ValidationError({"tax_no": "Vergi No 10 haneli ve sadece rakam olmalıdır."})
+    if tckn and (not tckn.isdigit() or len(tckn) != 11):
+        raise serializers.ValidationError({"tckn": "TCKN 11 haneli ve sadece rakam olmalıdır."})
+
+    if identity_type == "VKN":
+        if not tax_no:
+            raise serializers.ValidationError({"tax_no": "Vergi No zorunludur."})
+        tckn = None
+    elif identity_type == "TCKN":
+        if not tckn:
+            raise serializers.ValidationError({"tckn": "TCKN zorunludur."})
+        tax_no = None
+    else:
+        raise serializers.ValidationError({"identity_type": "Geçersiz kimlik türü."})
+    return tax_no, tckn
+
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     def validate(self, attrs):
         instance = getattr(self, "instance", None)
-        identity_type = attrs.get("identity_type", getattr(instance, "identity_type", "VKN"))
-        tax_no = attrs.get("tax_no", getattr(instance, "tax_no", None))
-        tckn = attrs.get("tckn", getattr(instance, "tckn", None))
-
-        tax_no = (tax_no or "").strip() or None
-        tckn = (tckn or "").strip() or None
-
-        if tax_no and (not tax_no.isdigit() or len(tax_no) != 10):
-            raise serializers.ValidationError({"tax_no": "Vergi No 10 haneli ve sadece rakam olmalıdır."})
-        if tckn and (not tckn.isdigit() or len(tckn) != 11):
-            raise serializers.ValidationError({"tckn": "TCKN 11 haneli ve sadece rakam olmalıdır."})
-
-        if identity_type == "VKN":
-            if not tax_no:
-                raise serializers.ValidationError({"tax_no": "Vergi No zorunludur."})
-            tckn = None
-        elif identity_type == "TCKN":
-            if not tckn:
-                raise serializers.ValidationError({"tckn": "TCKN zorunludur."})
-            tax_no = None
-        else:
-            raise serializers.ValidationError({"identity_type": "Geçersiz kimlik türü."})
+        tax_no, tckn = normalize_identity(
+            attrs.get("identity_type", getattr(instance, "identity_type", "VKN")),
+            attrs.get("tax_no", getattr(instance, "tax_no", None)),
+            attrs.get("tckn", getattr(instance, "tckn", None)),
+        )
 
         qs = Customer.objects.all()
         if instance:
@@ -119,19 +112,37 @@ class CustomerSerializer(serializers.ModelSerializer):
         read_only_fields = ("created_by", "updated_by", "created_at", "updated_at", "is_archived")
 
 
-class FileSerializer(serializers.ModelSerializer):
+class CustomerImportSerializer(serializers.ModelSerializer):
+    """Toplu müşteri satırı; tekillik sorgusu yapılmaz, kayıt vergi no/TCKN üzerinden upsert edilir."""
+
+    tax_no = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    tckn = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+
+    def validate(self, attrs):
+        attrs["tax_no"], attrs["tckn"] = normalize_identity(
+            attrs.get("identity_type", "VKN"), attrs.get("tax_no"), attrs.get("tckn")
+        )
+        return attrs
+
+    class Meta:
+        model = Customer
+        exclude = ("created_by", "updated_by", "created_at", "updated_at", "is_archived")
+
+
+class FileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     signed_url = serializers.SerializerMethodField()
 
     class Meta:
         model = File
         fields = "__all__"
         read_only_fields = ("url", "created_by", "updated_by", "created_at", "updated_at", "is_archived")
+        list_serializer_class = PresignedListSerializer
 
     def get_signed_url(self, obj):
-        return _presign(obj.url) or obj.url
+        return presigner.presign(obj.url) or obj.url
 
 
-class NoteSerializer(serializers.ModelSerializer):
+class NoteSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     files = FileSerializer(source="note_files", many=True, read_only=True)
     source_label = serializers.SerializerMethodField()
     source_code = serializers.SerializerMethodField()
@@ -191,7 +202,7 @@ class NoteSerializer(serializers.ModelSerializer):
         return "-"
 
 
-class DocumentSerializer(serializers.ModelSerializer):
+class DocumentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     files = FileSerializer(many=True, read_only=True)
     manual_serial = serializers.IntegerField(write_only=True, required=False)
     manual_doc_no = serializers.CharField(write_only=True, required=False)
@@ -208,6 +219,25 @@ class DocumentSerializer(serializers.ModelSerializer):
             "updated_at",
             "is_archived",
         )
+        expandable_fields = ("files",)
+        list_fields = (
+            "id",
+            "customer",
+            "contract",
+            "doc_type",
+            "year",
+            "serial",
+            "doc_no",
+            "status",
+            "received_date",
+            "reference_no",
+            "sender",
+            "recipient",
+            "subject",
+            "created_at",
+            "updated_at",
+            "is_archived",
+        )
 
     def validate_received_date(self, value):
         if value is None:
@@ -275,21 +305,21 @@ class DocumentSerializer(serializers.ModelSerializer):
             validated_data["serial"] = manual_serial
             validated_data["doc_no"] = manual_doc_no
 
-        instance = super().create(validated_data)
-
-        if manual_serial and year:
-            counter, _ = DocumentCounter.objects.get_or_create(
-                doc_type=instance.doc_type,
-                year=year,
-            )
-            if manual_serial > counter.last_serial:
-                counter.last_serial = manual_serial
-                counter.save()
+        # Manuel numarada sayaç önce kilitlenir; kayıt ve sayaç yükseltmesi tek transaction'dadır.
+        # Böylece arada otomatik numara alan istek manuel numarayı tekrar veremez.
+        with transaction.atomic():
+            if manual_serial and year:
+                numbering.lock_document_counter(validated_data["doc_type"], year)
+                if Document.objects.filter(doc_type=validated_data["doc_type"], year=year, serial=manual_serial).exists():
+                    raise serializers.ValidationError("Bu seri numarası kullanılmış.")
+            instance = super().create(validated_data)
+            if manual_serial and year:
+                numbering.raise_document_counter(instance.doc_type, year, manual_serial)
 
         return instance
 
 
-class ReportSerializer(serializers.ModelSerializer):
+class ReportSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     files = FileSerializer(many=True, read_only=True)
     manual_report_no = serializers.CharField(write_only=True, required=False)
     manual_type_cumulative = serializers.IntegerField(write_only=True, required=False)
@@ -308,6 +338,28 @@ class ReportSerializer(serializers.ModelSerializer):
             "updated_at",
             "is_archived",
         )
+        expandable_fields = ("files",)
+        list_fields = (
+            "id",
+            "customer",
+            "contract",
+            "report_type",
+            "year",
+            "type_cumulative",
+            "year_serial_all",
+            "report_no",
+            "status",
+            "received_date",
+            "period_start_month",
+            "period_start_year",
+            "period_end_month",
+            "period_end_year",
+            "recipient",
+            "subject",
+            "created_at",
+            "updated_at",
+            "is_archived",
+        )
 
     def validate_received_date(self, value):
         if value is None:
@@ -404,40 +456,107 @@ class ReportSerializer(serializers.ModelSerializer):
             validated_data["type_cumulative"] = manual_type_cumulative
             validated_data["year_serial_all"] = manual_year_serial_all
 
-        instance = super().create(validated_data)
+        # Kilit sırası otomatik numarayla aynıdır (genel sayaç -> yıl sayacı).
+        with transaction.atomic():
+            if manual_type_cumulative or manual_year_serial_all:
+                numbering.lock_report_counters(year)
+                taken = Q(type_cumulative=manual_type_cumulative) | Q(year=year, year_serial_all=manual_year_serial_all)
+                if Report.objects.filter(taken).exists():
+                    raise serializers.ValidationError("Bu rapor numarası kullanılmış.")
+            instance = super().create(validated_data)
+            numbering.raise_report_counters(year, manual_type_cumulative, manual_year_serial_all)
 
-        if manual_type_cumulative:
-            global_counter, _ = ReportCounterGlobal.objects.get_or_create(id=1)
-            if manual_type_cumulative > global_counter.last_serial:
-                global_counter.last_serial = manual_type_cumulative
-                global_counter.save()
+        return instance
 
-        if manual_year_serial_all and year:
-            year_counter, _ = ReportCounterYearAll.objects.get_or_create(year=year)
-            if manual_year_serial_all > year_counter.last_serial:
-                year_counter.last_serial = manual_year_serial_all
-                year_counter.save()
 
-        return instance
+class _ImportRowSerializer(serializers.ModelSerializer):
+    """Toplu içe aktarma satırı; sorgu yapmadan alan biçimlerini doğrular (ilişkiler toplu çözülür)."""
+
+    customer = serializers.IntegerField(required=False)
+    customer_tax_no = serializers.CharField(required=False)
+    contract = serializers.IntegerField(required=False, allow_null=True)
+    received_date = serializers.DateField(input_formats=["iso-8601", "%d.%m.%Y"])
+
+    def validate(self, attrs):
+        if not attrs.get("customer") and not attrs.get("customer_tax_no"):
+            raise serializers.ValidationError("Müşteri (id veya vergi no) zorunludur.")
+        return attrs
+
+
+class DocumentImportSerializer(_ImportRowSerializer):
+    class Meta:
+        model = Document
+        exclude = ("serial", "doc_no", "created_by", "updated_by", "created_at", "updated_at", "is_archived")
+
+
+class ReportImportSerializer(_ImportRowSerializer):
+    class Meta:
+        model = Report
+        exclude = (
+            "report_no",
+            "type_cumulative",
+            "year_serial_all",
+            "created_by",
+            "updated_by",
+            "created_at",
+            "updated_at",
+            "is_archived",
+        )
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        start = (attrs.get("period_start_year"), attrs.get("period_start_month"))
+        end = (attrs.get("period_end_year"), attrs.get("period_end_month"))
+        if not all(start + end):
+            raise serializers.ValidationError("Dönem başlangıç ve bitiş bilgileri zorunludur.")
+        if not (1 <= start[1] <= 12 and 1 <= end[1] <= 12):
+            raise serializers.ValidationError("Ay bilgisi 1-12 aralığında olmalıdır.")
+        if end < start:
+            raise serializers.ValidationError("Dönem bitişi başlangıçtan önce olamaz.")
+        return attrs
 
 
 class ContractJobSerializer(serializers.ModelSerializer):
     class Meta:
         model = ContractJob
         fields = "__all__"
-        read_only_fields = ("status", "created_by", "updated_by", "created_at", "updated_at", "is_archived")
+        read_only_fields = ("status", "payload", "created_by", "updated_by", "created_at", "updated_at", "is_archived")
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = "__all__"
+        read_only_fields = ("status", "payload", "created_by", "updated_by", "created_at", "updated_at", "is_archived")
+
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    # payload istemciden gelen satırları da içerebilir; sonuç status ile alınır.
+    class Meta:
+        model = ExportJob
+        fields = ("id", "kind", "status", "digest", "created_at", "updated_at")
+        read_only_fields = fields
+
+class MailOutboxSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MailOutbox
+        fields = ("id", "status", "subject", "to", "note", "attempts", "last_error", "sent_at", "created_at", "updated_at")
+        read_only_fields = fields
 
 
-class ContractSerializer(serializers.ModelSerializer):
+class ContractSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     signed_url = serializers.SerializerMethodField()
+    presign_url_field = "file_url"
 
     class Meta:
         model = Contract
         fields = "__all__"
         read_only_fields = ("created_by", "updated_by", "created_at", "updated_at", "is_archived")
+        list_serializer_class = PresignedListSerializer
 
     def get_signed_url(self, obj):
-        return _presign(obj.file_url) or obj.file_url
+        return presigner.presign(obj.file_url) or obj.file_url
 
 
 class AppSettingSerializer(serializers.ModelSerializer):
@@ -509,9 +628,10 @@ class ChatMessageFileSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChatMessageFile
         fields = ("id", "filename", "content_type", "size", "url", "signed_url", "created_at")
+        list_serializer_class = PresignedListSerializer
 
     def get_signed_url(self, obj):
-        return _presign(obj.url) or obj.url
+        return presigner.presign(obj.url) or obj.url
 
 
 class ChatMessageSerializer(serializers.ModelSerializer):
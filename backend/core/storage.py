@@ -0,0 +1,244 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+import boto3
+from botocore.client import Config
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+UPLOAD_EXPIRES = 900
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(200 * 1024 * 1024)))
+MULTIPART_PART_SIZE = int(os.environ.get("UPLOAD_PART_SIZE", str(8 * 1024 * 1024)))
+MULTIPART_MAX_PARTS = 10000
+MULTIPART_MAX_BYTES = int(os.environ.get("MULTIPART_MAX_BYTES", str(5 * 1024 * 1024 * 1024)))
+
+
+def bucket_name() -> str:
+    return os.environ.get("MINIO_BUCKET", "ymm-files")
+
+
+def _endpoint_url(endpoint: str) -> str:
+    secure = os.environ.get("MINIO_SECURE", "false").lower() == "true"
+    scheme = "https" if secure else "http"
+    return f"{scheme}://{endpoint}"
+
+
+def s3_client(endpoint_override: str | None = None):
+    # boto3 client oluşturmak pahalıdır; uç nokta başına tek client süreç boyunca paylaşılır.
+    endpoint = endpoint_override or os.environ.get("MINIO_ENDPOINT", "localhost:9000")
+    client = _clients.get(endpoint)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(endpoint)
+        if client is None:
+            client = boto3.client(
+                "s3",
+                endpoint_url=_endpoint_url(endpoint),
+                aws_access_key_id=os.environ.get("MINIO_ACCESS_KEY", "minio"),
+                aws_secret_access_key=os.environ.get("MINIO_SECRET_KEY", "minio123"),
+                config=Config(signature_version="s3v4"),
+                region_name="us-east-1",
+            )
+            _clients[endpoint] = client
+    return client
+
+
+def _public_client():
+    return s3_client(endpoint_override=os.environ.get("MINIO_PUBLIC_ENDPOINT"))
+
+
+def object_url(key: str, bucket: str | None = None) -> str:
+    """Veritabanında saklanan, herkese açık uç noktalı nesne adresi."""
+
+    bucket = bucket or bucket_name()
+    endpoint = os.environ.get("MINIO_PUBLIC_ENDPOINT") or os.environ.get("MINIO_ENDPOINT", "localhost:9000")
+    return f"{_endpoint_url(endpoint)}/{bucket}/{key}"
+
+
+def presign_upload(key: str, content_type: str, max_bytes: int | None = None) -> dict:
+    """Tarayıcının dosyayı doğrudan MinIO'ya yüklemesi için imzalı POST politikası."""
+
+    max_bytes = max_bytes or UPLOAD_MAX_BYTES
+    return _public_client().generate_presigned_post(
+        Bucket=bucket_name(),
+        Key=key,
+        Fields={"Content-Type": content_type},
+        Conditions=[{"Content-Type": content_type}, ["content-length-range", 1, max_bytes]],
+        ExpiresIn=UPLOAD_EXPIRES,
+    )
+
+
+def multipart_part_size(size: int) -> int:
+    """S3 en az 5 MB parça ve en fazla 10.000 parça kabul eder."""
+
+    return max(MULTIPART_PART_SIZE, 5 * 1024 * 1024, -(-int(size) // MULTIPART_MAX_PARTS))
+
+
+def presign_download(key: str, filename: str, expires: int) -> str:
+    """Tarayıcının dosyayı verilen adla indireceği imzalı GET adresi."""
+
+    return _public_client().generate_presigned_url(
+        "get_object",
+        Params={
+            "Bucket": bucket_name(),
+            "Key": key,
+            "ResponseContentDisposition": f'attachment; filename="{filename}"',
+        },
+        ExpiresIn=expires,
+    )
+
+
+def create_multipart(key: str, content_type: str) -> str:
+    response = s3_client().create_multipart_upload(Bucket=bucket_name(), Key=key, ContentType=content_type)
+    return response["UploadId"]
+
+
+def presign_parts(key: str, upload_id: str, part_numbers) -> dict:
+    """Her parça için tarayıcının doğrudan PUT yapacağı imzalı URL."""
+
+    client = _public_client()
+    return {
+        number: client.generate_presigned_url(
+            "upload_part",
+            Params={"Bucket": bucket_name(), "Key": key, "UploadId": upload_id, "PartNumber": number},
+            ExpiresIn=UPLOAD_EXPIRES,
+        )
+        for number in part_numbers
+    }
+
+
+def list_parts(key: str, upload_id: str) -> list:
+    """Yüklenmiş parçalar: ``[{"PartNumber", "ETag", "Size"}, ...]``."""
+
+    client = s3_client()
+    parts = []
+    kwargs = {"Bucket": bucket_name(), "Key": key, "UploadId": upload_id}
+    while True:
+        response = client.list_parts(**kwargs)
+        parts.extend(
+            {"PartNumber": p["PartNumber"], "ETag": p["ETag"], "Size": p["Size"]} for p in response.get("Parts", [])
+        )
+        if not response.get("IsTruncated"):
+            return parts
+        kwargs["PartNumberMarker"] = response["NextPartNumberMarker"]
+
+
+def complete_multipart(key: str, upload_id: str, parts: list):
+    s3_client().complete_multipart_upload(
+        Bucket=bucket_name(),
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={"Parts": [{"PartNumber": p["PartNumber"], "ETag": p["ETag"]} for p in parts]},
+    )
+
+
+def abort_multipart(key: str, upload_id: str):
+    s3_client().abort_multipart_upload(Bucket=bucket_name(), Key=key, UploadId=upload_id)
+
+
+def abort_stale_multipart(older_than) -> int:
+    """``older_than`` zamanından önce başlatılıp tamamlanmamış yüklemeleri iptal eder."""
+
+    client = s3_client()
+    aborted = 0
+    kwargs = {"Bucket": bucket_name()}
+    while True:
+        response = client.list_multipart_uploads(**kwargs)
+        for upload in response.get("Uploads", []):
+            if upload["Initiated"] < older_than:
+                client.abort_multipart_upload(Bucket=bucket_name(), Key=upload["Key"], UploadId=upload["UploadId"])
+                aborted += 1
+        if not response.get("IsTruncated"):
+            return aborted
+        kwargs["KeyMarker"] = response.get("NextKeyMarker")
+        kwargs["UploadIdMarker"] = response.get("NextUploadIdMarker")
+
+
+def extract_key(url: str, bucket: str | None = None) -> str | None:
+    if not url:
+        return None
+    bucket = bucket or bucket_name()
+    try:
+        path = urlparse(url).path.lstrip("/")
+    except Exception:
+        return None
+    prefix = f"{bucket}/"
+    if path.startswith(prefix):
+        return path[len(prefix) :]
+    return None
+
+
+class Presigner:
+    """Paylaşılan client ile üretilen imzalı URL'leri TTL önbellekte tutar.
+
+    URL'ler ``(key, süre dilimi)`` anahtarıyla saklanır. Dilim süresi, URL
+    geçerlilik süresinin yarısıdır; böylece önbellekten dönen her URL en az
+    yarı süre daha geçerli kalır ve süresi dolmadan yenisi üretilir.
+    """
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def expires(self) -> int:
+        return int(os.environ.get("MINIO_PRESIGN_EXPIRES", "3600"))
+
+    def _bucket_of(self, now: float) -> int:
+        return int(now // max(self.expires // 2, 1))
+
+    def current_slot(self) -> int:
+        return self._bucket_of(time.time())
+
+    def _generate(self, key: str) -> str:
+        client = s3_client(endpoint_override=os.environ.get("MINIO_PUBLIC_ENDPOINT"))
+        return client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket_name(), "Key": key},
+            ExpiresIn=self.expires,
+        )
+
+    def presign(self, url: str) -> str | None:
+        return self.presign_many([url]).get(url)
+
+    def presign_many(self, urls) -> dict:
+        result = {}
+        slot = self._bucket_of(time.time())
+        missing = []
+        with self._lock:
+            for url in urls:
+                if not url or url in result:
+                    continue
+                key = extract_key(url)
+                if not key:
+                    result[url] = None
+                    continue
+                cached = self._cache.get((key, slot))
+                if cached is not None:
+                    self._cache.move_to_end((key, slot))
+                    result[url] = cached
+                else:
+                    missing.append((url, key))
+        if not missing:
+            return result
+        generated = [(url, key, self._generate(key)) for url, key in missing]
+        with self._lock:
+            for url, key, signed in generated:
+                self._cache[(key, slot)] = signed
+                result[url] = signed
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+presigner = Presigner()
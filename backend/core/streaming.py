@@ -0,0 +1,46 @@
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+
+# Worker iş parçacığına her geçişte en az bu kadar veri alınır; satır başına geçiş yapılmaz.
+BATCH_BYTES = 64 * 1024
+
+
+def _next_batch(iterator):
+    parts = []
+    size = 0
+    for part in iterator:
+        parts.append(part)
+        size += len(part)
+        if size >= BATCH_BYTES:
+            break
+    return parts
+
+
+def _close(iterator):
+    close = getattr(iterator, "close", None)
+    if close is not None:
+        close()
+
+
+async def _aiterate(content):
+    iterator = iter(content)
+    try:
+        while True:
+            parts = await sync_to_async(_next_batch)(iterator)
+            if not parts:
+                return
+            yield parts[0][:0].join(parts)
+    finally:
+        # İstemci bağlantıyı kestiğinde sunucu tarafı imleç de kapanır.
+        await sync_to_async(_close)(iterator)
+
+
+def streaming_response(content, **kwargs) -> StreamingHttpResponse:
+    """Senkron üreteci ASGI altında parça parça akıtan yanıt.
+
+    Django senkron üreteçleri ASGI'de önce tamamen listeye çevirir; burada her parti
+    ``sync_to_async`` ile çekildiğinden veritabanı imleci aynı iş parçacığında kalır ve
+    yanıt belleğe alınmadan gönderilir.
+    """
+
+    return StreamingHttpResponse(_aiterate(content), **kwargs)
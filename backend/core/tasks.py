@@ -1,8 +1,79 @@
-﻿from celery import shared_task
-from .models import ContractJob
+﻿from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+from .models import MailOutbox
+from .customer_import import run_import_job
+from .pdf_export import purge_expired, run_export_job
+from .ingest import run_contract_job
+from .mailer import deliver, deliver_many
+from .receipts import flush as flush_receipts
+from .storage import abort_stale_multipart
+
+MAIL_MAX_RETRIES = 5
 
 @shared_task
 def process_contract_job(job_id):
-    job = ContractJob.objects.get(id=job_id)
-    job.status = "done"
-    job.save()
+    return run_contract_job(job_id)
+
+
+@shared_task
+def process_import_job(job_id):
+    return run_import_job(job_id)
+
+
+@shared_task
+def process_export_job(job_id):
+    return run_export_job(job_id)
+
+
+@shared_task(bind=True, max_retries=MAIL_MAX_RETRIES)
+def send_outbox_mail(self, outbox_id):
+    final = self.request.retries >= self.max_retries
+    try:
+        deliver(outbox_id, final=final)
+    except Exception as exc:
+        if final:
+            raise
+        # 30 sn, 1 dk, 2 dk, ... şeklinde artan bekleme ile yeniden dener.
+        raise self.retry(exc=exc, countdown=30 * 2 ** self.request.retries)
+
+
+@shared_task
+def send_queued_mail(limit=200, idle_minutes=15):
+    """Görevi kaybolmuş bekleyen mailleri gönderir (ör. kuyruğa yazılırken broker kapalıysa).
+
+    Yeniden deneme beklemesindeki kayıtlara dokunmamak için yalnızca ``idle_minutes``
+    boyunca güncellenmemiş kayıtlar alınır.
+    """
+
+    cutoff = timezone.now() - timedelta(minutes=idle_minutes)
+    ids = list(
+        MailOutbox.objects.filter(status__in=("QUEUED", "SENDING"), updated_at__lt=cutoff)
+        .order_by("created_at")
+        .values_list("id", flat=True)[:limit]
+    )
+    results = deliver_many(ids, max_attempts=MAIL_MAX_RETRIES + 1)
+    failed = sum(1 for error in results.values() if error is not None)
+    return {"sent": len(results) - failed, "failed": failed}
+
+
+@shared_task
+def abort_stale_uploads(max_age_hours=24):
+    """Tamamlanmadan bırakılan multipart yüklemeleri iptal eder; parçalar depoda yer kaplamaz."""
+
+    return {"aborted": abort_stale_multipart(timezone.now() - timedelta(hours=max_age_hours))}
+
+
+@shared_task
+def purge_exports():
+    """Süresi dolan PDF dışa aktarımlarını depodan siler."""
+
+    return {"purged": purge_expired()}
+
+
+@shared_task
+def flush_read_receipts():
+    """Redis'te biriken okundu bilgilerini veritabanına yazar; sohbet sessizken de bekletmez."""
+
+    return {"written": flush_receipts()}
@@ -11,6 +11,9 @@ from .views import (
     FileViewSet,
     NoteViewSet,
     ContractJobViewSet,
+    ImportJobViewSet,
+    ExportJobViewSet,
+    MailOutboxViewSet,
     ContractViewSet,
     SettingsViewSet,
     CounterAdminViewSet,
@@ -18,6 +21,9 @@ from .views import (
     ChatThreadViewSet,
     ChatMessageViewSet,
     backup,
+    dashboard,
+    chat_events,
+    chat_events_token,
 )
 
 router = DefaultRouter()
@@ -27,6 +33,9 @@ router.register(r"reports", ReportViewSet)
 router.register(r"files", FileViewSet)
 router.register(r"notes", NoteViewSet)
 router.register(r"contract-jobs", ContractJobViewSet)
+router.register(r"import-jobs", ImportJobViewSet)
+router.register(r"export-jobs", ExportJobViewSet)
+router.register(r"mail-jobs", MailOutboxViewSet)
 router.register(r"contracts", ContractViewSet)
 router.register(r"settings", SettingsViewSet, basename="settings")
 router.register(r"admin-counters", CounterAdminViewSet, basename="admin-counters")
@@ -77,4 +86,7 @@ urlpatterns += [
     path("auth/me/", me, name="auth_me"),
     path("auth/change-password/", change_password, name="auth_change_password"),
     path("admin/backup/", backup, name="admin_backup"),
+    path("dashboard/", dashboard, name="dashboard"),
+    path("chat/events/token/", chat_events_token, name="chat_events_token"),
+    path("chat/events/", chat_events, name="chat_events"),
 ]
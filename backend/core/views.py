@@ -1,30 +1,30 @@
 ﻿import os
 import re
 import uuid
-import csv
-import boto3
-from botocore.client import Config
-from io import BytesIO
+import hashlib
 from datetime import timedelta
-from PyPDF2 import PdfReader
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action, api_view
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.serializers import ListSerializer
+from rest_framework.exceptions import PermissionDenied, ValidationError as DRFValidationError
+from botocore.exceptions import ClientError
+from django.core import signing
 from django.core.management import call_command
 from django.core.mail import EmailMessage
-from django.core.mail import get_connection
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
-from django.db.models import Q, Max, Count
-from django.http import FileResponse, HttpResponse
+from django.db.models import Case, Count, DateTimeField, F, Max, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.fields.reverse_related import ManyToOneRel
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import quote_etag
 from django.contrib.auth import get_user_model
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from .models import (
     Customer,
     Document,
@@ -33,6 +33,8 @@ from .models import (
     Note,
     Contract,
     ContractJob,
+    ImportJob,
+    ExportJob,
     AuditLog,
     AppSetting,
     DocumentCounter,
@@ -43,17 +45,21 @@ from .models import (
     ChatParticipant,
     ChatMessage,
     ChatMessageFile,
+    MailOutbox,
     year_is_locked,
     next_document_number,
     next_report_number,
 )
 from .serializers import (
+    SparseFieldsMixin,
     CustomerSerializer,
     DocumentSerializer,
     ReportSerializer,
     FileSerializer,
     NoteSerializer,
     ContractJobSerializer,
+    ImportJobSerializer,
+    ExportJobSerializer,
     ContractSerializer,
     AppSettingSerializer,
     YearLockSerializer,
@@ -61,14 +67,45 @@ from .serializers import (
     ChatThreadCreateSerializer,
     ChatMessageSerializer,
     ChatMessageCreateSerializer,
+    MailOutboxSerializer,
     UserMiniSerializer,
 )
-from .tasks import process_contract_job
-from .contract_parser import parse_contract_text
+from .tasks import process_contract_job, process_export_job, process_import_job
+from .pagination import stream_json_list
+from .storage import (
+    MULTIPART_MAX_BYTES,
+    abort_multipart,
+    bucket_name,
+    complete_multipart,
+    create_multipart,
+    list_parts,
+    multipart_part_size,
+    object_url,
+    presign_download,
+    presign_parts,
+    presign_upload,
+    presigner,
+    s3_client,
+)
+from .dashboard import get_dashboard, invalidate_dashboard
+from . import mailer
+from . import bulk_import, exports, numbering, pdf_export, presence, realtime, receipts
+from .ingest import READY, DONE, FAILED
 
 User = get_user_model()
 
 
+UPLOAD_TOKEN_SALT = "core.direct-upload"
+UPLOAD_TOKEN_MAX_AGE = 24 * 3600
+# Tarayıcı indirmesi başlık gönderemez; bağlantıya yalnızca bu listenin dışa aktarımı için
+# kısa ömürlü imzalı anahtar eklenir, erişim token'ı URL'ye yazılmaz.
+EXPORT_TOKEN_SALT = "core.list-export"
+EXPORT_TOKEN_MAX_AGE = 120
+# Sohbet olay akışı (EventSource) için aynı yaklaşım: kullanıcıya bağlı, yalnızca akışı açan kısa ömürlü bilet.
+CHAT_TICKET_SALT = "core.chat-events"
+CHAT_TICKET_MAX_AGE = 60
+
+
 def _actor(request):
     user = getattr(request, "user", None)
     if user and user.is_authenticated:
@@ -76,22 +113,6 @@ def _actor(request):
     return None
 
 
-def _s3_client():
-    endpoint = os.environ.get("MINIO_ENDPOINT", "localhost:9000")
-    access_key = os.environ.get("MINIO_ACCESS_KEY", "minio")
-    secret_key = os.environ.get("MINIO_SECRET_KEY", "minio123")
-    secure = os.environ.get("MINIO_SECURE", "false").lower() == "true"
-    scheme = "https" if secure else "http"
-    return boto3.client(
-        "s3",
-        endpoint_url=f"{scheme}://{endpoint}",
-        aws_access_key_id=access_key,
-        aws_secret_access_key=secret_key,
-        config=Config(signature_version="s3v4"),
-        region_name="us-east-1",
-    )
-
-
 def _ensure_bucket(client, bucket):
     try:
         client.head_bucket(Bucket=bucket)
@@ -99,17 +120,53 @@ def _ensure_bucket(client, bucket):
         client.create_bucket(Bucket=bucket)
 
 
-def _extract_key(url: str, bucket: str) -> str | None:
-    if not url:
-        return None
-    parts = url.split("/", 3)
-    if len(parts) < 4:
-        return None
-    path = parts[3]
-    prefix = f"{bucket}/"
-    if path.startswith(prefix):
-        return path[len(prefix):]
-    return None
+def _initiate_upload(request, prefix: str = ""):
+    """Tarayıcının dosyayı doğrudan MinIO'ya yükleyeceği imzalı politikayı üretir."""
+
+    user = _actor(request)
+    if not user:
+        raise PermissionDenied("Giriş gerekli.")
+    filename = os.path.basename((request.data.get("filename") or "").strip())
+    if not filename:
+        return Response({"error": "filename zorunludur."}, status=400)
+    content_type = (request.data.get("content_type") or "").strip() or "application/octet-stream"
+    key = f"{prefix}{uuid.uuid4()}_{filename}"
+    _ensure_bucket(s3_client(), bucket_name())
+    token = signing.dumps({"k": key, "n": filename, "u": user.id}, salt=UPLOAD_TOKEN_SALT)
+    return Response({"key": key, "token": token, "upload": presign_upload(key, content_type)}, status=201)
+
+
+def _read_upload_token(request, token):
+    user = _actor(request)
+    if not user:
+        raise PermissionDenied("Giriş gerekli.")
+    try:
+        data = signing.loads(token or "", salt=UPLOAD_TOKEN_SALT, max_age=UPLOAD_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        raise DRFValidationError({"token": "Geçersiz ya da süresi dolmuş yükleme anahtarı."})
+    if data.get("u") != user.id:
+        raise PermissionDenied("Bu yükleme size ait değil.")
+    return data
+
+
+def _complete_upload(request, token):
+    """İmzalı yükleme anahtarını doğrular ve nesnenin depoda olduğunu HEAD ile teyit eder."""
+
+    return _stat_upload(_read_upload_token(request, token))
+
+
+def _stat_upload(data):
+    try:
+        head = s3_client().head_object(Bucket=bucket_name(), Key=data["k"])
+    except ClientError:
+        raise DRFValidationError({"token": "Dosya depoya yüklenmemiş."})
+    return {
+        "key": data["k"],
+        "filename": data["n"],
+        "content_type": head.get("ContentType") or "application/octet-stream",
+        "size": head.get("ContentLength") or 0,
+        "url": object_url(data["k"]),
+    }
 
 
 def _parse_emails(value):
@@ -137,7 +194,7 @@ def _parse_emails(value):
     return cleaned
 
 
-def _send_note_email(
+def _queue_note_email(
     *,
     request,
     entity_label: str,
@@ -147,6 +204,7 @@ def _send_note_email(
     to_emails,
     files_qs,
     contact_name: str | None,
+    note: Note | None = None,
 ):
     if not note_text.strip():
         raise ValidationError("Gönderilecek not boş olamaz.")
@@ -168,78 +226,32 @@ def _send_note_email(
         f"İyi çalışmalar dileriz.\n\n"
         f"Tarih: {timestamp}"
     )
-    smtp = _smtp_runtime_config()
-    message = EmailMessage(
+    return mailer.enqueue(
+        user=_actor(request),
         subject=subject,
         body=body,
-        from_email=smtp["from_email"],
         to=recipients,
-        connection=smtp["connection"],
+        attachments=mailer.file_attachments(files_qs),
+        note=note,
+        idempotency_key=_idempotency_key(request),
     )
 
-    bucket = os.environ.get("MINIO_BUCKET", "ymm-files")
-    s3 = _s3_client()
-    attached_count = 0
-    for f in files_qs:
-        key = _extract_key(f.url, bucket)
-        if not key:
-            continue
-        try:
-            data = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
-        except Exception:
-            continue
-        message.attach(f.filename, data, f.content_type or "application/octet-stream")
-        attached_count += 1
-
-    message.send(fail_silently=False)
-    return {"sent_to": recipients, "attachment_count": attached_count}
-
-
-def _build_table_pdf(title: str, columns, rows, note_text: str | None = None) -> bytes:
-    buffer = BytesIO()
-    pagesize = landscape(A4) if len(columns) > 6 else A4
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=pagesize,
-        leftMargin=24,
-        rightMargin=24,
-        topMargin=24,
-        bottomMargin=24,
-    )
-    styles = getSampleStyleSheet()
-    story = [
-        Paragraph(title, styles["Title"]),
-        Paragraph(f"Tarih: {timezone.localtime().strftime('%d.%m.%Y %H:%M')}", styles["Normal"]),
-    ]
-    if note_text and note_text.strip():
-        story.append(Spacer(1, 8))
-        story.append(Paragraph(f"Aciklama: {note_text.strip()}", styles["Normal"]))
-    story.append(Spacer(1, 12))
-
-    table_data = [columns] + rows
-    table = Table(table_data, repeatRows=1)
-    table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#ece4d9")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-                ("GRID", (0, 0), (-1, -1), 0.6, colors.HexColor("#bdbdbd")),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("LEFTPADDING", (0, 0), (-1, -1), 4),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 4),
-                ("TOPPADDING", (0, 0), (-1, -1), 4),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-            ]
-        )
+
+def _idempotency_key(request):
+    return request.headers.get("Idempotency-Key") or request.data.get("idempotency_key")
+
+
+def _mail_queued(outbox):
+    # Gönderim arka planda yapılır; durum /api/mail-jobs/<id>/ üzerinden izlenir.
+    return Response(
+        {
+            "status": "queued",
+            "job_id": outbox.id,
+            "sent_to": outbox.to,
+            "attachment_count": len(outbox.attachments),
+        },
+        status=status.HTTP_202_ACCEPTED,
     )
-    story.append(table)
-    doc.build(story)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
 
 
 def _resolve_note_target(note: Note, payload: dict):
@@ -323,7 +335,7 @@ def _sync_latest_card_note(note: Note):
             .values_list("text", flat=True)
             .first()
         )
-        Document.objects.filter(id=note.document_id).update(card_note=latest_text or None)
+        Document.objects.filter(id=note.document_id).update(card_note=latest_text or None, updated_at=timezone.now())
     elif note.report_id:
         latest_text = (
             Note.objects.filter(report_id=note.report_id, is_archived=False)
@@ -331,7 +343,7 @@ def _sync_latest_card_note(note: Note):
             .values_list("text", flat=True)
             .first()
         )
-        Report.objects.filter(id=note.report_id).update(card_note=latest_text or None)
+        Report.objects.filter(id=note.report_id).update(card_note=latest_text or None, updated_at=timezone.now())
     elif note.contract_id:
         latest_text = (
             Note.objects.filter(contract_id=note.contract_id, is_archived=False)
@@ -339,7 +351,7 @@ def _sync_latest_card_note(note: Note):
             .values_list("text", flat=True)
             .first()
         )
-        Contract.objects.filter(id=note.contract_id).update(card_note=latest_text or None)
+        Contract.objects.filter(id=note.contract_id).update(card_note=latest_text or None, updated_at=timezone.now())
     elif note.customer_id:
         latest_text = (
             Note.objects.filter(customer_id=note.customer_id, is_archived=False)
@@ -347,30 +359,7 @@ def _sync_latest_card_note(note: Note):
             .values_list("text", flat=True)
             .first()
         )
-        Customer.objects.filter(id=note.customer_id).update(card_note=latest_text or None)
-
-
-def _smtp_runtime_config():
-    cfg = _get_settings()
-    has_db_smtp = bool(cfg.smtp_host and cfg.smtp_user and cfg.smtp_from_email)
-    if has_db_smtp:
-        connection = get_connection(
-            backend="django.core.mail.backends.smtp.EmailBackend",
-            host=cfg.smtp_host,
-            port=cfg.smtp_port or 587,
-            username=cfg.smtp_user,
-            password=cfg.smtp_password or "",
-            use_tls=bool(cfg.smtp_use_tls),
-            use_ssl=bool(cfg.smtp_use_ssl),
-        )
-        return {
-            "connection": connection,
-            "from_email": cfg.smtp_from_email,
-        }
-    return {
-        "connection": get_connection(),
-        "from_email": os.environ.get("DEFAULT_FROM_EMAIL", "ymm-otomasyon@localhost"),
-    }
+        Customer.objects.filter(id=note.customer_id).update(card_note=latest_text or None, updated_at=timezone.now())
 
 
 def _sync_contract_status(contract_id: int | None):
@@ -388,8 +377,31 @@ def _sync_contract_status(contract_id: int | None):
         contract.save(update_fields=["status", "updated_at"])
 
 
+def _bulk_import(request, importer):
+    """CSV/JSON dosyası ya da ``{"rows": [...]}`` gövdesini tek transaction'da içe aktarır."""
+
+    actor = _actor(request)
+    if not actor or not actor.is_staff:
+        raise PermissionDenied("Toplu içe aktarma sadece admin içindir.")
+    upload = request.FILES.get("file")
+    dry_run = str(request.query_params.get("dry_run") or "").lower() in ("1", "true", "yes", "on")
+    try:
+        if upload:
+            rows = bulk_import.read_rows(upload.read(), upload.name)
+        else:
+            rows = request.data if isinstance(request.data, list) else request.data.get("rows")
+            if not isinstance(rows, list):
+                raise bulk_import.BulkImportError("Dosya (file) ya da satır listesi (rows) gerekli.")
+        result = importer(rows, actor=actor, staff=True, dry_run=dry_run)
+    except bulk_import.BulkImportError as exc:
+        return Response({"error": str(exc), "rows": exc.rows}, status=400)
+    return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
 class AuditViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
+    keyset_ordering = ("-created_at", "-id")
+    invalidates_dashboard = False
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -398,6 +410,114 @@ class AuditViewSet(viewsets.ModelViewSet):
             return qs.filter(is_archived=False)
         return qs
 
+    def _query_list(self, name):
+        raw = self.request.query_params.get(name)
+        if raw is None:
+            return None
+        return [item.strip() for item in raw.split(",") if item.strip()]
+
+    def _expands(self, name):
+        # Detay ve yazma yanıtları ilişkileri her zaman içerir; listede yalnızca ?expand= ile.
+        return self.action != "list" or name in (self._query_list("expand") or [])
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        if self.request.method == "GET" and issubclass(serializer_class, SparseFieldsMixin):
+            fields = self._query_list("fields")
+            if fields is None and self.action == "list":
+                fields = getattr(serializer_class.Meta, "list_fields", None)
+            if fields and "*" in fields:
+                fields = None
+            kwargs.setdefault("fields", fields)
+            if self.action == "list":
+                kwargs.setdefault("expand", self._query_list("expand") or [])
+        return super().get_serializer(*args, **kwargs)
+
+    def _updated_since(self):
+        raw = self.request.query_params.get("updated_since")
+        if not raw:
+            return None
+        since = parse_datetime(raw.replace(" ", "+"))
+        if since is None:
+            raise DRFValidationError({"updated_since": "Geçersiz tarih/saat."})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    def _tombstones(self, since):
+        model = self.get_queryset().model
+        archived = model.objects.filter(is_archived=True, updated_at__gt=since).values_list("id", flat=True)
+        removed = AuditLog.objects.filter(
+            model=model.__name__,
+            action="archive",
+            timestamp__gt=since,
+        ).values_list("object_id", flat=True)
+        ids = set(archived)
+        ids.update(int(pk) for pk in removed if str(pk).isdigit())
+        return sorted(ids)
+
+    def _nested_versions(self, serializer, ids):
+        """Sayfadaki kayıtlara bağlı iç içe listelerin (ör. ``files``) son güncellemesi ve sayısı."""
+
+        model = serializer.child.Meta.model
+        versions = []
+        for field in serializer.child.fields.values():
+            if not isinstance(field, ListSerializer):
+                continue
+            relation = model._meta.get_field(field.source)
+            if not isinstance(relation, ManyToOneRel):
+                continue
+            versions.append(
+                relation.related_model.objects.filter(**{f"{relation.field.name}__in": ids})
+                .order_by()
+                .aggregate(last=Max("updated_at"), total=Count("id"))
+            )
+        return versions
+
+    def list(self, request, *args, **kwargs):
+        qs = self.filter_queryset(self.get_queryset())
+        if request.query_params.get("all") == "1":
+            # Dışa aktarım için tüm kayıtlar sayfalanmadan, parça parça akıtılır.
+            qs = qs.order_by(*self.keyset_ordering)
+            return stream_json_list(qs, lambda rows: self.get_serializer(rows, many=True))
+
+        server_time = timezone.now()
+        since = self._updated_since()
+        if since is not None:
+            qs = qs.filter(updated_at__gt=since)
+        page = self.paginate_queryset(qs)
+        serializer = self.get_serializer(page, many=True)
+        deleted = self._tombstones(since) if since is not None else None
+
+        # Sayfa sürümü, dönen kayıtların id/updated_at değerleri, iç içe listeleri (dosyalar) ve sayfa
+        # bağlantılarından hesaplanır; tüm küme sayılmaz. Değişmediyse 304 döner. İmzalı URL'ler
+        # yenilendiğinde de sürüm değişsin diye presign dilimi eklenir.
+        stamps = [(row.pk, row.updated_at) for row in page]
+        nested = self._nested_versions(serializer, [pk for pk, _ in stamps])
+        links = (self.paginator.get_next_link(), self.paginator.get_previous_link())
+        etag = quote_etag(
+            hashlib.sha1(
+                f"{request.get_full_path()}|{stamps}|{nested}|{links}|{deleted}|{presigner.current_slot()}".encode("utf-8")
+            ).hexdigest()
+        )
+        # Last-Modified gönderilmez: sayfadan kayıt çıkınca en yeni zaman ilerlemeyebilir, üyelik
+        # değişikliğini yalnızca ETag yakalar.
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = self.get_paginated_response(serializer.data)
+        if since is not None:
+            response.data["deleted"] = deleted
+            response.data["server_time"] = server_time
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def _changed(self):
+        if self.invalidates_dashboard:
+            invalidate_dashboard()
+
     def perform_create(self, serializer):
         actor = _actor(self.request)
         instance = serializer.save(created_by=actor, updated_by=actor)
@@ -407,6 +527,7 @@ class AuditViewSet(viewsets.ModelViewSet):
             action="create",
             actor=actor,
         )
+        self._changed()
 
     def perform_update(self, serializer):
         actor = _actor(self.request)
@@ -417,6 +538,7 @@ class AuditViewSet(viewsets.ModelViewSet):
             action="update",
             actor=actor,
         )
+        self._changed()
 
     def perform_destroy(self, instance):
         actor = _actor(self.request)
@@ -435,6 +557,7 @@ class AuditViewSet(viewsets.ModelViewSet):
             )
         else:
             instance.delete()
+        self._changed()
 
     @action(detail=True, methods=["post"])
     def archive(self, request, pk=None):
@@ -443,9 +566,61 @@ class AuditViewSet(viewsets.ModelViewSet):
         return Response({"status": "archived"})
 
 
-class CustomerViewSet(AuditViewSet):
+class ExportMixin:
+    """Liste filtreleri (``core/exports.py``) ve ``GET export/?file_format=csv|xlsx`` akışlı dışa aktarım.
+
+    Tarayıcı indirmesi ``POST export_token/`` ile alınan anahtarı ``?token=`` olarak gönderir.
+    """
+
+    export_kind = None
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in ("list", "export"):
+            queryset = exports.filter_queryset(self.export_kind, queryset, self.request.query_params)
+        return queryset
+
+    def _export_token_user(self, request):
+        try:
+            data = signing.loads(
+                request.query_params.get("token") or "", salt=EXPORT_TOKEN_SALT, max_age=EXPORT_TOKEN_MAX_AGE
+            )
+        except signing.BadSignature:
+            raise PermissionDenied("Geçersiz ya da süresi dolmuş indirme anahtarı.")
+        if data.get("k") != self.export_kind:
+            raise PermissionDenied("İndirme anahtarı bu liste için değil.")
+        user = User.objects.filter(id=data.get("u"), is_active=True).first()
+        if user is None:
+            raise PermissionDenied("Giriş gerekli.")
+        return user
+
+    @action(detail=False, methods=["post"])
+    def export_token(self, request):
+        """``export/`` bağlantısı için bu listeye özel, ``EXPORT_TOKEN_MAX_AGE`` saniyelik anahtar."""
+
+        user = _actor(request)
+        if not user:
+            raise PermissionDenied("Giriş gerekli.")
+        token = signing.dumps({"u": user.id, "k": self.export_kind}, salt=EXPORT_TOKEN_SALT)
+        return Response({"token": token, "expires_in": EXPORT_TOKEN_MAX_AGE})
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        if not _actor(request):
+            request.user = self._export_token_user(request)
+        file_format = (request.query_params.get("file_format") or "csv").lower()
+        if file_format not in exports.FORMATS:
+            return Response({"error": "Geçersiz dosya biçimi (csv, xlsx)."}, status=400)
+        qs = self.filter_queryset(self.get_queryset()).prefetch_related(None).order_by(*self.keyset_ordering)
+        filename = f"{self.export_kind}_liste_{timezone.localdate().isoformat()}"
+        return exports.stream_export(self.export_kind, qs, file_format, filename)
+
+
+class CustomerViewSet(ExportMixin, AuditViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
+    invalidates_dashboard = True
+    export_kind = "customers"
 
     @action(detail=True, methods=["post"])
     def send_note_mail(self, request, pk=None):
@@ -456,7 +631,7 @@ class CustomerViewSet(AuditViewSet):
         files_qs = File.objects.filter(customer_id=customer.id, note_scope=True, document__isnull=True, report__isnull=True, contract__isnull=True)
 
         try:
-            result = _send_note_email(
+            outbox = _queue_note_email(
                 request=request,
                 entity_label="Müşteri",
                 entity_code=customer.name,
@@ -469,12 +644,15 @@ class CustomerViewSet(AuditViewSet):
         except Exception as exc:
             return Response({"error": f"Mail gönderilemedi: {str(exc)}"}, status=400)
 
-        return Response({"status": "ok", **result})
+        return _mail_queued(outbox)
 
 
-class DocumentViewSet(AuditViewSet):
+class DocumentViewSet(ExportMixin, AuditViewSet):
     queryset = Document.objects.all()
     serializer_class = DocumentSerializer
+    keyset_ordering = ("-year", "-serial", "-id")
+    invalidates_dashboard = True
+    export_kind = "documents"
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -484,6 +662,10 @@ class DocumentViewSet(AuditViewSet):
             qs = qs.filter(customer_id=customer)
         if contract:
             qs = qs.filter(contract_id=contract)
+        if self._expands("files"):
+            qs = qs.prefetch_related("files")
+        if self.action == "send_note_mail":
+            qs = qs.select_related("customer")
         return qs
 
     def create(self, request, *args, **kwargs):
@@ -496,6 +678,10 @@ class DocumentViewSet(AuditViewSet):
         self.perform_create(serializer)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=["post"])
+    def bulk_import(self, request):
+        return _bulk_import(request, bulk_import.import_documents)
+
     def perform_update(self, serializer):
         instance_year = serializer.instance.year
         if year_is_locked(instance_year):
@@ -509,42 +695,44 @@ class DocumentViewSet(AuditViewSet):
         if year_is_locked(instance.year):
             raise PermissionDenied(f"{instance.year} yılı kilitli. Evrak silinemez.")
 
-        max_serial = (
-            Document.objects.filter(
-                doc_type=instance.doc_type,
-                year=instance.year,
-                is_archived=False,
+        with transaction.atomic():
+            # Sayaç kilitliyken yeni numara verilemez; son numara kontrolü ile geri sarma tutarlı kalır.
+            counter = numbering.lock_document_counter(instance.doc_type, instance.year)
+            max_serial = (
+                Document.objects.filter(
+                    doc_type=instance.doc_type,
+                    year=instance.year,
+                    is_archived=False,
+                )
+                .order_by("-serial")
+                .values_list("serial", flat=True)
+                .first()
             )
-            .order_by("-serial")
-            .values_list("serial", flat=True)
-            .first()
-        )
-        if max_serial != instance.serial:
-            raise PermissionDenied("Sadece en son numaralı evrak silinebilir.")
-
-        deleted_serial = instance.serial
-        doc_type = instance.doc_type
-        year = instance.year
-        pk = instance.pk
-        instance.delete()
-        AuditLog.objects.create(
-            model="Document",
-            object_id=str(pk),
-            action="archive",
-            actor=actor,
-        )
+            if max_serial != instance.serial:
+                raise PermissionDenied("Sadece en son numaralı evrak silinebilir.")
 
-        prev_serial = (
-            Document.objects.filter(doc_type=doc_type, year=year, is_archived=False)
-            .order_by("-serial")
-            .values_list("serial", flat=True)
-            .first()
-            or 0
-        )
-        counter, _ = DocumentCounter.objects.get_or_create(doc_type=doc_type, year=year)
-        if counter.last_serial >= deleted_serial:
-            counter.last_serial = prev_serial
-            counter.save()
+            deleted_serial = instance.serial
+            doc_type = instance.doc_type
+            year = instance.year
+            pk = instance.pk
+            instance.delete()
+            AuditLog.objects.create(
+                model="Document",
+                object_id=str(pk),
+                action="archive",
+                actor=actor,
+            )
+
+            # Arşivdeki numaralar tekrar verilmesin diye arşivli kayıtlar da sayılır.
+            prev_serial = (
+                Document.objects.filter(doc_type=doc_type, year=year)
+                .order_by("-serial")
+                .values_list("serial", flat=True)
+                .first()
+                or 0
+            )
+            numbering.rewind_counter(counter, deleted_serial, prev_serial)
+        self._changed()
 
     @action(detail=True, methods=["post"])
     def send_note_mail(self, request, pk=None):
@@ -567,7 +755,7 @@ class DocumentViewSet(AuditViewSet):
         contact_name = doc.note_contact_name or getattr(doc.customer, "contact_person", "")
 
         try:
-            result = _send_note_email(
+            outbox = _queue_note_email(
                 request=request,
                 entity_label="Evrak",
                 entity_code=doc.doc_no,
@@ -580,12 +768,15 @@ class DocumentViewSet(AuditViewSet):
         except Exception as exc:
             return Response({"error": f"Mail gönderilemedi: {str(exc)}"}, status=400)
 
-        return Response({"status": "ok", **result})
+        return _mail_queued(outbox)
 
 
-class ReportViewSet(AuditViewSet):
+class ReportViewSet(ExportMixin, AuditViewSet):
     queryset = Report.objects.all()
     serializer_class = ReportSerializer
+    keyset_ordering = ("-year", "-year_serial_all", "-id")
+    invalidates_dashboard = True
+    export_kind = "reports"
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -595,6 +786,10 @@ class ReportViewSet(AuditViewSet):
             qs = qs.filter(customer_id=customer)
         if contract:
             qs = qs.filter(contract_id=contract)
+        if self._expands("files"):
+            qs = qs.prefetch_related("files")
+        if self.action == "send_note_mail":
+            qs = qs.select_related("customer")
         return qs
 
     def create(self, request, *args, **kwargs):
@@ -608,6 +803,10 @@ class ReportViewSet(AuditViewSet):
         _sync_contract_status(serializer.instance.contract_id)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=["post"])
+    def bulk_import(self, request):
+        return _bulk_import(request, bulk_import.import_reports)
+
     def perform_update(self, serializer):
         instance_year = serializer.instance.year
         if year_is_locked(instance_year):
@@ -625,57 +824,49 @@ class ReportViewSet(AuditViewSet):
         if year_is_locked(instance.year):
             raise PermissionDenied(f"{instance.year} yılı kilitli. Rapor silinemez.")
 
-        max_year_serial = (
-            Report.objects.filter(year=instance.year, is_archived=False)
-            .order_by("-year_serial_all")
-            .values_list("year_serial_all", flat=True)
-            .first()
-        )
-        max_global_serial = (
-            Report.objects.filter(is_archived=False)
-            .order_by("-type_cumulative")
-            .values_list("type_cumulative", flat=True)
-            .first()
-        )
-        if max_year_serial != instance.year_serial_all or max_global_serial != instance.type_cumulative:
-            raise PermissionDenied("Sadece en son numaralı rapor silinebilir.")
-
-        contract_id = instance.contract_id
-        deleted_type_cum = instance.type_cumulative
-        deleted_year_serial = instance.year_serial_all
-        year = instance.year
-        pk = instance.pk
-        instance.delete()
-        AuditLog.objects.create(
-            model="Report",
-            object_id=str(pk),
-            action="archive",
-            actor=actor,
-        )
+        with transaction.atomic():
+            global_counter, year_counter = numbering.lock_report_counters(instance.year)
+            max_year_serial = (
+                Report.objects.filter(year=instance.year, is_archived=False)
+                .order_by("-year_serial_all")
+                .values_list("year_serial_all", flat=True)
+                .first()
+            )
+            max_global_serial = (
+                Report.objects.filter(is_archived=False)
+                .order_by("-type_cumulative")
+                .values_list("type_cumulative", flat=True)
+                .first()
+            )
+            if max_year_serial != instance.year_serial_all or max_global_serial != instance.type_cumulative:
+                raise PermissionDenied("Sadece en son numaralı rapor silinebilir.")
+
+            contract_id = instance.contract_id
+            deleted_type_cum = instance.type_cumulative
+            deleted_year_serial = instance.year_serial_all
+            year = instance.year
+            pk = instance.pk
+            instance.delete()
+            AuditLog.objects.create(
+                model="Report",
+                object_id=str(pk),
+                action="archive",
+                actor=actor,
+            )
 
-        prev_year_serial = (
-            Report.objects.filter(year=year, is_archived=False)
-            .order_by("-year_serial_all")
-            .values_list("year_serial_all", flat=True)
-            .first()
-            or 0
-        )
-        year_counter, _ = ReportCounterYearAll.objects.get_or_create(year=year)
-        if year_counter.last_serial >= deleted_year_serial:
-            year_counter.last_serial = prev_year_serial
-            year_counter.save()
-
-        prev_global = (
-            Report.objects.filter(is_archived=False)
-            .order_by("-type_cumulative")
-            .values_list("type_cumulative", flat=True)
-            .first()
-            or 0
-        )
-        global_counter, _ = ReportCounterGlobal.objects.get_or_create(id=1)
-        if global_counter.last_serial >= deleted_type_cum:
-            global_counter.last_serial = prev_global
-            global_counter.save()
+            prev_year_serial = (
+                Report.objects.filter(year=year)
+                .order_by("-year_serial_all")
+                .values_list("year_serial_all", flat=True)
+                .first()
+                or 0
+            )
+            prev_global = (
+                Report.objects.order_by("-type_cumulative").values_list("type_cumulative", flat=True).first() or 0
+            )
+            numbering.rewind_counter(year_counter, deleted_year_serial, prev_year_serial)
+            numbering.rewind_counter(global_counter, deleted_type_cum, prev_global)
+        self._changed()
         _sync_contract_status(contract_id)
 
     @action(detail=True, methods=["post"])
@@ -699,7 +890,7 @@ class ReportViewSet(AuditViewSet):
         contact_name = rep.note_contact_name or getattr(rep.customer, "contact_person", "")
 
         try:
-            result = _send_note_email(
+            outbox = _queue_note_email(
                 request=request,
                 entity_label="Rapor",
                 entity_code=rep.report_no,
@@ -712,7 +903,7 @@ class ReportViewSet(AuditViewSet):
         except Exception as exc:
             return Response({"error": f"Mail gönderilemedi: {str(exc)}"}, status=400)
 
-        return Response({"status": "ok", **result})
+        return _mail_queued(outbox)
 
 
 class FileViewSet(AuditViewSet):
@@ -751,8 +942,8 @@ class FileViewSet(AuditViewSet):
         if not upload:
             return Response({"error": "file is required"}, status=400)
 
-        client = _s3_client()
-        bucket = os.environ.get("MINIO_BUCKET", "ymm-files")
+        client = s3_client()
+        bucket = bucket_name()
         _ensure_bucket(client, bucket)
 
         key = f"{uuid.uuid4()}_{upload.name}"
@@ -762,13 +953,131 @@ class FileViewSet(AuditViewSet):
             key,
             ExtraArgs={"ContentType": upload.content_type or "application/octet-stream"},
         )
+        return self._create_file(
+            request,
+            filename=upload.name,
+            content_type=upload.content_type or "application/octet-stream",
+            size=upload.size,
+            url=object_url(key, bucket),
+        )
 
-        public_endpoint = os.environ.get("MINIO_PUBLIC_ENDPOINT")
-        endpoint = public_endpoint or os.environ.get("MINIO_ENDPOINT", "localhost:9000")
-        secure = os.environ.get("MINIO_SECURE", "false").lower() == "true"
-        scheme = "https" if secure else "http"
-        url = f"{scheme}://{endpoint}/{bucket}/{key}"
+    @action(detail=False, methods=["post"])
+    def upload_initiate(self, request):
+        return _initiate_upload(request)
+
+    @action(detail=False, methods=["post"])
+    def upload_complete(self, request):
+        info = _complete_upload(request, request.data.get("token"))
+        existing = File.objects.filter(url=info["url"]).first()
+        if existing:
+            return Response(FileSerializer(existing).data)
+        return self._create_file(
+            request,
+            filename=info["filename"],
+            content_type=info["content_type"],
+            size=info["size"],
+            url=info["url"],
+        )
+
+    @action(detail=False, methods=["post"])
+    def multipart_create(self, request):
+        """Büyük dosyalar için S3 multipart yüklemesi başlatır; parçalar tarayıcıdan paralel yüklenir."""
 
+        user = _actor(request)
+        if not user:
+            raise PermissionDenied("Giriş gerekli.")
+        filename = os.path.basename((request.data.get("filename") or "").strip())
+        content_type = (request.data.get("content_type") or "").strip() or "application/octet-stream"
+        try:
+            size = int(request.data.get("size") or 0)
+        except (TypeError, ValueError):
+            size = 0
+        if not filename or size <= 0:
+            return Response({"error": "filename ve size zorunludur."}, status=400)
+        if size > MULTIPART_MAX_BYTES:
+            return Response({"error": "Dosya boyutu sınırı aşıyor."}, status=400)
+        key = f"{uuid.uuid4()}_{filename}"
+        _ensure_bucket(s3_client(), bucket_name())
+        upload_id = create_multipart(key, content_type)
+        part_size = multipart_part_size(size)
+        token = signing.dumps(
+            {"k": key, "n": filename, "u": user.id, "m": upload_id, "s": size, "p": part_size},
+            salt=UPLOAD_TOKEN_SALT,
+        )
+        return Response(
+            {"token": token, "key": key, "part_size": part_size, "part_count": -(-size // part_size)},
+            status=201,
+        )
+
+    def _multipart_token(self, request, token):
+        data = _read_upload_token(request, token)
+        if not data.get("m"):
+            raise DRFValidationError({"token": "Multipart yükleme anahtarı değil."})
+        return data, -(-data["s"] // data["p"])
+
+    @action(detail=False, methods=["post"])
+    def multipart_sign(self, request):
+        data, part_count = self._multipart_token(request, request.data.get("token"))
+        try:
+            numbers = sorted({int(n) for n in request.data.get("parts") or []})
+        except (TypeError, ValueError):
+            numbers = []
+        if not numbers or numbers[0] < 1 or numbers[-1] > part_count or len(numbers) > 100:
+            return Response({"error": "Geçersiz parça numaraları."}, status=400)
+        return Response({"urls": presign_parts(data["k"], data["m"], numbers)})
+
+    @action(detail=False, methods=["get"])
+    def multipart_parts(self, request):
+        """Yarım kalan yüklemeyi sürdürmek için depoya ulaşmış parçaları listeler."""
+
+        data, part_count = self._multipart_token(request, request.query_params.get("token"))
+        try:
+            parts = list_parts(data["k"], data["m"])
+        except ClientError:
+            return Response({"error": "Yükleme bulunamadı."}, status=404)
+        return Response(
+            {
+                "part_size": data["p"],
+                "part_count": part_count,
+                "parts": [{"part_number": p["PartNumber"], "size": p["Size"]} for p in parts],
+            }
+        )
+
+    @action(detail=False, methods=["post"])
+    def multipart_complete(self, request):
+        data, part_count = self._multipart_token(request, request.data.get("token"))
+        try:
+            parts = list_parts(data["k"], data["m"])
+        except ClientError:
+            # Yükleme daha önce tamamlanmış olabilir; nesne varsa aynı kayıt döner.
+            parts = None
+        if parts is not None:
+            missing = sorted(set(range(1, part_count + 1)) - {p["PartNumber"] for p in parts})
+            if missing or sum(p["Size"] for p in parts) != data["s"]:
+                return Response({"error": "Eksik parçalar var.", "missing": missing}, status=400)
+            complete_multipart(data["k"], data["m"], parts)
+        info = _stat_upload(data)
+        existing = File.objects.filter(url=info["url"]).first()
+        if existing:
+            return Response(FileSerializer(existing).data)
+        return self._create_file(
+            request,
+            filename=info["filename"],
+            content_type=info["content_type"],
+            size=info["size"],
+            url=info["url"],
+        )
+
+    @action(detail=False, methods=["post"])
+    def multipart_abort(self, request):
+        data, _ = self._multipart_token(request, request.data.get("token"))
+        try:
+            abort_multipart(data["k"], data["m"])
+        except ClientError:
+            pass
+        return Response(status=204)
+
+    def _create_file(self, request, *, filename, content_type, size, url):
         document_id = request.data.get("document")
         report_id = request.data.get("report")
         contract_id = request.data.get("contract")
@@ -793,11 +1102,11 @@ class FileViewSet(AuditViewSet):
             except Contract.DoesNotExist:
                 customer_id = None
 
-        display_name = (request.data.get("filename") or "").strip() or upload.name
+        display_name = (request.data.get("display_name") or request.data.get("filename") or "").strip() or filename
         file_obj = File.objects.create(
             filename=display_name,
-            content_type=upload.content_type or "application/octet-stream",
-            size=upload.size,
+            content_type=content_type,
+            size=size,
             url=url,
             note_scope=is_note_scope,
             document_id=document_id or None,
@@ -840,7 +1149,11 @@ class NoteViewSet(AuditViewSet):
             qs = qs.filter(report_id=report)
         if contract:
             qs = qs.filter(contract_id=contract)
-        return qs
+        if self.action == "send_mail":
+            qs = qs.select_related("customer", "document__customer", "report__customer", "contract__customer")
+        else:
+            qs = qs.select_related("customer", "document", "report", "contract")
+        return qs.prefetch_related("note_files")
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -850,13 +1163,13 @@ class NoteViewSet(AuditViewSet):
         response_data = serializer.data
 
         if note.document_id:
-            Document.objects.filter(id=note.document_id).update(card_note=note.text)
+            Document.objects.filter(id=note.document_id).update(card_note=note.text, updated_at=timezone.now())
         elif note.report_id:
-            Report.objects.filter(id=note.report_id).update(card_note=note.text)
+            Report.objects.filter(id=note.report_id).update(card_note=note.text, updated_at=timezone.now())
         elif note.contract_id:
-            Contract.objects.filter(id=note.contract_id).update(card_note=note.text)
+            Contract.objects.filter(id=note.contract_id).update(card_note=note.text, updated_at=timezone.now())
         elif note.customer_id:
-            Customer.objects.filter(id=note.customer_id).update(card_note=note.text)
+            Customer.objects.filter(id=note.customer_id).update(card_note=note.text, updated_at=timezone.now())
 
         return Response(response_data, status=status.HTTP_201_CREATED)
 
@@ -874,7 +1187,7 @@ class NoteViewSet(AuditViewSet):
             if explicit_recipients is not None:
                 to_emails = explicit_recipients
             files_qs = File.objects.filter(note_id=note.id, note_scope=True)
-            result = _send_note_email(
+            outbox = _queue_note_email(
                 request=request,
                 entity_label=entity_label,
                 entity_code=entity_code,
@@ -883,42 +1196,334 @@ class NoteViewSet(AuditViewSet):
                 to_emails=to_emails,
                 files_qs=files_qs,
                 contact_name=contact_name,
+                note=note,
             )
-            note.mail_sent_at = timezone.now()
-            note.mail_sent_to = result.get("sent_to", [])
-            note.save(update_fields=["mail_sent_at", "mail_sent_to", "updated_at"])
         except Exception as exc:
             return Response({"error": f"Mail gönderilemedi: {str(exc)}"}, status=400)
-        return Response({"status": "ok", **result})
+        return _mail_queued(outbox)
+
+
+class ImportJobViewSet(AuditViewSet):
+    """Büyük müşteri listeleri worker'da partiler halinde içe aktarılır; ilerleme status ile izlenir."""
+
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    kinds = ("customers",)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        user = _actor(request)
+        if not user or not user.is_staff:
+            raise PermissionDenied("Toplu içe aktarma sadece admin içindir.")
+
+    def create(self, request, *args, **kwargs):
+        kind = request.data.get("kind") or "customers"
+        if kind not in self.kinds:
+            return Response({"error": "Geçersiz içe aktarma türü."}, status=400)
+        info = _job_file(request)
+        if info is None:
+            return Response({"error": "token veya file zorunludur."}, status=400)
+
+        serializer = self.get_serializer(data={"kind": kind})
+        serializer.is_valid(raise_exception=True)
+        serializer.validated_data["payload"] = {"file": info}
+        self.perform_create(serializer)
+        job = serializer.instance
+        transaction.on_commit(lambda: process_import_job.delay(job.id))
+        return Response(serializer.data, status=202)
+
+    @action(detail=True, methods=["get"])
+    def status(self, request, pk=None):
+        job = self.get_object()
+        return Response(
+            {
+                "status": job.status,
+                "progress": job.payload.get("progress"),
+                "errors": job.payload.get("errors"),
+                "error": job.payload.get("error"),
+            }
+        )
+
+
+class ExportJobViewSet(AuditViewSet):
+    """Büyük tablolar PDF olarak worker'da üretilir, depoya yazılır ve imzalı bağlantıyla indirilir.
+
+    İçerik her girişli kullanıcının görebildiği liste verisidir ve aynı dışa aktarım başka
+    kullanıcıya da aynı iş olarak döner; bu yüzden yalnızca liste kullanıcının kendi işleriyle sınırlıdır.
+    """
+
+    queryset = ExportJob.objects.all()
+    serializer_class = ExportJobSerializer
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not _actor(request):
+            raise PermissionDenied("Giriş gerekli.")
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        user = _actor(self.request)
+        if self.action == "list" and user and not user.is_staff:
+            qs = qs.filter(created_by=user)
+        return qs
+
+    def create(self, request, *args, **kwargs):
+        title = (request.data.get("title") or "").strip()
+        note = (request.data.get("note") or "").strip()
+        resource = request.data.get("resource")
+        if resource:
+            # Satırlar worker'da liste filtreleriyle sorgulanır; istemci veri göndermez.
+            if resource not in exports.EXPORTS:
+                return Response({"error": "Geçersiz liste türü."}, status=400)
+            filters = request.data.get("filters") or {}
+            if not isinstance(filters, dict):
+                return Response({"error": "filters bir nesne olmalıdır."}, status=400)
+            spec = pdf_export.prepare(
+                kind=resource,
+                title=title or exports.EXPORTS[resource]["title"],
+                note=note,
+                filters=exports.export_filters(filters),
+            )
+        else:
+            table = _table_data(request)
+            if table is None:
+                return Response({"error": "Geçerli kolon/satır verisi zorunludur."}, status=400)
+            spec = pdf_export.prepare(title=title or "Liste Raporu", note=note, columns=table[0], rows=table[1])
+
+        existing = pdf_export.reusable(spec["digest"])
+        if existing is not None:
+            return Response(self.get_serializer(existing).data)
+        serializer = self.get_serializer(data={})
+        serializer.is_valid(raise_exception=True)
+        serializer.validated_data.update(spec)
+        self.perform_create(serializer)
+        job = serializer.instance
+        transaction.on_commit(lambda: process_export_job.delay(job.id))
+        return Response(serializer.data, status=202)
+
+    @action(detail=True, methods=["get"])
+    def status(self, request, pk=None):
+        job = self.get_object()
+        info = job.payload.get("file")
+        return Response(
+            {
+                "status": job.status,
+                "rows": job.payload.get("rows_count"),
+                "error": job.payload.get("error"),
+                "filename": info["filename"] if info else None,
+                "url": presign_download(info["key"], info["filename"], presigner.expires) if info else None,
+            }
+        )
+
+
+class MailOutboxViewSet(viewsets.ReadOnlyModelViewSet):
+    """Kuyruğa alınan maillerin durumu; kullanıcı yalnızca kendi gönderimlerini görür."""
+
+    queryset = MailOutbox.objects.all()
+    serializer_class = MailOutboxSerializer
+
+    def get_queryset(self):
+        user = _actor(self.request)
+        if not user:
+            raise PermissionDenied("Giriş gerekli.")
+        qs = super().get_queryset()
+        if not user.is_staff:
+            qs = qs.filter(created_by=user)
+        status_filter = self.request.query_params.get("status")
+        if status_filter:
+            qs = qs.filter(status=status_filter.upper())
+        return qs
+
+
+def _save_contract(request, parsed, *, filename, content_type, size, store):
+    """Ayrıştırılan alanları istekteki düzeltmelerle birleştirip sözleşme kartını oluşturur."""
+
+    for key in [
+        "tax_no",
+        "tax_office",
+        "customer_name",
+        "address",
+        "phone",
+        "email",
+        "contact_person",
+        "contract_no",
+        "contract_date",
+        "contract_type",
+        "period_start_month",
+        "period_start_year",
+        "period_end_month",
+        "period_end_year",
+    ]:
+        if request.data.get(key):
+            parsed[key] = request.data.get(key)
+
+    contract_no = (parsed.get("contract_no") or "").strip()
+    contract_type = (parsed.get("contract_type") or "").strip()
+    if not contract_no:
+        return Response({"error": "Sözleşme numarası zorunludur."}, status=400)
+    if not contract_type:
+        return Response({"error": "Sözleşme türü zorunludur."}, status=400)
+
+    customer_id = request.data.get("customer")
+    tax_no = parsed.get("tax_no") or request.data.get("tax_no")
+    tckn = request.data.get("tckn")
+    if not tckn and tax_no and str(tax_no).isdigit() and len(str(tax_no)) == 11:
+        tckn = str(tax_no)
+
+    customer = None
+    if customer_id:
+        customer = Customer.objects.filter(id=customer_id).first()
+    elif tax_no:
+        customer = Customer.objects.filter(tax_no=tax_no).first()
+        if not customer and tckn:
+            customer = Customer.objects.filter(tckn=tckn).first()
+    elif tckn:
+        customer = Customer.objects.filter(tckn=tckn).first()
+
+    if not customer:
+        return Response({"error": "Müşteri bulunamadı. Lütfen müşteri seçin."}, status=400)
+
+    url = store()
+
+    contract = Contract.objects.create(
+        customer=customer,
+        contract_no=contract_no,
+        contract_date=parsed.get("contract_date"),
+        contract_type=contract_type,
+        period_start_month=parsed.get("period_start_month"),
+        period_start_year=parsed.get("period_start_year"),
+        period_end_month=parsed.get("period_end_month"),
+        period_end_year=parsed.get("period_end_year"),
+        filename=filename,
+        content_type=content_type,
+        size=size,
+        file_url=url,
+        created_by=_actor(request),
+        updated_by=_actor(request),
+    )
+
+    AuditLog.objects.create(
+        model="Contract",
+        object_id=str(contract.pk),
+        action="create",
+        actor=_actor(request),
+    )
+
+    return Response(ContractSerializer(contract).data, status=201)
+
+
+def _job_file(request):
+    """İşin girdisi: doğrudan yükleme jetonu ya da depoya aktarılan ``file``; ikisi de yoksa None."""
+
+    token = request.data.get("token")
+    upload = request.FILES.get("file")
+    if token:
+        return _complete_upload(request, token)
+    if not upload:
+        return None
+    client = s3_client()
+    bucket = bucket_name()
+    _ensure_bucket(client, bucket)
+    key = f"{uuid.uuid4()}_{upload.name}"
+    content_type = upload.content_type or "application/octet-stream"
+    client.upload_fileobj(upload, bucket, key, ExtraArgs={"ContentType": content_type})
+    return {
+        "key": key,
+        "filename": upload.name,
+        "content_type": content_type,
+        "size": upload.size,
+        "url": object_url(key, bucket),
+    }
+
+
+def _queue_contract_job(view, info):
+    """Dosya için sözleşme işi açar, çıkarmayı commit sonrasında kuyruğa alır ve ``202`` döner."""
+
+    serializer = ContractJobSerializer(data={}, context=view.get_serializer_context())
+    serializer.is_valid(raise_exception=True)
+    serializer.validated_data["payload"] = {"file": info}
+    view.perform_create(serializer)
+    job = serializer.instance
+    transaction.on_commit(lambda: process_contract_job.delay(job.id))
+    return Response(serializer.data, status=202)
 
 
 class ContractJobViewSet(AuditViewSet):
+    """Sözleşme PDF'i yüklenir, alanlar worker'da çıkarılır, kullanıcı onaylayınca kart oluşur."""
+
     queryset = ContractJob.objects.all()
     serializer_class = ContractJobSerializer
 
-    def perform_create(self, serializer):
-        super().perform_create(serializer)
-        job = serializer.instance
-        process_contract_job.delay(job.id)
+    def get_queryset(self):
+        qs = super().get_queryset()
+        user = _actor(self.request)
+        if user and not user.is_staff:
+            qs = qs.filter(created_by=user)
+        return qs
+
+    def create(self, request, *args, **kwargs):
+        info = _job_file(request)
+        if info is None:
+            return Response({"error": "token veya file zorunludur."}, status=400)
+        return _queue_contract_job(self, info)
 
     @action(detail=True, methods=["get"])
     def status(self, request, pk=None):
         job = self.get_object()
-        return Response({"status": job.status})
+        return Response(
+            {
+                "status": job.status,
+                "progress": job.payload.get("progress"),
+                "parsed": job.payload.get("parsed"),
+                "confidence": job.payload.get("confidence"),
+                "error": job.payload.get("error"),
+                "contract": job.payload.get("contract"),
+            }
+        )
+
+    @action(detail=True, methods=["post"])
+    def confirm(self, request, pk=None):
+        """Ayrıştırılan alanları (istekteki düzeltmelerle) sözleşme kartına dönüştürür."""
+
+        self.get_object()
+        with transaction.atomic():
+            job = ContractJob.objects.select_for_update().get(pk=pk)
+            if job.status == DONE:
+                contract = Contract.objects.filter(id=job.payload.get("contract")).first()
+                if contract:
+                    return Response(ContractSerializer(contract).data)
+            # Okunamayan PDF'te alanlar elle girilir; kart yine aynı dosyayla oluşur.
+            if job.status not in (READY, FAILED) or "file" not in job.payload:
+                return Response({"error": "Sözleşme henüz işlenmedi.", "status": job.status}, status=409)
+            info = job.payload["file"]
+            response = _save_contract(
+                request,
+                dict(job.payload.get("parsed") or {}),
+                filename=info["filename"],
+                content_type=info["content_type"],
+                size=info["size"],
+                store=lambda: info["url"],
+            )
+            if response.status_code == 201:
+                job.status = DONE
+                job.payload = {**job.payload, "contract": response.data["id"]}
+                job.updated_by = _actor(request)
+                job.save(update_fields=["status", "payload", "updated_by", "updated_at"])
+        return response
 
 
-class ContractViewSet(AuditViewSet):
+class ContractViewSet(ExportMixin, AuditViewSet):
     queryset = Contract.objects.all()
     serializer_class = ContractSerializer
+    export_kind = "contracts"
 
     def get_queryset(self):
         qs = super().get_queryset()
         customer = self.request.query_params.get("customer")
-        status_filter = self.request.query_params.get("status")
         if customer:
             qs = qs.filter(customer_id=customer)
-        if status_filter:
-            qs = qs.filter(status=status_filter)
+        if self.action == "send_note_mail":
+            qs = qs.select_related("customer")
         return qs
 
     @action(detail=True, methods=["post"])
@@ -942,7 +1547,7 @@ class ContractViewSet(AuditViewSet):
         contact_name = contract.note_contact_name or getattr(contract.customer, "contact_person", "")
 
         try:
-            result = _send_note_email(
+            outbox = _queue_note_email(
                 request=request,
                 entity_label="Sözleşme",
                 entity_code=contract.contract_no or f"Sözleşme #{contract.id}",
@@ -955,113 +1560,29 @@ class ContractViewSet(AuditViewSet):
         except Exception as exc:
             return Response({"error": f"Mail gönderilemedi: {str(exc)}"}, status=400)
 
-        return Response({"status": "ok", **result})
+        return _mail_queued(outbox)
 
     @action(detail=False, methods=["post"])
     def upload(self, request):
-        upload = request.FILES.get("file")
-        if not upload:
-            return Response({"error": "file is required"}, status=400)
-
-        raw = upload.read()
-        text = ""
-        try:
-            reader = PdfReader(BytesIO(raw))
-            for page in reader.pages:
-                text += (page.extract_text() or "") + "\n"
-        except Exception:
-            text = ""
-
-        parsed = parse_contract_text(text or "")
-
-        for key in [
-            "tax_no",
-            "tax_office",
-            "customer_name",
-            "address",
-            "phone",
-            "email",
-            "contact_person",
-            "contract_no",
-            "contract_date",
-            "contract_type",
-            "period_start_month",
-            "period_start_year",
-            "period_end_month",
-            "period_end_year",
-        ]:
-            if request.data.get(key):
-                parsed[key] = request.data.get(key)
-
-        contract_no = (parsed.get("contract_no") or "").strip()
-        contract_type = (parsed.get("contract_type") or "").strip()
-        if not contract_no:
-            return Response({"error": "Sözleşme numarası zorunludur."}, status=400)
-        if not contract_type:
-            return Response({"error": "Sözleşme türü zorunludur."}, status=400)
-
-        customer_id = request.data.get("customer")
-        tax_no = parsed.get("tax_no") or request.data.get("tax_no")
-        tckn = request.data.get("tckn")
-        if not tckn and tax_no and str(tax_no).isdigit() and len(str(tax_no)) == 11:
-            tckn = str(tax_no)
-
-        customer = None
-        if customer_id:
-            customer = Customer.objects.filter(id=customer_id).first()
-        elif tax_no:
-            customer = Customer.objects.filter(tax_no=tax_no).first()
-            if not customer and tckn:
-                customer = Customer.objects.filter(tckn=tckn).first()
-        elif tckn:
-            customer = Customer.objects.filter(tckn=tckn).first()
-
-        if not customer:
-            return Response({"error": "Müşteri bulunamadı. Lütfen müşteri seçin."}, status=400)
-
-        client = _s3_client()
-        bucket = os.environ.get("MINIO_BUCKET", "ymm-files")
-        _ensure_bucket(client, bucket)
+        """Eski çok parçalı yükleme; dosya depoya aktarılır ve ``contract-jobs`` işi açılır."""
 
-        key = f"{uuid.uuid4()}_{upload.name}"
-        client.upload_fileobj(
-            BytesIO(raw),
-            bucket,
-            key,
-            ExtraArgs={"ContentType": upload.content_type or "application/octet-stream"},
-        )
+        if not request.FILES.get("file"):
+            return Response({"error": "file is required"}, status=400)
+        return _queue_contract_job(self, _job_file(request))
 
-        public_endpoint = os.environ.get("MINIO_PUBLIC_ENDPOINT")
-        endpoint = public_endpoint or os.environ.get("MINIO_ENDPOINT", "localhost:9000")
-        secure = os.environ.get("MINIO_SECURE", "false").lower() == "true"
-        scheme = "https" if secure else "http"
-        url = f"{scheme}://{endpoint}/{bucket}/{key}"
-
-        contract = Contract.objects.create(
-            customer=customer,
-            contract_no=contract_no,
-            contract_date=parsed.get("contract_date"),
-            contract_type=contract_type,
-            period_start_month=parsed.get("period_start_month"),
-            period_start_year=parsed.get("period_start_year"),
-            period_end_month=parsed.get("period_end_month"),
-            period_end_year=parsed.get("period_end_year"),
-            filename=upload.name,
-            content_type=upload.content_type or "application/octet-stream",
-            size=upload.size,
-            file_url=url,
-            created_by=_actor(request),
-            updated_by=_actor(request),
-        )
+    @action(detail=False, methods=["post"])
+    def upload_initiate(self, request):
+        return _initiate_upload(request)
 
-        AuditLog.objects.create(
-            model="Contract",
-            object_id=str(contract.pk),
-            action="create",
-            actor=_actor(request),
-        )
+    @action(detail=False, methods=["post"])
+    def upload_complete(self, request):
+        """Doğrudan yüklenen PDF için ``contract-jobs`` işi açar; tekrarında aynı iş döner."""
 
-        return Response(ContractSerializer(contract).data, status=201)
+        info = _complete_upload(request, request.data.get("token"))
+        existing = ContractJob.objects.filter(payload__file__url=info["url"]).first()
+        if existing:
+            return Response(ContractJobSerializer(existing).data, status=202)
+        return _queue_contract_job(self, info)
 
 
 def _get_settings():
@@ -1071,6 +1592,23 @@ def _get_settings():
     return obj
 
 
+def _table_data(request):
+    """İstemcinin gönderdiği tablo ``(kolonlar, satırlar)``; satırlar liste ya da kolon adlı nesne olabilir."""
+
+    columns = request.data.get("columns") or []
+    rows = request.data.get("rows") or []
+    if not isinstance(columns, list) or not isinstance(rows, list) or not columns:
+        return None
+    columns = [str(c) for c in columns]
+    normalized_rows = [
+        [str(v) if v is not None else "" for v in row] if isinstance(row, list)
+        else [str(row.get(c, "")) for c in columns]
+        for row in rows
+        if isinstance(row, (list, dict))
+    ]
+    return columns, normalized_rows
+
+
 class SettingsViewSet(viewsets.ViewSet):
     def list(self, request):
         obj = _get_settings()
@@ -1087,6 +1625,8 @@ class SettingsViewSet(viewsets.ViewSet):
         serializer = AppSettingSerializer(obj, data=data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        invalidate_dashboard()
+        mailer.invalidate_smtp()
         return Response(serializer.data)
 
     @action(detail=False, methods=["post"])
@@ -1101,15 +1641,15 @@ class SettingsViewSet(viewsets.ViewSet):
         if not recipients:
             return Response({"error": "Geçerli bir e-posta girin."}, status=400)
         try:
-            smtp = _smtp_runtime_config()
             msg = EmailMessage(
                 subject=f"[{(_get_settings().mail_brand_name or 'YMM Kadir Hafızoğlu').strip()}] SMTP Test",
                 body="Bu bir test e-postasıdır. SMTP ayarları başarıyla çalışıyor.",
-                from_email=smtp["from_email"],
+                from_email=mailer.from_email(),
                 to=recipients,
-                connection=smtp["connection"],
             )
-            msg.send(fail_silently=False)
+            error = mailer.send_messages([msg])[0]
+            if error is not None:
+                raise error
         except Exception as exc:
             return Response({"error": f"Test mail gönderilemedi: {str(exc)}"}, status=400)
         return Response({"status": "ok", "sent_to": recipients})
@@ -1124,10 +1664,10 @@ class SettingsViewSet(viewsets.ViewSet):
         if not recipients:
             return Response({"error": "En az bir geçerli alıcı e-posta girin."}, status=400)
 
-        columns = request.data.get("columns") or []
-        rows = request.data.get("rows") or []
-        if not isinstance(columns, list) or not isinstance(rows, list) or not columns:
+        table = _table_data(request)
+        if table is None:
             return Response({"error": "Geçerli kolon/satır verisi zorunludur."}, status=400)
+        columns, normalized_rows = table
 
         title = (request.data.get("title") or "Liste Raporu").strip()
         subject = (request.data.get("subject") or title).strip()
@@ -1135,71 +1675,41 @@ class SettingsViewSet(viewsets.ViewSet):
         attachment_format = (request.data.get("attachment_format") or "pdf").strip().lower()
         if attachment_format not in ("pdf", "csv"):
             attachment_format = "pdf"
-
-        from io import StringIO
-
-        sio = StringIO()
-        writer = csv.writer(sio)
-        writer.writerow([str(c) for c in columns])
-        for row in rows:
-            if isinstance(row, list):
-                writer.writerow([str(v) if v is not None else "" for v in row])
-            elif isinstance(row, dict):
-                writer.writerow([str(row.get(c, "")) for c in columns])
-        normalized_rows = [
-            [str(v) if v is not None else "" for v in row] if isinstance(row, list)
-            else [str(row.get(c, "")) for c in columns]
-            for row in rows
-        ]
-        csv_bytes = sio.getvalue().encode("utf-8-sig")
-        safe_name = title.replace(" ", "_")
-        filename = f"{safe_name}.pdf" if attachment_format == "pdf" else f"{safe_name}.csv"
-
-        try:
-            smtp = _smtp_runtime_config()
-            body = f"{title} raporu ektedir."
-            if note_text:
-                body = f"{title} raporu ektedir.\n\nAciklama:\n{note_text}"
-            msg = EmailMessage(
-                subject=subject,
-                body=body,
-                from_email=smtp["from_email"],
-                to=recipients,
-                connection=smtp["connection"],
-            )
-            if attachment_format == "pdf":
-                pdf_bytes = _build_table_pdf(title, [str(c) for c in columns], normalized_rows, note_text)
-                msg.attach(filename, pdf_bytes, "application/pdf")
-            else:
-                msg.attach(filename, csv_bytes, "text/csv")
-            msg.send(fail_silently=False)
-        except Exception as exc:
-            return Response({"error": f"Mail gönderilemedi: {str(exc)}"}, status=400)
-        return Response({"status": "ok", "sent_to": recipients})
+        body = f"{title} raporu ektedir."
+        if note_text:
+            body = f"{title} raporu ektedir.\n\nAciklama:\n{note_text}"
+        # PDF/CSV eki mail işçisinde üretilir; istek yalnızca kuyruğa yazar.
+        outbox = mailer.enqueue(
+            user=user,
+            subject=subject,
+            body=body,
+            to=recipients,
+            attachments=[mailer.table_attachment(title, columns, normalized_rows, note_text, attachment_format)],
+            idempotency_key=_idempotency_key(request),
+        )
+        return _mail_queued(outbox)
 
     @action(detail=False, methods=["post"])
     def export_table_pdf(self, request):
         user = _actor(request)
         if not user:
             raise PermissionDenied("Giriş gerekli.")
-        columns = request.data.get("columns") or []
-        rows = request.data.get("rows") or []
-        if not isinstance(columns, list) or not isinstance(rows, list) or not columns:
+        table = _table_data(request)
+        if table is None:
             return Response({"error": "Geçerli kolon/satır verisi zorunludur."}, status=400)
         title = (request.data.get("title") or "Liste Raporu").strip()
         note_text = (request.data.get("note") or "").strip()
-        normalized_rows = [
-            [str(v) if v is not None else "" for v in row] if isinstance(row, list)
-            else [str(row.get(c, "")) for c in columns]
-            for row in rows
-        ]
-        pdf_bytes = _build_table_pdf(title, [str(c) for c in columns], normalized_rows, note_text)
+        pdf_bytes = mailer.build_table_pdf(title, table[0], table[1], note_text)
         filename = f"{title.replace(' ', '_')}.pdf"
         response = HttpResponse(pdf_bytes, content_type="application/pdf")
         response["Content-Disposition"] = f'attachment; filename="{filename}"'
         return response
 
 
+# Numara verirken tablo taranmadığından sayaç mevcut kayıtların gerisine alınamaz.
+_COUNTER_BELOW_EXISTING = "Sayaç mevcut en büyük numaranın ({top}) altına indirilemez."
+
+
 class CounterAdminViewSet(viewsets.ViewSet):
     def create(self, request):
         user = _actor(request)
@@ -1215,6 +1725,9 @@ class CounterAdminViewSet(viewsets.ViewSet):
             if year == 2026 and Report.objects.filter(year=2026).exists():
                 return Response({"error": "2026 için kayıt başladıktan sonra kümülatif değiştirilemez."}, status=400)
             value = int(request.data.get("last_serial", 0))
+            top = Report.objects.aggregate(top=Max("type_cumulative"))["top"] or 0
+            if value < top:
+                return Response({"error": _COUNTER_BELOW_EXISTING.format(top=top)}, status=400)
             obj, _ = ReportCounterGlobal.objects.get_or_create(id=1)
             obj.last_serial = value
             obj.save()
@@ -1226,6 +1739,9 @@ class CounterAdminViewSet(viewsets.ViewSet):
             if year > 2025:
                 return Response({"error": "2026 ve sonrası için numaratör değiştirilemez."}, status=400)
             value = int(request.data.get("last_serial", 0))
+            top = Report.objects.filter(year=year).aggregate(top=Max("year_serial_all"))["top"] or 0
+            if value < top:
+                return Response({"error": _COUNTER_BELOW_EXISTING.format(top=top)}, status=400)
             obj, _ = ReportCounterYearAll.objects.get_or_create(year=year)
             obj.last_serial = value
             obj.save()
@@ -1238,6 +1754,9 @@ class CounterAdminViewSet(viewsets.ViewSet):
                 return Response({"error": "2026 ve sonrası için numaratör değiştirilemez."}, status=400)
             doc_type = request.data.get("doc_type")
             value = int(request.data.get("last_serial", 0))
+            top = Document.objects.filter(year=year, doc_type=doc_type).aggregate(top=Max("serial"))["top"] or 0
+            if value < top:
+                return Response({"error": _COUNTER_BELOW_EXISTING.format(top=top)}, status=400)
             obj, _ = DocumentCounter.objects.get_or_create(year=year, doc_type=doc_type)
             obj.last_serial = value
             obj.save()
@@ -1282,6 +1801,89 @@ def _ensure_global_chat_for_user(user):
     return thread
 
 
+def _unread_messages(user):
+    # Katılımcı satırı tek join ile bağlanır; son okuma zamanından sonraki mesajlar okunmamış sayılır.
+    unread = Q(thread__participants__last_read_at__isnull=True) | Q(
+        created_at__gt=F("thread__participants__last_read_at")
+    )
+    # Henüz yazılmamış okundu bilgileri de hesaba katılır (ikisinin büyüğü geçerlidir).
+    buffered = receipts.pending(user.id)
+    if buffered:
+        newer = ~Q(thread_id__in=list(buffered))
+        for thread_id, read_at in buffered.items():
+            newer |= Q(thread_id=thread_id, created_at__gt=read_at)
+        unread &= newer
+    return ChatMessage.objects.filter(
+        unread,
+        thread__participants__user_id=user.id,
+        is_deleted=False,
+    ).exclude(sender_id=user.id)
+
+
+def _unread_counts(user) -> dict:
+    rows = _unread_messages(user).order_by().values("thread_id").annotate(n=Count("id"))
+    return {row["thread_id"]: row["n"] for row in rows}
+
+
+def _unread_totals(user_ids) -> dict:
+    # Birden çok kullanıcının toplam okunmamış sayısı tek gruplu sorguyla hesaplanır.
+    # Henüz yazılmamış okundu bilgileri katılımcı satırına bindirilir (ikisinin büyüğü geçerlidir).
+    read_until = F("last_read_at")
+    buffered = [
+        When(user_id=user_id, thread_id=thread_id, then=Value(read_at))
+        for user_id, threads in receipts.pending_many(user_ids).items()
+        for thread_id, read_at in threads.items()
+    ]
+    if buffered:
+        pending_at = Case(*buffered, default=None, output_field=DateTimeField())
+        read_until = Greatest(Coalesce(F("last_read_at"), pending_at), Coalesce(pending_at, F("last_read_at")))
+    unread = (
+        Q(thread__messages__is_deleted=False)
+        & ~Q(thread__messages__sender_id=F("user_id"))
+        & (Q(read_until__isnull=True) | Q(thread__messages__created_at__gt=F("read_until")))
+    )
+    rows = (
+        ChatParticipant.objects.filter(user_id__in=user_ids)
+        .alias(read_until=read_until)
+        .order_by()
+        .values("user_id")
+        .annotate(n=Count("thread__messages", filter=unread))
+    )
+    totals = {uid: 0 for uid in user_ids}
+    for row in rows:
+        totals[row["user_id"]] += row["n"]
+    return totals
+
+
+def _thread_user_ids(thread_id) -> list:
+    return list(ChatParticipant.objects.filter(thread_id=thread_id).values_list("user_id", flat=True))
+
+
+def _mark_read(thread_id, user):
+    """Okundu zamanını tamponlar ve katılımcılara bildirir."""
+
+    now = timezone.now()
+    receipts.mark_read(thread_id, user.id, now)
+    user_ids = _thread_user_ids(thread_id)
+    payload = {"thread": int(thread_id), "user": user.id, "last_read_at": now}
+    transaction.on_commit(lambda: realtime.publish(user_ids, "read", payload))
+    unread = _unread_messages(user).count()
+    transaction.on_commit(lambda: realtime.publish([user.id], "unread", {"unread_count": unread}))
+
+
+def _push_message(thread_id, message_data):
+    user_ids = _thread_user_ids(thread_id)
+    payload = {"thread": int(thread_id), "message": message_data}
+    totals = _unread_totals(user_ids)
+
+    def send():
+        realtime.publish(user_ids, "message", payload)
+        for uid, count in totals.items():
+            realtime.publish([uid], "unread", {"unread_count": count})
+
+    transaction.on_commit(send)
+
+
 class ChatThreadViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
@@ -1304,12 +1906,9 @@ class ChatThreadViewSet(viewsets.ViewSet):
         if not user:
             raise PermissionDenied("Giriş gerekli.")
         rows = list(self._queryset(request))
+        unread = _unread_counts(user)
         for row in rows:
-            participant = next((p for p in row.participants.all() if p.user_id == user.id), None)
-            unread_qs = ChatMessage.objects.filter(thread_id=row.id, is_deleted=False).exclude(sender_id=user.id)
-            if participant and participant.last_read_at:
-                unread_qs = unread_qs.filter(created_at__gt=participant.last_read_at)
-            row.unread_count = unread_qs.count()
+            row.unread_count = unread.get(row.id, 0)
             if row.is_global:
                 row.title = "Genel Mesajlar"
                 continue
@@ -1388,16 +1987,23 @@ class ChatThreadViewSet(viewsets.ViewSet):
         user = _actor(request)
         if not user:
             raise PermissionDenied("Giriş gerekli.")
-        qs = User.objects.filter(is_active=True).exclude(id=user.id).order_by("username")
-        threshold = timezone.now() - timedelta(minutes=5)
+        presence.heartbeat(user.id)
+        qs = list(User.objects.filter(is_active=True).exclude(id=user.id).order_by("username"))
+        states = presence.get_presence(u.id for u in qs)
+        if states is None:
+            # Redis yoksa son okuma zamanı tek gruplu sorguyla yaklaşık durum verir.
+            threshold = timezone.now() - timedelta(minutes=5)
+            seen = dict(
+                ChatParticipant.objects.filter(user_id__in=[u.id for u in qs])
+                .order_by()
+                .values("user_id")
+                .annotate(last=Max("last_read_at"))
+                .values_list("user_id", "last")
+            )
+            states = {uid: (bool(last and last >= threshold), last) for uid, last in seen.items()}
         rows = []
         for u in qs:
-            last_seen = (
-                ChatParticipant.objects.filter(user=u)
-                .order_by("-last_read_at")
-                .values_list("last_read_at", flat=True)
-                .first()
-            )
+            is_online, last_seen = states.get(u.id, (False, None))
             rows.append(
                 {
                     "id": u.id,
@@ -1405,22 +2011,28 @@ class ChatThreadViewSet(viewsets.ViewSet):
                     "first_name": u.first_name,
                     "last_name": u.last_name,
                     "email": u.email,
-                    "is_online": bool(last_seen and last_seen >= threshold),
+                    "is_online": is_online,
                     "last_seen_at": last_seen,
                 }
             )
         return Response(rows)
 
+    @action(detail=False, methods=["post"])
+    def heartbeat(self, request):
+        user = _actor(request)
+        if not user:
+            raise PermissionDenied("Giriş gerekli.")
+        presence.heartbeat(user.id)
+        return Response({"status": "ok"})
+
     @action(detail=True, methods=["post"])
     def read(self, request, pk=None):
         user = _actor(request)
         if not user:
             raise PermissionDenied("Giriş gerekli.")
-        part = ChatParticipant.objects.filter(thread_id=pk, user=user).first()
-        if not part:
+        if not ChatParticipant.objects.filter(thread_id=pk, user=user).exists():
             raise PermissionDenied("Bu mesaja erişim yetkiniz yok.")
-        part.last_read_at = timezone.now()
-        part.save(update_fields=["last_read_at"])
+        _mark_read(pk, user)
         return Response({"status": "ok"})
 
     @action(detail=False, methods=["get"])
@@ -1428,15 +2040,9 @@ class ChatThreadViewSet(viewsets.ViewSet):
         user = _actor(request)
         if not user:
             raise PermissionDenied("Giriş gerekli.")
-        rows = list(self._queryset(request))
-        total = 0
-        for row in rows:
-            participant = next((p for p in row.participants.all() if p.user_id == user.id), None)
-            unread_qs = ChatMessage.objects.filter(thread_id=row.id, is_deleted=False).exclude(sender_id=user.id)
-            if participant and participant.last_read_at:
-                unread_qs = unread_qs.filter(created_at__gt=participant.last_read_at)
-            total += unread_qs.count()
-        return Response({"unread_count": total})
+        _ensure_global_chat_for_user(user)
+        presence.heartbeat(user.id)
+        return Response({"unread_count": _unread_messages(user).count()})
 
     @action(detail=True, methods=["post"])
     def leave(self, request, pk=None):
@@ -1469,32 +2075,73 @@ class ChatMessageViewSet(viewsets.ViewSet):
             raise PermissionDenied("Bu mesaja erişim yetkiniz yok.")
         return user, part
 
+    page_size = 50
+    max_page_size = 200
+
+    def _cursor_param(self, request, name):
+        raw = request.query_params.get(name)
+        if raw in (None, ""):
+            return None
+        try:
+            return int(raw)
+        except ValueError:
+            raise DRFValidationError({name: "Geçersiz mesaj id."})
+
     def list(self, request):
+        """Sohbetin son ``limit`` mesajını döner.
+
+        ``before=<id>`` daha eski sayfayı, ``after=<id>`` son görülen mesajdan
+        sonrakileri getirir; her iki durumda da sorgu boyutu sabittir.
+        """
+
         thread_id = request.query_params.get("thread")
         if not thread_id:
             return Response({"error": "thread zorunludur."}, status=400)
-        user, part = self._ensure_participant(request, thread_id)
+        user, _ = self._ensure_participant(request, thread_id)
+        before = self._cursor_param(request, "before")
+        after = self._cursor_param(request, "after")
+        limit = self._cursor_param(request, "limit") or self.page_size
+        limit = max(1, min(limit, self.max_page_size))
+
         qs = (
             ChatMessage.objects.filter(thread_id=thread_id, is_deleted=False)
             .select_related("sender")
             .prefetch_related("files")
-            .order_by("created_at")
         )
-        part.last_read_at = timezone.now()
-        part.save(update_fields=["last_read_at"])
-        return Response(ChatMessageSerializer(qs, many=True).data)
+        if after is not None:
+            rows = list(qs.filter(id__gt=after).order_by("id")[: limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+        else:
+            if before is not None:
+                qs = qs.filter(id__lt=before)
+            rows = list(qs.order_by("-id")[: limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit][::-1]
+
+        # Eski sayfalara bakmak okundu bilgisini değiştirmez; after= ile gelen sayfanın ardından
+        # mesaj kaldıysa istemci henüz sona ulaşmamıştır, okundu son sayfada işaretlenir.
+        if before is None and not (after is not None and has_more):
+            _mark_read(thread_id, user)
+        return Response({"results": ChatMessageSerializer(rows, many=True).data, "has_more": has_more})
 
     def create(self, request):
         thread_id = request.data.get("thread")
         if not thread_id:
             return Response({"error": "thread zorunludur."}, status=400)
-        user, part = self._ensure_participant(request, thread_id)
+        user, _ = self._ensure_participant(request, thread_id)
         serializer = ChatMessageCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         body = serializer.validated_data.get("body", "")
 
         upload_files = request.FILES.getlist("files")
-        if not body and not upload_files:
+        if hasattr(request.data, "getlist"):
+            tokens = request.data.getlist("uploads")
+        else:
+            tokens = request.data.get("uploads") or []
+        # Doğrudan depoya yüklenmiş dosyalar mesaj oluşturulmadan önce doğrulanır.
+        direct_files = [_complete_upload(request, token) for token in tokens]
+        if not body and not upload_files and not direct_files:
             return Response({"error": "Mesaj veya dosya zorunludur."}, status=400)
 
         msg = ChatMessage.objects.create(
@@ -1505,13 +2152,9 @@ class ChatMessageViewSet(viewsets.ViewSet):
         ChatThread.objects.filter(id=thread_id).update(updated_at=timezone.now())
 
         if upload_files:
-            client = _s3_client()
-            bucket = os.environ.get("MINIO_BUCKET", "ymm-files")
+            client = s3_client()
+            bucket = bucket_name()
             _ensure_bucket(client, bucket)
-            public_endpoint = os.environ.get("MINIO_PUBLIC_ENDPOINT")
-            endpoint = public_endpoint or os.environ.get("MINIO_ENDPOINT", "localhost:9000")
-            secure = os.environ.get("MINIO_SECURE", "false").lower() == "true"
-            scheme = "https" if secure else "http"
             for upload in upload_files:
                 key = f"chat/{uuid.uuid4()}_{upload.name}"
                 client.upload_fileobj(
@@ -1520,7 +2163,7 @@ class ChatMessageViewSet(viewsets.ViewSet):
                     key,
                     ExtraArgs={"ContentType": upload.content_type or "application/octet-stream"},
                 )
-                url = f"{scheme}://{endpoint}/{bucket}/{key}"
+                url = object_url(key, bucket)
                 ChatMessageFile.objects.create(
                     message=msg,
                     filename=upload.name,
@@ -1528,11 +2171,74 @@ class ChatMessageViewSet(viewsets.ViewSet):
                     size=upload.size,
                     url=url,
                 )
+        if direct_files:
+            ChatMessageFile.objects.bulk_create(
+                [
+                    ChatMessageFile(
+                        message=msg,
+                        filename=info["filename"],
+                        content_type=info["content_type"],
+                        size=info["size"],
+                        url=info["url"],
+                    )
+                    for info in direct_files
+                ]
+            )
 
-        part.last_read_at = timezone.now()
-        part.save(update_fields=["last_read_at"])
+        receipts.mark_read(thread_id, user.id, timezone.now())
         msg = ChatMessage.objects.select_related("sender").prefetch_related("files").get(id=msg.id)
-        return Response(ChatMessageSerializer(msg).data, status=201)
+        data = ChatMessageSerializer(msg).data
+        _push_message(thread_id, data)
+        return Response(data, status=201)
+
+    @action(detail=False, methods=["post"])
+    def upload_initiate(self, request):
+        return _initiate_upload(request, prefix="chat/")
+
+
+@api_view(["POST"])
+def chat_events_token(request):
+    """``chat/events/`` bağlantısı için ``CHAT_TICKET_MAX_AGE`` saniyelik bilet; her bağlantıdan önce alınır."""
+
+    user = _actor(request)
+    if not user:
+        raise PermissionDenied("Giriş gerekli.")
+    token = signing.dumps({"u": user.id}, salt=CHAT_TICKET_SALT)
+    return Response({"token": token, "expires_in": CHAT_TICKET_MAX_AGE})
+
+
+async def chat_events(request):
+    """Sohbet olaylarını (mesaj, okundu, okunmamış sayısı) SSE ile iletir.
+
+    EventSource başlık gönderemediği için ``chat/events/token/`` ile alınan bilet ``?token=``
+    ile gelir; erişim token'ı URL'ye yazılmaz.
+    """
+
+    try:
+        data = signing.loads(request.GET.get("token") or "", salt=CHAT_TICKET_SALT, max_age=CHAT_TICKET_MAX_AGE)
+    except signing.BadSignature:
+        return JsonResponse({"error": "Giriş gerekli."}, status=401)
+    user = await User.objects.filter(id=data.get("u"), is_active=True).afirst()
+    if user is None:
+        return JsonResponse({"error": "Giriş gerekli."}, status=401)
+    response = StreamingHttpResponse(
+        realtime.event_stream(user.id, heartbeat=presence.aheartbeat),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@api_view(["GET"])
+def dashboard(request):
+    if not _actor(request):
+        raise PermissionDenied("Giriş gerekli.")
+    try:
+        year = int(request.query_params.get("year") or 0) or None
+    except ValueError:
+        return Response({"error": "Geçersiz yıl."}, status=400)
+    return Response(get_dashboard(year))
 
 
 @api_view(["GET"])
@@ -3,7 +3,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { useParams } from "next/navigation";
 import Link from "next/link";
-import { apiFetch, apiUpload } from "@/lib/api";
+import { apiFetch, apiList, apiDirectUpload } from "@/lib/api";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { BackButton } from "@/components/back-button";
@@ -120,9 +120,9 @@ export default function ContractDetailPage() {
         const c = await apiFetch<ContractRow>(`/api/contracts/${id}/`);
         const [cust, docs, reps, n] = await Promise.all([
           apiFetch<Customer>(`/api/customers/${c.customer}/`),
-          apiFetch<DocumentRow[]>(`/api/documents/?contract=${c.id}`),
-          apiFetch<ReportRow[]>(`/api/reports/?contract=${c.id}`),
-          apiFetch<NoteRow[]>(`/api/notes/?contract=${c.id}`)
+          apiList<DocumentRow>(`/api/documents/?contract=${c.id}`),
+          apiList<ReportRow>(`/api/reports/?contract=${c.id}`),
+          apiList<NoteRow>(`/api/notes/?contract=${c.id}`)
         ]);
         setContract(c);
         setCustomer(cust);
@@ -167,7 +167,7 @@ export default function ContractDetailPage() {
         fd.append("customer", String(contract.customer));
         fd.append("note", String(created.id));
         fd.append("note_scope", "1");
-        await apiUpload("/api/files/upload/", fd);
+        await apiDirectUpload("files", fd);
       }
       if (sendMail) {
         const mailRes = await apiFetch<{ sent_to?: string[] }>(`/api/notes/${created.id}/send_mail/`, {
@@ -177,17 +177,18 @@ export default function ContractDetailPage() {
             note_contact_name: noteContactName || null,
             note_contact_email: noteContactEmail || null,
             extra_emails: manualEmails || null,
-            recipients: recipientEmails
+            recipients: recipientEmails,
+            idempotency_key: `note-${created.id}`
           })
         });
         const sentTo = (mailRes.sent_to || []).join(", ");
         if (sentTo) {
-          setNoteNotice(`Not kaydedildi ve mail gönderildi: ${sentTo}`);
+          setNoteNotice(`Not kaydedildi, mail gönderim sırasına alındı: ${sentTo}`);
         }
       }
       const [updatedContract, updatedNotes] = await Promise.all([
         apiFetch<ContractRow>(`/api/contracts/${contract.id}/`),
-        apiFetch<NoteRow[]>(`/api/notes/?contract=${contract.id}`)
+        apiList<NoteRow>(`/api/notes/?contract=${contract.id}`)
       ]);
       setContract(updatedContract);
       setCardNote(updatedContract.card_note || "");
@@ -356,7 +357,7 @@ export default function ContractDetailPage() {
                           onClick={async () => {
                             if (!confirm("Bu not dosyası silinsin mi?")) return;
                             await apiFetch(`/api/files/${f.id}/`, { method: "DELETE" });
-                            const updatedNotes = await apiFetch<NoteRow[]>(`/api/notes/?contract=${id}`);
+                            const updatedNotes = await apiList<NoteRow>(`/api/notes/?contract=${id}`);
                             setNotes(updatedNotes);
                           }}
                         >
@@ -373,7 +374,7 @@ export default function ContractDetailPage() {
                       if (!confirm("Bu not silinsin mi?")) return;
                       await apiFetch(`/api/notes/${n.id}/`, { method: "DELETE" });
                       const [updatedNotes, updatedContract] = await Promise.all([
-                        apiFetch<NoteRow[]>(`/api/notes/?contract=${id}`),
+                        apiList<NoteRow>(`/api/notes/?contract=${id}`),
                         apiFetch<ContractRow>(`/api/contracts/${id}/`)
                       ]);
                       setNotes(updatedNotes);
@@ -1,7 +1,15 @@
 ﻿"use client";
 
 import { useEffect, useMemo, useState } from "react";
-import { apiFetch, apiUpload, me } from "@/lib/api";
+import {
+  apiFetch,
+  apiList,
+  confirmContractJob,
+  getContractJobStatus,
+  me,
+  startContractJob,
+  type ContractJobStatus
+} from "@/lib/api";
 import { getAccessToken } from "@/lib/auth";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -43,6 +51,8 @@ export default function ContractsPage() {
   const [periodEndMonth, setPeriodEndMonth] = useState("");
   const [periodEndYear, setPeriodEndYear] = useState("");
   const [notice, setNotice] = useState<string | null>(null);
+  const [jobId, setJobId] = useState<number | null>(null);
+  const [job, setJob] = useState<ContractJobStatus | null>(null);
   const [saving, setSaving] = useState(false);
   const [isStaff, setIsStaff] = useState(false);
   const [filterCustomer, setFilterCustomer] = useState("");
@@ -55,8 +65,8 @@ export default function ContractsPage() {
     setLoadıng(true);
     try {
       const [contracts, custs, meInfo] = await Promise.all([
-        apiFetch<ContractRow[]>("/api/contracts/"),
-        apiFetch<Customer[]>("/api/customers/"),
+        apiList<ContractRow>("/api/contracts/"),
+        apiList<Customer>("/api/customers/"),
         me()
       ]);
       setItems(contracts);
@@ -104,25 +114,79 @@ export default function ContractsPage() {
     });
   }, [items, filterCustomer, filterStatus, filterNo, filterDateFrom, filterDateTo]);
 
+  useEffect(() => {
+    if (!jobId || job?.status === "ready" || job?.status === "failed" || job?.status === "done") return;
+    const timer = window.setTimeout(async () => {
+      try {
+        const next = await getContractJobStatus(jobId);
+        setJob(next);
+        if (next.status === "ready" && next.parsed) {
+          const p = next.parsed;
+          const str = (v: string | number | null | undefined) => (v === null || v === undefined ? "" : String(v));
+          // Kullanıcının elle girdiği alanlar korunur, boş olanlar PDF'ten doldurulur.
+          setContractNo((v) => v || str(p.contract_no));
+          setContractDate((v) => v || str(p.contract_date));
+          setContractType((v) => v || str(p.contract_type));
+          setPeriodStartMonth((v) => v || (p.period_start_month ? str(p.period_start_month).padStart(2, "0") : ""));
+          setPeriodStartYear((v) => v || str(p.period_start_year));
+          setPeriodEndMonth((v) => v || (p.period_end_month ? str(p.period_end_month).padStart(2, "0") : ""));
+          setPeriodEndYear((v) => v || str(p.period_end_year));
+        }
+      } catch {
+        setJob({ status: "failed" });
+      }
+    }, 1000);
+    return () => window.clearTimeout(timer);
+  }, [jobId, job]);
+
+  async function handleFileChange(next: File | null) {
+    setFile(next);
+    setJobId(null);
+    setJob(null);
+    if (!next) return;
+    try {
+      const created = await startContractJob(next);
+      setJobId(created.id);
+      setJob({ status: created.status });
+    } catch {
+      setJob({ status: "failed" });
+    }
+  }
+
+  function jobLabel() {
+    if (!job) return null;
+    if (job.status === "ready") return "PDF okundu, alanlar dolduruldu. Kontrol edip kaydedin.";
+    if (job.status === "failed") return "PDF okunamadı, alanları elle doldurun.";
+    if (job.progress) return `PDF okunuyor... (${job.progress.pages}/${job.progress.total} sayfa)`;
+    return "PDF okunuyor...";
+  }
+
   async function handleUpload(e: React.FormEvent) {
     e.preventDefault();
     setNotice(null);
     if (!file || !customerId) return;
     setSaving(true);
     try {
-      const fd = new FormData();
-      fd.append("file", file);
-      fd.append("customer", customerId);
-      if (contractNo) fd.append("contract_no", contractNo);
-      if (contractDate) fd.append("contract_date", contractDate);
-      if (contractType) fd.append("contract_type", contractType);
-      if (periodStartMonth) fd.append("period_start_month", periodStartMonth);
-      if (periodStartYear) fd.append("period_start_year", periodStartYear);
-      if (periodEndMonth) fd.append("period_end_month", periodEndMonth);
-      if (periodEndYear) fd.append("period_end_year", periodEndYear);
+      const fields: Record<string, string> = { customer: customerId };
+      if (contractNo) fields.contract_no = contractNo;
+      if (contractDate) fields.contract_date = contractDate;
+      if (contractType) fields.contract_type = contractType;
+      if (periodStartMonth) fields.period_start_month = periodStartMonth;
+      if (periodStartYear) fields.period_start_year = periodStartYear;
+      if (periodEndMonth) fields.period_end_month = periodEndMonth;
+      if (periodEndYear) fields.period_end_year = periodEndYear;
 
-      await apiUpload("/api/contracts/upload/", fd);
+      // PDF her zaman worker'da okunur; iş bitmeden kaydedilirse sonucu beklenir.
+      const id = jobId ?? (await startContractJob(file)).id;
+      let status = jobId ? job?.status : "pending";
+      while (status !== "ready" && status !== "failed" && status !== "done") {
+        await new Promise((resolve) => window.setTimeout(resolve, 1000));
+        status = (await getContractJobStatus(id)).status;
+      }
+      await confirmContractJob(id, fields);
       setFile(null);
+      setJobId(null);
+      setJob(null);
       setCustomerId("");
       setContractNo("");
       setContractDate("");
@@ -181,7 +245,10 @@ export default function ContractsPage() {
             </option>
           ))}
         </select>
-        <input type="file" onChange={(e) => setFile(e.target.files?.[0] || null)} />
+        <div className="space-y-1">
+          <input type="file" onChange={(e) => handleFileChange(e.target.files?.[0] || null)} />
+          {job ? <div className="text-xs text-ink/60">{jobLabel()}</div> : null}
+        </div>
         <Input placeholder="Sözleşme no (zorunlu)" value={contractNo} onChange={(e) => setContractNo(e.target.value)} />
         <Input type="date" placeholder="Sözleşme tarihi" value={contractDate} onChange={(e) => setContractDate(e.target.value)} />
         <Input placeholder="Sözleşme türü (zorunlu)" value={contractType} onChange={(e) => setContractType(e.target.value)} />
@@ -2,7 +2,7 @@
 
 import { useEffect, useState } from "react";
 import { useParams, useSearchParams } from "next/navigation";
-import { apiFetch, apiUpload, me } from "@/lib/api";
+import { apiFetch, apiList, apiDirectUpload, me } from "@/lib/api";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import Link from "next/link";
@@ -155,11 +155,11 @@ export default function CustomerCardPage() {
       try {
         const [c, d, r, f, n, contractItems, meInfo] = await Promise.all([
           apiFetch<Customer>(`/api/customers/${id}/`),
-          apiFetch<DocumentRow[]>(`/api/documents/?customer=${id}`),
-          apiFetch<ReportRow[]>(`/api/reports/?customer=${id}`),
-          apiFetch<FileRow[]>(`/api/files/?customer=${id}&scope=other`),
-          apiFetch<NoteRow[]>(`/api/notes/?customer=${id}`),
-          apiFetch<ContractRow[]>(`/api/contracts/?customer=${id}`),
+          apiList<DocumentRow>(`/api/documents/?customer=${id}&expand=files`),
+          apiList<ReportRow>(`/api/reports/?customer=${id}&expand=files`),
+          apiList<FileRow>(`/api/files/?customer=${id}&scope=other`),
+          apiList<NoteRow>(`/api/notes/?customer=${id}`),
+          apiList<ContractRow>(`/api/contracts/?customer=${id}`),
           me()
         ]);
         setCustomer(c);
@@ -241,10 +241,10 @@ export default function CustomerCardPage() {
     if (otherFileName.trim()) {
       fd.append("filename", otherFileName.trim());
     }
-    await apiUpload("/api/files/upload/", fd);
+    await apiDirectUpload("files", fd);
     setOtherFile(null);
     setOtherFileName("");
-    const updatedFiles = await apiFetch<FileRow[]>(`/api/files/?customer=${customer.id}&scope=other`);
+    const updatedFiles = await apiList<FileRow>(`/api/files/?customer=${customer.id}&scope=other`);
     setFiles(updatedFiles);
   }
   async function handleSaveNote(sendMail: boolean) {
@@ -271,7 +271,7 @@ export default function CustomerCardPage() {
         fd.append("customer", String(customer.id));
         fd.append("note", String(created.id));
         fd.append("note_scope", "1");
-        await apiUpload("/api/files/upload/", fd);
+        await apiDirectUpload("files", fd);
       }
       if (sendMail) {
         const mailRes = await apiFetch<{ sent_to?: string[] }>(`/api/notes/${created.id}/send_mail/`, {
@@ -281,17 +281,18 @@ export default function CustomerCardPage() {
             note_contact_name: noteContactName || null,
             note_contact_email: noteContactEmail || null,
             extra_emails: manualEmails || null,
-            recipients: recipientEmails
+            recipients: recipientEmails,
+            idempotency_key: `note-${created.id}`
           })
         });
         const sentTo = (mailRes.sent_to || []).join(", ");
         if (sentTo) {
-          setNoteNotice(`Not kaydedildi ve mail gönderildi: ${sentTo}`);
+          setNoteNotice(`Not kaydedildi, mail gönderim sırasına alındı: ${sentTo}`);
         }
       }
       const [updatedCustomer, updatedNotes] = await Promise.all([
         apiFetch<Customer>(`/api/customers/${customer.id}/`),
-        apiFetch<NoteRow[]>(`/api/notes/?customer=${customer.id}`)
+        apiList<NoteRow>(`/api/notes/?customer=${customer.id}`)
       ]);
       setCustomer(updatedCustomer);
       setCardNote(updatedCustomer.card_note || "");
@@ -433,7 +434,7 @@ export default function CustomerCardPage() {
                             onClick={async () => {
                               if (!confirm("Bu not dosyası silinsin mi?")) return;
                               await apiFetch(`/api/files/${f.id}/`, { method: "DELETE" });
-                              const updatedNotes = await apiFetch<NoteRow[]>(`/api/notes/?customer=${id}`);
+                              const updatedNotes = await apiList<NoteRow>(`/api/notes/?customer=${id}`);
                               setNotes(updatedNotes);
                             }}
                           >
@@ -451,7 +452,7 @@ export default function CustomerCardPage() {
                       onClick={async () => {
                         if (!confirm("Bu not silinsin mi?")) return;
                         await apiFetch(`/api/notes/${n.id}/`, { method: "DELETE" });
-                        const updatedNotes = await apiFetch<NoteRow[]>(`/api/notes/?customer=${id}`);
+                        const updatedNotes = await apiList<NoteRow>(`/api/notes/?customer=${id}`);
                         setNotes(updatedNotes);
                       }}
                     >
@@ -1,7 +1,7 @@
 ﻿"use client";
 
 import { useEffect, useState } from "react";
-import { apiFetch, apiUpload, me } from "@/lib/api";
+import { apiFetch, apiList, apiDirectUpload, me } from "@/lib/api";
 import { getAccessToken } from "@/lib/auth";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -72,7 +72,7 @@ export default function CustomersPage() {
   async function load() {
     try {
       const [data, meInfo] = await Promise.all([
-        apiFetch<Customer[]>("/api/customers/"),
+        apiList<Customer>("/api/customers/"),
         me()
       ]);
       setItems(data);
@@ -117,7 +117,7 @@ export default function CustomersPage() {
         const fd = new FormData();
         fd.append("file", contractFile);
         fd.append("customer", String(customer.id));
-        await apiUpload("/api/files/upload/", fd);
+        await apiDirectUpload("files", fd);
         setContractFile(null);
       }
 
@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useParams, useSearchParams } from "next/navigation";
 import Link from "next/link";
-import { apiFetch, apiUpload, me } from "@/lib/api";
+import { apiFetch, apiList, apiDirectUpload, me } from "@/lib/api";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { BackButton } from "@/components/back-button";
@@ -123,8 +123,8 @@ export default function DocumentDetailPage() {
       try {
         const [d, f, n, meInfo] = await Promise.all([
           apiFetch<DocumentRow>(`/api/documents/${id}/`),
-          apiFetch<FileRow[]>(`/api/files/?document=${id}&note_scope=0`),
-          apiFetch<NoteRow[]>(`/api/notes/?document=${id}`),
+          apiList<FileRow>(`/api/files/?document=${id}&note_scope=0`),
+          apiList<NoteRow>(`/api/notes/?document=${id}`),
           me()
         ]);
         setDoc(d);
@@ -217,17 +217,17 @@ export default function DocumentDetailPage() {
       const fd = new FormData();
       fd.append("file", f);
       fd.append("document", String(doc.id));
-      await apiUpload("/api/files/upload/", fd);
+      await apiDirectUpload("files", fd);
     }
     setUploadFiles([]);
-    const updatedFiles = await apiFetch<FileRow[]>(`/api/files/?document=${doc.id}&note_scope=0`);
+    const updatedFiles = await apiList<FileRow>(`/api/files/?document=${doc.id}&note_scope=0`);
     setFiles(updatedFiles);
   }
 
   async function handleDeleteFile(fileId: number) {
     if (!confirm("Dosya silinsin mi?")) return;
     await apiFetch(`/api/files/${fileId}/`, { method: "DELETE" });
-    const updatedFiles = await apiFetch<FileRow[]>(`/api/files/?document=${id}&note_scope=0`);
+    const updatedFiles = await apiList<FileRow>(`/api/files/?document=${id}&note_scope=0`);
     setFiles(updatedFiles);
   }
 
@@ -271,7 +271,7 @@ export default function DocumentDetailPage() {
         fd.append("document", String(doc.id));
         fd.append("note", String(created.id));
         fd.append("note_scope", "1");
-        await apiUpload("/api/files/upload/", fd);
+        await apiDirectUpload("files", fd);
       }
       if (sendMail) {
         const mailRes = await apiFetch<{ sent_to?: string[] }>(`/api/notes/${created.id}/send_mail/`, {
@@ -281,17 +281,18 @@ export default function DocumentDetailPage() {
             note_contact_name: noteContactName || null,
             note_contact_email: noteContactEmail || null,
             extra_emails: manualEmails || null,
-            recipients: recipientEmails
+            recipients: recipientEmails,
+            idempotency_key: `note-${created.id}`
           })
         });
         const sentTo = (mailRes.sent_to || []).join(", ");
         if (sentTo) {
-          setNoteNotice(`Not kaydedildi ve mail gönderildi: ${sentTo}`);
+          setNoteNotice(`Not kaydedildi, mail gönderim sırasına alındı: ${sentTo}`);
         }
       }
       const [updatedDoc, updatedNotes] = await Promise.all([
         apiFetch<DocumentRow>(`/api/documents/${doc.id}/`),
-        apiFetch<NoteRow[]>(`/api/notes/?document=${doc.id}`)
+        apiList<NoteRow>(`/api/notes/?document=${doc.id}`)
       ]);
       setDoc(updatedDoc);
       setCardNote(updatedDoc.card_note || "");
@@ -527,7 +528,7 @@ export default function DocumentDetailPage() {
                             onClick={async () => {
                               if (!confirm("Bu not dosyası silinsin mi?")) return;
                               await apiFetch(`/api/files/${f.id}/`, { method: "DELETE" });
-                              const updatedNotes = await apiFetch<NoteRow[]>(`/api/notes/?document=${id}`);
+                              const updatedNotes = await apiList<NoteRow>(`/api/notes/?document=${id}`);
                               setNotes(updatedNotes);
                             }}
                           >
@@ -546,7 +547,7 @@ export default function DocumentDetailPage() {
                         if (!confirm("Bu not silinsin mi?")) return;
                         await apiFetch(`/api/notes/${n.id}/`, { method: "DELETE" });
                         const [updatedNotes, updatedDoc] = await Promise.all([
-                          apiFetch<NoteRow[]>(`/api/notes/?document=${id}`),
+                          apiList<NoteRow>(`/api/notes/?document=${id}`),
                           apiFetch<DocumentRow>(`/api/documents/${id}/`)
                         ]);
                         setNotes(updatedNotes);
@@ -1,7 +1,7 @@
 ﻿"use client";
 
 import { useEffect, useMemo, useState } from "react";
-import { apiFetch, apiUpload, me, getSettings } from "@/lib/api";
+import { apiFetch, apiList, apiDirectUpload, me, getSettings } from "@/lib/api";
 import { getAccessToken } from "@/lib/auth";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -90,8 +90,8 @@ export default function DocumentsPage() {
     setLoading(true);
     try {
       const [docs, custs, meInfo, settings] = await Promise.all([
-        apiFetch<DocumentRow[]>("/api/documents/"),
-        apiFetch<Customer[]>("/api/customers/"),
+        apiList<DocumentRow>("/api/documents/"),
+        apiList<Customer>("/api/customers/"),
         me(),
         getSettings().catch(() => null)
       ]);
@@ -123,7 +123,7 @@ export default function DocumentsPage() {
         return;
       }
       try {
-        const items = await apiFetch<Contract[]>(`/api/contracts/?customer=${customerId}&status=OPEN`);
+        const items = await apiList<Contract>(`/api/contracts/?customer=${customerId}&status=OPEN`);
         setContracts(items);
         if (items.length === 0) {
           setContractId("");
@@ -211,7 +211,7 @@ export default function DocumentsPage() {
         const fd = new FormData();
         fd.append("file", f);
         fd.append("document", String(doc.id));
-        await apiUpload("/api/files/upload/", fd);
+        await apiDirectUpload("files", fd);
       }
       setUploadFiles([]);
       setManualSerial("");
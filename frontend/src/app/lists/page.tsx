@@ -1,7 +1,7 @@
 "use client";
 
 import { useEffect, useMemo, useState } from "react";
-import { apiFetch, apiUpload, exportTablePdf, sendTableMail } from "@/lib/api";
+import { apiList, apiDirectUpload, exportListUrl, getExportJobStatus, sendTableMail, startPdfExport } from "@/lib/api";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 
@@ -74,6 +74,7 @@ export default function ListsPage() {
   const [mailNote, setMailNote] = useState("");
   const [mailing, setMailing] = useState(false);
   const [notice, setNotice] = useState<string | null>(null);
+  const [exporting, setExporting] = useState(false);
 
   const customerMap = useMemo(() => new Map(customers.map((c) => [c.id, c.name])), [customers]);
   const contractMap = useMemo(
@@ -86,10 +87,10 @@ export default function ListsPage() {
       setLoading(true);
       try {
         const [cust, ctrs, docs, reps] = await Promise.all([
-          apiFetch<Customer[]>("/api/customers/"),
-          apiFetch<Contract[]>("/api/contracts/"),
-          apiFetch<Document[]>("/api/documents/"),
-          apiFetch<Report[]>("/api/reports/")
+          apiList<Customer>("/api/customers/"),
+          apiList<Contract>("/api/contracts/"),
+          apiList<Document>("/api/documents/"),
+          apiList<Report>("/api/reports/")
         ]);
         setCustomers(cust);
         setContracts(ctrs);
@@ -215,7 +216,7 @@ export default function ListsPage() {
     fd.append("file", file);
     fd.append("customer", saveCustomerId);
     fd.append("filename", file.name);
-    await apiUpload("/api/files/upload/", fd);
+    await apiDirectUpload("files", fd);
     setNotice("Liste dosyasi mukellef kartina kaydedildi.");
   }
 
@@ -244,7 +245,7 @@ export default function ListsPage() {
         columns,
         rows: tableRows
       });
-      setNotice(`Mail gonderildi: ${(res.sent_to || []).join(", ")}`);
+      setNotice(`Mail gonderim sirasina alindi: ${(res.sent_to || []).join(", ")}`);
     } catch (err) {
       setNotice(`Mail gonderilemedi: ${err instanceof Error ? err.message : "Hata"}`);
     } finally {
@@ -256,7 +257,37 @@ export default function ListsPage() {
     window.print();
   }
 
+  function listFilters() {
+    const related = tab !== "customers";
+    return {
+      q: search.trim(),
+      customer: related ? customerFilter : "",
+      status: related ? statusFilter : "",
+      type: related ? typeFilter : "",
+      date_from: related ? dateFrom : "",
+      date_to: related ? dateTo : ""
+    };
+  }
+
+  function openDownload(url: string) {
+    const a = document.createElement("a");
+    a.href = url;
+    document.body.appendChild(a);
+    a.click();
+    a.remove();
+  }
+
+  async function downloadList(fileFormat: "csv" | "xlsx") {
+    // Filtreler sunucuda uygulanır; dosya tarayıcıda tutulmadan doğrudan indirilir.
+    try {
+      openDownload(await exportListUrl(tab, fileFormat, listFilters()));
+    } catch (err) {
+      setNotice(`Liste indirilemedi: ${err instanceof Error ? err.message : "Hata"}`);
+    }
+  }
+
   async function downloadPdf() {
+    setExporting(true);
     try {
       const title =
         tab === "customers"
@@ -266,22 +297,19 @@ export default function ListsPage() {
           : tab === "reports"
           ? "Rapor Liste Raporu"
           : "Sozlesme Liste Raporu";
-      const blob = await exportTablePdf({
-        title,
-        note: mailNote,
-        columns,
-        rows: tableRows
-      });
-      const url = URL.createObjectURL(blob);
-      const a = document.createElement("a");
-      a.href = url;
-      a.download = `${title.replace(/\s+/g, "_")}.pdf`;
-      document.body.appendChild(a);
-      a.click();
-      a.remove();
-      URL.revokeObjectURL(url);
+      // PDF sunucuda filtrelerle üretilir; satırlar tarayıcıdan gönderilmez.
+      const job = await startPdfExport({ resource: tab, filters: listFilters(), title, note: mailNote });
+      let status = await getExportJobStatus(job.id);
+      while (status.status === "pending" || status.status === "running") {
+        await new Promise((resolve) => window.setTimeout(resolve, 1000));
+        status = await getExportJobStatus(job.id);
+      }
+      if (status.status !== "done" || !status.url) throw new Error(status.error || "Hata");
+      openDownload(status.url);
     } catch (err) {
       setNotice(`PDF olusturulamadi: ${err instanceof Error ? err.message : "Hata"}`);
+    } finally {
+      setExporting(false);
     }
   }
 
@@ -366,7 +394,11 @@ export default function ListsPage() {
         </Button>
         <div className="flex gap-2">
           <Button onClick={printView}>Yazdir</Button>
-          <Button variant="outline" onClick={downloadPdf}>PDF Indir</Button>
+          <Button variant="outline" onClick={downloadPdf} disabled={exporting}>
+            {exporting ? "PDF Hazirlaniyor..." : "PDF Indir"}
+          </Button>
+          <Button variant="outline" onClick={() => downloadList("csv")}>CSV Indir</Button>
+          <Button variant="outline" onClick={() => downloadList("xlsx")}>Excel Indir</Button>
         </div>
       </div>
 
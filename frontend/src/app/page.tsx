@@ -1,44 +1,27 @@
 ﻿"use client";
 
-import { useCallback, useEffect, useMemo, useState } from "react";
+import { useCallback, useEffect, useState } from "react";
 import Link from "next/link";
-import { apiFetch } from "@/lib/api";
+import { getDashboard, type DashboardData } from "@/lib/api";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader } from "@/components/ui/card";
 
-type Customer = { id: number; name: string };
-type AppSettings = { working_year: number; reference_year: number };
-type DocumentRow = { id: number; doc_no: string; year?: number; subject?: string; created_at?: string; status?: string };
-type ReportRow = { id: number; report_no: string; year?: number; subject?: string; created_at?: string; status?: string };
-
 export default function Dashboard() {
-  const [customers, setCustomers] = useState<Customer[]>([]);
-  const [documents, setDocuments] = useState<DocumentRow[]>([]);
-  const [reports, setReports] = useState<ReportRow[]>([]);
-  const [settings, setSettings] = useState<AppSettings | null>(null);
-  const [selectedYear, setSelectedYear] = useState<number>(new Date().getFullYear());
+  const [data, setData] = useState<DashboardData | null>(null);
+  const [selectedYear, setSelectedYear] = useState<number | null>(null);
   const [loading, setLoading] = useState(true);
   const [lastUpdated, setLastUpdated] = useState<Date | null>(null);
 
   const load = useCallback(async () => {
     setLoading(true);
     try {
-      const ts = Date.now();
-      const [custs, docs, reps, appSettings] = await Promise.all([
-        apiFetch<Customer[]>(`/api/customers/?_ts=${ts}`),
-        apiFetch<DocumentRow[]>(`/api/documents/?_ts=${ts}`),
-        apiFetch<ReportRow[]>(`/api/reports/?_ts=${ts}`),
-        apiFetch<AppSettings>(`/api/settings/?_ts=${ts}`).catch(() => null)
-      ]);
-      setCustomers(custs);
-      setDocuments(docs);
-      setReports(reps);
-      setSettings(appSettings);
+      const result = await getDashboard(selectedYear ?? undefined);
+      setData(result);
       setLastUpdated(new Date());
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [selectedYear]);
 
   useEffect(() => {
     load();
@@ -51,39 +34,20 @@ export default function Dashboard() {
     };
   }, [load]);
 
-  const years = useMemo(() => {
-    const ys = new Set<number>();
-    if (settings?.working_year) ys.add(settings.working_year);
-    documents.forEach((d) => d.year && ys.add(d.year));
-    reports.forEach((r) => r.year && ys.add(r.year));
-    ys.add(new Date().getFullYear());
-    return Array.from(ys).sort((a, b) => b - a);
-  }, [settings, documents, reports]);
-
-  useEffect(() => {
-    if (settings?.working_year && !years.includes(selectedYear)) {
-      setSelectedYear(settings.working_year);
-    }
-  }, [settings, years, selectedYear]);
-
-  const yearDocuments = useMemo(() => documents.filter((d) => (d.year ?? 0) === selectedYear), [documents, selectedYear]);
-  const yearReports = useMemo(() => reports.filter((r) => (r.year ?? 0) === selectedYear), [reports, selectedYear]);
+  const years = data?.years ?? [new Date().getFullYear()];
+  const activeYear = selectedYear ?? data?.year ?? new Date().getFullYear();
 
-  const openDocs = yearDocuments.filter((d) => d.status !== "DONE").length;
-  const doneDocs = yearDocuments.filter((d) => d.status === "DONE").length;
-  const openReports = yearReports.filter((r) => r.status !== "DONE").length;
-  const doneReports = yearReports.filter((r) => r.status === "DONE").length;
+  const countBy = (rows: DashboardData["documents"], done: boolean) =>
+    rows
+      .filter((r) => r.year === activeYear && (r.status === "DONE") === done)
+      .reduce((sum, r) => sum + r.count, 0);
 
-  const recentActivity = useMemo(() => {
-    const rows = [
-      ...yearDocuments.map((d) => ({ id: `doc-${d.id}`, title: d.doc_no, subtitle: d.subject || "Evrak", date: d.created_at })),
-      ...yearReports.map((r) => ({ id: `rep-${r.id}`, title: r.report_no, subtitle: r.subject || "Rapor", date: r.created_at }))
-    ];
-    return rows
-      .filter((r) => r.date)
-      .sort((a, b) => (b.date || "").localeCompare(a.date || ""))
-      .slice(0, 5);
-  }, [yearDocuments, yearReports]);
+  const openDocs = countBy(data?.documents ?? [], false);
+  const doneDocs = countBy(data?.documents ?? [], true);
+  const openReports = countBy(data?.reports ?? [], false);
+  const doneReports = countBy(data?.reports ?? [], true);
+  const customerTotal = data?.customers.total ?? 0;
+  const recentActivity = data?.recent ?? [];
 
   return (
     <div className="space-y-8">
@@ -94,7 +58,7 @@ export default function Dashboard() {
           <span className="text-sm text-ink/60">Gösterge Yılı:</span>
           <select
             className="h-9 rounded-md border border-ink/20 bg-white px-3 text-sm"
-            value={selectedYear}
+            value={activeYear}
             onChange={(e) => setSelectedYear(Number(e.target.value))}
           >
             {years.map((y) => (
@@ -112,7 +76,7 @@ export default function Dashboard() {
             <div className="text-sm text-ink/60">Mükellefler</div>
           </CardHeader>
           <CardContent>
-            <div className="text-3xl font-semibold">{loading ? "-" : customers.length}</div>
+            <div className="text-3xl font-semibold">{loading ? "-" : customerTotal}</div>
             <div className="text-sm text-ink/50">Toplam kayıt</div>
           </CardContent>
         </Card>
@@ -155,7 +119,7 @@ export default function Dashboard() {
         </CardHeader>
         <CardContent>
           <div className="text-sm text-ink/70">
-            Çalışma yılı: <b>{settings?.working_year ?? "-"}</b> | Seçili gösterge yılı: <b>{selectedYear}</b>
+            Çalışma yılı: <b>{data?.working_year ?? "-"}</b> | Seçili gösterge yılı: <b>{activeYear}</b>
           </div>
         </CardContent>
       </Card>
@@ -185,7 +149,7 @@ export default function Dashboard() {
               <Button variant="outline" size="sm" onClick={load}>Yenile</Button>
             </div>
             <div className="mt-1 text-xs text-ink/50">
-              Son güncelleme: {lastUpdated ? lastUpdated.toLocaleTimeString("tr-TR") : "-"} | Yıl: {selectedYear}
+              Son güncelleme: {lastUpdated ? lastUpdated.toLocaleTimeString("tr-TR") : "-"} | Yıl: {activeYear}
             </div>
           </CardHeader>
           <CardContent>
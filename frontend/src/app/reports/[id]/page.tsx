@@ -2,7 +2,7 @@
 
 import { useEffect, useState } from "react";
 import { useParams, useSearchParams } from "next/navigation";
-import { apiFetch, apiUpload, me } from "@/lib/api";
+import { apiFetch, apiList, apiDirectUpload, me } from "@/lib/api";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import Link from "next/link";
@@ -123,8 +123,8 @@ export default function ReportDetailPage() {
       try {
         const [r, f, n, meInfo] = await Promise.all([
           apiFetch<ReportRow>(`/api/reports/${id}/`),
-          apiFetch<FileRow[]>(`/api/files/?report=${id}&note_scope=0`),
-          apiFetch<NoteRow[]>(`/api/notes/?report=${id}`),
+          apiList<FileRow>(`/api/files/?report=${id}&note_scope=0`),
+          apiList<NoteRow>(`/api/notes/?report=${id}`),
           me()
         ]);
         setRep(r);
@@ -213,17 +213,17 @@ export default function ReportDetailPage() {
       const fd = new FormData();
       fd.append("file", f);
       fd.append("report", String(rep.id));
-      await apiUpload("/api/files/upload/", fd);
+      await apiDirectUpload("files", fd);
     }
     setUploadFiles([]);
-    const updatedFiles = await apiFetch<FileRow[]>(`/api/files/?report=${rep.id}&note_scope=0`);
+    const updatedFiles = await apiList<FileRow>(`/api/files/?report=${rep.id}&note_scope=0`);
     setFiles(updatedFiles);
   }
 
   async function handleDeleteFile(fileId: number) {
     if (!confirm("Dosya silinsin mi?")) return;
     await apiFetch(`/api/files/${fileId}/`, { method: "DELETE" });
-    const updatedFiles = await apiFetch<FileRow[]>(`/api/files/?report=${id}&note_scope=0`);
+    const updatedFiles = await apiList<FileRow>(`/api/files/?report=${id}&note_scope=0`);
     setFiles(updatedFiles);
   }
 
@@ -267,7 +267,7 @@ export default function ReportDetailPage() {
         fd.append("report", String(rep.id));
         fd.append("note", String(created.id));
         fd.append("note_scope", "1");
-        await apiUpload("/api/files/upload/", fd);
+        await apiDirectUpload("files", fd);
       }
       if (sendMail) {
         const mailRes = await apiFetch<{ sent_to?: string[] }>(`/api/notes/${created.id}/send_mail/`, {
@@ -277,17 +277,18 @@ export default function ReportDetailPage() {
             note_contact_name: noteContactName || null,
             note_contact_email: noteContactEmail || null,
             extra_emails: manualEmails || null,
-            recipients: recipientEmails
+            recipients: recipientEmails,
+            idempotency_key: `note-${created.id}`
           })
         });
         const sentTo = (mailRes.sent_to || []).join(", ");
         if (sentTo) {
-          setNoteNotice(`Not kaydedildi ve mail gönderildi: ${sentTo}`);
+          setNoteNotice(`Not kaydedildi, mail gönderim sırasına alındı: ${sentTo}`);
         }
       }
       const [updatedRep, updatedNotes] = await Promise.all([
         apiFetch<ReportRow>(`/api/reports/${rep.id}/`),
-        apiFetch<NoteRow[]>(`/api/notes/?report=${rep.id}`)
+        apiList<NoteRow>(`/api/notes/?report=${rep.id}`)
       ]);
       setRep(updatedRep);
       setCardNote(updatedRep.card_note || "");
@@ -525,7 +526,7 @@ export default function ReportDetailPage() {
                             onClick={async () => {
                               if (!confirm("Bu not dosyası silinsin mi?")) return;
                               await apiFetch(`/api/files/${f.id}/`, { method: "DELETE" });
-                              const updatedNotes = await apiFetch<NoteRow[]>(`/api/notes/?report=${id}`);
+                              const updatedNotes = await apiList<NoteRow>(`/api/notes/?report=${id}`);
                               setNotes(updatedNotes);
                             }}
                           >
@@ -544,7 +545,7 @@ export default function ReportDetailPage() {
                         if (!confirm("Bu not silinsin mi?")) return;
                         await apiFetch(`/api/notes/${n.id}/`, { method: "DELETE" });
                         const [updatedNotes, updatedRep] = await Promise.all([
-                          apiFetch<NoteRow[]>(`/api/notes/?report=${id}`),
+                          apiList<NoteRow>(`/api/notes/?report=${id}`),
                           apiFetch<ReportRow>(`/api/reports/${id}/`)
                         ]);
                         setNotes(updatedNotes);
@@ -1,7 +1,7 @@
 ﻿"use client";
 
 import { useEffect, useMemo, useState } from "react";
-import { apiFetch, apiUpload, me, getSettings } from "@/lib/api";
+import { apiFetch, apiList, apiDirectUpload, me, getSettings } from "@/lib/api";
 import { getAccessToken } from "@/lib/auth";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -96,8 +96,8 @@ export default function ReportsPage() {
     setLoading(true);
     try {
       const [reps, custs, meInfo, settings] = await Promise.all([
-        apiFetch<ReportRow[]>("/api/reports/"),
-        apiFetch<Customer[]>("/api/customers/"),
+        apiList<ReportRow>("/api/reports/"),
+        apiList<Customer>("/api/customers/"),
         me(),
         getSettings().catch(() => null)
       ]);
@@ -132,7 +132,7 @@ export default function ReportsPage() {
         return;
       }
       try {
-        const items = await apiFetch<Contract[]>(`/api/contracts/?customer=${customerId}&status=OPEN`);
+        const items = await apiList<Contract>(`/api/contracts/?customer=${customerId}&status=OPEN`);
         setContracts(items);
         if (items.length === 0) {
           setContractId("");
@@ -235,7 +235,7 @@ export default function ReportsPage() {
         const fd = new FormData();
         fd.append("file", f);
         fd.append("report", String(rep.id));
-        await apiUpload("/api/files/upload/", fd);
+        await apiDirectUpload("files", fd);
       }
       setUploadFiles([]);
       setManualReportNo("");
@@ -10,6 +10,7 @@ import {
   getChatUsers,
   leaveChatThread,
   me,
+  openChatEvents,
   readChatThread,
   sendChatMessage,
   type ChatMessage,
@@ -30,6 +31,8 @@ export default function ChatDrawer() {
   const [users, setUsers] = useState<ChatUser[]>([]);
   const [activeThreadId, setActiveThreadId] = useState<number | null>(null);
   const [messages, setMessages] = useState<ChatMessage[]>([]);
+  const [hasOlder, setHasOlder] = useState(false);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [unreadCount, setUnreadCount] = useState(0);
@@ -41,6 +44,12 @@ export default function ChatDrawer() {
   const [newDirectUserId, setNewDirectUserId] = useState<number | "">("");
   const [currentUserId, setCurrentUserId] = useState<number | null>(null);
   const bottomRef = useRef<HTMLDivElement | null>(null);
+  const openRef = useRef(open);
+  const activeThreadRef = useRef<number | null>(activeThreadId);
+  const [live, setLive] = useState(false);
+
+  openRef.current = open;
+  activeThreadRef.current = activeThreadId;
 
   const activeThread = useMemo(
     () => threads.find((t) => t.id === activeThreadId) || null,
@@ -91,7 +100,8 @@ export default function ChatDrawer() {
     setError(null);
     try {
       const data = await getChatMessages(threadId);
-      setMessages(data);
+      setMessages(data.results);
+      setHasOlder(data.has_more);
       await readChatThread(threadId);
       await Promise.all([loadThreads(), loadUnread()]);
     } catch (err) {
@@ -103,6 +113,41 @@ export default function ChatDrawer() {
     }
   }
 
+  async function loadNewMessages(threadId: number) {
+    // Yalnizca son gorulen mesajdan sonrakiler istenir; gecmis tekrar indirilmez.
+    const last = messages[messages.length - 1];
+    if (!last || last.thread !== threadId) return loadMessages(threadId);
+    const lastId = last.id;
+    try {
+      const data = await getChatMessages(threadId, { after: lastId, limit: 200 });
+      if (data.has_more) return loadMessages(threadId);
+      if (data.results.length) {
+        setMessages((prev) => {
+          const seen = new Set(prev.map((m) => m.id));
+          return [...prev, ...data.results.filter((m) => !seen.has(m.id))];
+        });
+        setTimeout(() => bottomRef.current?.scrollIntoView({ behavior: "smooth" }), 50);
+      }
+      await Promise.all([loadThreads(), loadUnread()]);
+    } catch {
+      // ignore
+    }
+  }
+
+  async function loadOlderMessages() {
+    if (!activeThreadId || !messages.length) return;
+    setLoadingOlder(true);
+    try {
+      const data = await getChatMessages(activeThreadId, { before: messages[0].id });
+      setMessages((prev) => [...data.results, ...prev]);
+      setHasOlder(data.has_more);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Mesajlar yuklenemedi.");
+    } finally {
+      setLoadingOlder(false);
+    }
+  }
+
   useEffect(() => {
     me().then((x) => {
       if (x && x.authenticated) {
@@ -112,18 +157,36 @@ export default function ChatDrawer() {
     });
   }, []);
 
+  useEffect(() => {
+    const source = openChatEvents({
+      message: ({ thread, message }) => {
+        if (!openRef.current) return;
+        if (thread === activeThreadRef.current) {
+          setMessages((prev) => (prev.some((m) => m.id === message.id) ? prev : [...prev, message]));
+          readChatThread(thread).catch(() => undefined);
+          setTimeout(() => bottomRef.current?.scrollIntoView({ behavior: "smooth" }), 50);
+        }
+        loadThreads();
+      },
+      unread: ({ unread_count }) => setUnreadCount(unread_count || 0)
+    }, { onOpen: () => setLive(true), onError: () => setLive(false) });
+    if (!source) return;
+    return () => source.close();
+  }, []);
+
   useEffect(() => {
     loadUnread();
+    // Canli baglanti varken anlik olaylar gelir; yoklama yalnizca yedek olarak seyrek calisir.
     const timer = setInterval(() => {
       loadUnread();
       if (open) {
         loadThreads();
         loadUsers();
-        if (activeThreadId) loadMessages(activeThreadId);
+        if (activeThreadId) loadNewMessages(activeThreadId);
       }
-    }, 8000);
+    }, live ? 60000 : 8000);
     return () => clearInterval(timer);
-  }, [open, activeThreadId]);
+  }, [open, activeThreadId, live, messages]);
 
   useEffect(() => {
     if (!open) return;
@@ -174,7 +237,7 @@ export default function ChatDrawer() {
       });
       setBody("");
       setFiles([]);
-      await loadMessages(activeThreadId);
+      await loadNewMessages(activeThreadId);
     } catch (err) {
       setError(err instanceof Error ? err.message : "Mesaj gonderilemedi.");
     } finally {
@@ -323,6 +386,13 @@ export default function ChatDrawer() {
             <div className="flex-1 space-y-2 overflow-auto bg-sand/20 p-4">
               {loading ? <div className="text-sm text-ink/60">Yukleniyor...</div> : null}
               {!loading && messages.length === 0 ? <div className="text-sm text-ink/60">Henuz mesaj yok.</div> : null}
+              {!loading && hasOlder ? (
+                <div className="flex justify-center">
+                  <Button size="sm" variant="outline" onClick={loadOlderMessages} disabled={loadingOlder}>
+                    {loadingOlder ? "Yukleniyor..." : "Daha eski mesajlar"}
+                  </Button>
+                </div>
+              ) : null}
               {messages.map((m) => (
                 <div key={m.id} className="rounded-lg border border-ink/10 bg-white p-2">
                   <div className="text-xs text-ink/60">
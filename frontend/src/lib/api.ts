@@ -46,7 +46,7 @@ export async function apiFetch<T>(path: string, options: RequestInit = {}): Prom
   const res = await fetch(`${base}${path}`, {
     ...options,
     headers,
-    cache: options.cache || (method === "GET" ? "no-store" : undefined)
+    cache: options.cache || (method === "GET" ? "no-cache" : undefined)
   });
 
   if (!res.ok) {
@@ -57,6 +57,33 @@ export async function apiFetch<T>(path: string, options: RequestInit = {}): Prom
   return (await parseJsonSafe(res)) as T;
 }
 
+export type Page<T> = {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+};
+
+function toApiPath(url: string) {
+  const parsed = new URL(url, "http://localhost");
+  return `${parsed.pathname}${parsed.search}`;
+}
+
+export async function apiPage<T>(path: string): Promise<Page<T>> {
+  return apiFetch<Page<T>>(path);
+}
+
+export async function apiList<T>(path: string, pageSize = 200): Promise<T[]> {
+  const sep = path.includes("?") ? "&" : "?";
+  let next: string | null = `${path}${sep}page_size=${pageSize}`;
+  const rows: T[] = [];
+  while (next) {
+    const page: Page<T> = await apiFetch<Page<T>>(next);
+    rows.push(...page.results);
+    next = page.next ? toApiPath(page.next) : null;
+  }
+  return rows;
+}
+
 export async function apiUpload<T>(path: string, data: FormData): Promise<T> {
   const headers = new Headers();
   const token = getAccessToken();
@@ -76,6 +103,126 @@ export async function apiUpload<T>(path: string, data: FormData): Promise<T> {
   return (await parseJsonSafe(res)) as T;
 }
 
+type UploadTicket = {
+  key: string;
+  token: string;
+  upload: { url: string; fields: Record<string, string> };
+};
+
+// Dosya API sunucusundan geçmeden imzalı politika ile doğrudan MinIO'ya yüklenir.
+export async function uploadToStorage(initiatePath: string, file: File): Promise<string> {
+  const ticket = await apiFetch<UploadTicket>(initiatePath, {
+    method: "POST",
+    body: JSON.stringify({ filename: file.name, content_type: file.type || "application/octet-stream" })
+  });
+  const form = new FormData();
+  for (const [name, value] of Object.entries(ticket.upload.fields)) {
+    form.append(name, value);
+  }
+  form.append("file", file);
+  const res = await fetch(ticket.upload.url, { method: "POST", body: form });
+  if (!res.ok) {
+    const text = await res.text();
+    throw new Error(text || res.statusText);
+  }
+  return ticket.token;
+}
+
+const MULTIPART_THRESHOLD = 32 * 1024 * 1024;
+const MULTIPART_CONCURRENCY = 4;
+const MULTIPART_RETRIES = 3;
+
+type MultipartState = { token: string; part_size: number; part_count: number };
+
+function multipartStoreKey(file: File) {
+  return `ymm:multipart:${file.name}:${file.size}:${file.lastModified}`;
+}
+
+async function resumeMultipart(file: File): Promise<{ state: MultipartState; done: Set<number> } | null> {
+  const saved = localStorage.getItem(multipartStoreKey(file));
+  if (!saved) return null;
+  try {
+    const state = JSON.parse(saved) as MultipartState;
+    const res = await apiFetch<MultipartState & { parts: { part_number: number; size: number }[] }>(
+      `/api/files/multipart_parts/?token=${encodeURIComponent(state.token)}`
+    );
+    const done = new Set<number>();
+    for (const part of res.parts) {
+      const expected = Math.min(state.part_size, file.size - (part.part_number - 1) * state.part_size);
+      if (part.size === expected) done.add(part.part_number);
+    }
+    return { state, done };
+  } catch {
+    localStorage.removeItem(multipartStoreKey(file));
+    return null;
+  }
+}
+
+// Büyük dosyalar parçalar halinde, paralel ve kaldığı yerden devam edilebilir şekilde yüklenir.
+export async function uploadMultipart(file: File, onProgress?: (done: number, total: number) => void) {
+  const resumed = await resumeMultipart(file);
+  const state =
+    resumed?.state ||
+    (await apiFetch<MultipartState>("/api/files/multipart_create/", {
+      method: "POST",
+      body: JSON.stringify({ filename: file.name, content_type: file.type || "application/octet-stream", size: file.size })
+    }));
+  localStorage.setItem(multipartStoreKey(file), JSON.stringify(state));
+  const done = resumed?.done || new Set<number>();
+  const pending: number[] = [];
+  for (let n = 1; n <= state.part_count; n += 1) {
+    if (!done.has(n)) pending.push(n);
+  }
+  onProgress?.(done.size, state.part_count);
+
+  const uploadPart = async (n: number) => {
+    for (let attempt = 1; ; attempt += 1) {
+      try {
+        const { urls } = await apiFetch<{ urls: Record<string, string> }>("/api/files/multipart_sign/", {
+          method: "POST",
+          body: JSON.stringify({ token: state.token, parts: [n] })
+        });
+        const blob = file.slice((n - 1) * state.part_size, n * state.part_size);
+        const res = await fetch(urls[String(n)], { method: "PUT", body: blob });
+        if (!res.ok) throw new Error(res.statusText);
+        done.add(n);
+        onProgress?.(done.size, state.part_count);
+        return;
+      } catch (err) {
+        if (attempt >= MULTIPART_RETRIES) throw err;
+      }
+    }
+  };
+  const worker = async () => {
+    while (pending.length) {
+      await uploadPart(pending.shift() as number);
+    }
+  };
+  await Promise.all(Array.from({ length: Math.min(MULTIPART_CONCURRENCY, pending.length) }, worker));
+  return state.token;
+}
+
+export async function apiDirectUpload<T>(resource: "files" | "contracts", data: FormData): Promise<T> {
+  const file = data.get("file");
+  if (!(file instanceof File)) {
+    throw new Error("file is required");
+  }
+  const multipart = resource === "files" && file.size > MULTIPART_THRESHOLD;
+  const token = multipart
+    ? await uploadMultipart(file)
+    : await uploadToStorage(`/api/${resource}/upload_initiate/`, file);
+  const payload: Record<string, string> = { token };
+  data.forEach((value, name) => {
+    if (name !== "file" && typeof value === "string") payload[name] = value;
+  });
+  const result = await apiFetch<T>(`/api/${resource}/${multipart ? "multipart_complete" : "upload_complete"}/`, {
+    method: "POST",
+    body: JSON.stringify(payload)
+  });
+  if (multipart) localStorage.removeItem(multipartStoreKey(file));
+  return result;
+}
+
 export async function login(username: string, password: string) {
   return apiFetch<{ access: string; refresh: string }>("/api/auth/token/", {
     method: "POST",
@@ -142,6 +289,29 @@ export async function updateSettings(data: {
   });
 }
 
+export type DashboardCount = {
+  year: number;
+  type: string;
+  status: string;
+  delivery_method: string | null;
+  count: number;
+};
+
+export type DashboardData = {
+  working_year: number;
+  reference_year: number;
+  years: number[];
+  year: number;
+  customers: { total: number };
+  documents: DashboardCount[];
+  reports: DashboardCount[];
+  recent: Array<{ id: string; title: string; subtitle: string; date: string }>;
+};
+
+export async function getDashboard(year?: number) {
+  return apiFetch<DashboardData>(year ? `/api/dashboard/?year=${year}` : "/api/dashboard/");
+}
+
 export async function sendTestMail(to_email: string) {
   return apiFetch<{ status: string; sent_to: string[] }>("/api/settings/test_mail/", {
     method: "POST",
@@ -149,6 +319,79 @@ export async function sendTestMail(to_email: string) {
   });
 }
 
+export type MailQueued = {
+  status: string;
+  job_id: number;
+  sent_to: string[];
+  attachment_count: number;
+};
+
+export type MailJob = {
+  id: number;
+  status: "QUEUED" | "SENDING" | "SENT" | "FAILED";
+  subject: string;
+  to: string[];
+  note?: number | null;
+  attempts: number;
+  last_error?: string | null;
+  sent_at?: string | null;
+  created_at: string;
+  updated_at: string;
+};
+
+export async function getMailJob(id: number) {
+  return apiFetch<MailJob>(`/api/mail-jobs/${id}/`);
+}
+
+export type ContractJobStatus = {
+  status: "pending" | "extracting" | "parsing" | "ready" | "done" | "failed";
+  progress?: { pages: number; total: number } | null;
+  parsed?: Record<string, string | number | null> | null;
+  confidence?: Record<string, number> | null;
+  error?: string | null;
+  contract?: number | null;
+};
+
+// PDF doğrudan depoya yüklenir; alanlar worker'da çıkarılır, sonuç status ile izlenir.
+export async function startContractJob(file: File) {
+  const token = await uploadToStorage("/api/contracts/upload_initiate/", file);
+  return apiFetch<{ id: number; status: ContractJobStatus["status"] }>("/api/contract-jobs/", {
+    method: "POST",
+    body: JSON.stringify({ token })
+  });
+}
+
+export async function getContractJobStatus(id: number) {
+  return apiFetch<ContractJobStatus>(`/api/contract-jobs/${id}/status/`);
+}
+
+export async function confirmContractJob<T>(id: number, fields: Record<string, string>) {
+  return apiFetch<T>(`/api/contract-jobs/${id}/confirm/`, {
+    method: "POST",
+    body: JSON.stringify(fields)
+  });
+}
+
+export type ImportJobStatus = {
+  status: "pending" | "running" | "done" | "failed";
+  progress?: { processed: number; created: number; updated: number; failed: number } | null;
+  errors?: { row: number; errors: Record<string, string[]> }[] | null;
+  error?: string | null;
+};
+
+// Müşteri listesi (CSV/XLSX) depoya yüklenir, worker'da partiler halinde içe aktarılır.
+export async function startImportJob(file: File, kind: "customers" = "customers") {
+  const token = await uploadToStorage("/api/files/upload_initiate/", file);
+  return apiFetch<{ id: number; status: ImportJobStatus["status"] }>("/api/import-jobs/", {
+    method: "POST",
+    body: JSON.stringify({ token, kind })
+  });
+}
+
+export async function getImportJobStatus(id: number) {
+  return apiFetch<ImportJobStatus>(`/api/import-jobs/${id}/status/`);
+}
+
 export async function sendTableMail(payload: {
   to_emails: string;
   title: string;
@@ -158,12 +401,56 @@ export async function sendTableMail(payload: {
   columns: string[];
   rows: Array<string[] | Record<string, string>>;
 }) {
-  return apiFetch<{ status: string; sent_to: string[] }>("/api/settings/send_table_mail/", {
+  return apiFetch<MailQueued>("/api/settings/send_table_mail/", {
+    method: "POST",
+    body: JSON.stringify(payload)
+  });
+}
+
+// Liste dışa aktarımı sunucuda filtrelenip dosya olarak akar; tarayıcı indirmesi başlık
+// gönderemediği için bağlantıya yalnızca bu dışa aktarım için kısa ömürlü anahtar eklenir.
+export async function exportListUrl(
+  resource: "customers" | "documents" | "reports" | "contracts",
+  fileFormat: "csv" | "xlsx",
+  filters: Record<string, string> = {}
+) {
+  const { token } = await apiFetch<{ token: string; expires_in: number }>(`/api/${resource}/export_token/`, {
+    method: "POST"
+  });
+  const params = new URLSearchParams();
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value) params.set(key, value);
+  });
+  params.set("file_format", fileFormat);
+  params.set("token", token);
+  return `${resolveApiBase()}/api/${resource}/export/?${params.toString()}`;
+}
+
+export type ExportJobStatus = {
+  status: "pending" | "running" | "done" | "failed";
+  rows?: number | null;
+  error?: string | null;
+  filename?: string | null;
+  url?: string | null;
+};
+
+// PDF worker'da üretilir; aynı liste/filtre/veri için mevcut iş döner. Sonuç imzalı bağlantıdan indirilir.
+export async function startPdfExport(payload: {
+  resource: "customers" | "documents" | "reports" | "contracts";
+  filters?: Record<string, string>;
+  title?: string;
+  note?: string;
+}) {
+  return apiFetch<{ id: number; status: ExportJobStatus["status"] }>("/api/export-jobs/", {
     method: "POST",
     body: JSON.stringify(payload)
   });
 }
 
+export async function getExportJobStatus(id: number) {
+  return apiFetch<ExportJobStatus>(`/api/export-jobs/${id}/status/`);
+}
+
 export async function exportTablePdf(payload: {
   title: string;
   note?: string;
@@ -285,8 +572,20 @@ export async function createGroupThread(name: string, userIds: number[]) {
   });
 }
 
-export async function getChatMessages(threadId: number) {
-  return apiFetch<ChatMessage[]>(`/api/chat-messages/?thread=${threadId}`);
+export type ChatMessagePage = {
+  results: ChatMessage[];
+  has_more: boolean;
+};
+
+export async function getChatMessages(
+  threadId: number,
+  cursor: { before?: number; after?: number; limit?: number } = {}
+) {
+  const params = new URLSearchParams({ thread: String(threadId) });
+  if (cursor.before) params.set("before", String(cursor.before));
+  if (cursor.after) params.set("after", String(cursor.after));
+  if (cursor.limit) params.set("limit", String(cursor.limit));
+  return apiFetch<ChatMessagePage>(`/api/chat-messages/?${params.toString()}`);
 }
 
 export async function sendChatMessage(params: {
@@ -297,8 +596,11 @@ export async function sendChatMessage(params: {
   const data = new FormData();
   data.append("thread", String(params.threadId));
   if (params.body) data.append("body", params.body);
-  for (const f of params.files || []) {
-    data.append("files", f);
+  const tokens = await Promise.all(
+    (params.files || []).map((f) => uploadToStorage("/api/chat-messages/upload_initiate/", f))
+  );
+  for (const token of tokens) {
+    data.append("uploads", token);
   }
   return apiUpload<ChatMessage>("/api/chat-messages/", data);
 }
@@ -314,6 +616,78 @@ export async function getChatUnreadCount() {
   return apiFetch<{ unread_count: number }>("/api/chat-threads/unread_count/");
 }
 
+export type ChatEventHandlers = {
+  message?: (data: { thread: number; message: ChatMessage }) => void;
+  read?: (data: { thread: number; user: number; last_read_at: string }) => void;
+  unread?: (data: { unread_count: number }) => void;
+};
+
+export type ChatEventsConnection = {
+  close: () => void;
+};
+
+// EventSource baslik gonderemez; her (yeniden) baglantidan once yalnizca akis icin gecerli,
+// kisa omurlu bir bilet alinir. Bilet suresi dolacagi icin tarayicinin kendi yeniden
+// baglanmasi yerine kopan baglanti kapatilip yeni biletle acilir.
+export function openChatEvents(
+  handlers: ChatEventHandlers,
+  status: { onOpen?: () => void; onError?: () => void } = {}
+): ChatEventsConnection | null {
+  if (!getAccessToken() || typeof EventSource === "undefined") return null;
+  let source: EventSource | null = null;
+  let retry: ReturnType<typeof setTimeout> | null = null;
+  let closed = false;
+
+  function scheduleReconnect() {
+    status.onError?.();
+    if (closed || retry) return;
+    retry = setTimeout(() => {
+      retry = null;
+      connect();
+    }, 5000);
+  }
+
+  async function connect() {
+    let token: string;
+    try {
+      ({ token } = await apiFetch<{ token: string; expires_in: number }>("/api/chat/events/token/", {
+        method: "POST"
+      }));
+    } catch {
+      scheduleReconnect();
+      return;
+    }
+    if (closed) return;
+    const next = new EventSource(`${resolveApiBase()}/api/chat/events/?token=${encodeURIComponent(token)}`);
+    for (const [name, handler] of Object.entries(handlers)) {
+      if (!handler) continue;
+      next.addEventListener(name, (ev) => {
+        try {
+          (handler as (data: unknown) => void)(JSON.parse((ev as MessageEvent).data));
+        } catch {
+          // ignore
+        }
+      });
+    }
+    next.onopen = () => status.onOpen?.();
+    next.onerror = () => {
+      next.close();
+      if (source === next) source = null;
+      scheduleReconnect();
+    };
+    source = next;
+  }
+
+  connect();
+  return {
+    close() {
+      closed = true;
+      if (retry) clearTimeout(retry);
+      source?.close();
+    }
+  };
+}
+
 export async function leaveChatThread(threadId: number) {
   return apiFetch<{ status: string }>(`/api/chat-threads/${threadId}/leave/`, {
     method: "POST",